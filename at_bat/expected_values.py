@@ -0,0 +1,174 @@
+"""
+Expected batting average (xBA) and expected slugging (xSLG) lookups
+for batted balls.
+
+The expected_values.csv table made by
+"every_pitch_csv/7. expected_batting_average.py" is compiled into a
+2-D NumPy grid indexed by (round(exit_velo * 10), launch_angle + 100)
+so a batted ball (or an array of them) is scored with array indexing
+instead of a DataFrame query.
+
+Example:
+    xba, xslg = score_batted_balls(['single'], [101.3], [14])
+"""
+
+from functools import lru_cache
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+from at_bat.statsapi_plus import get_expected_values_dataframe
+
+EV_SCALE = 10 # exit velocity is stored in 0.1 mph steps
+LA_OFFSET = 100 # launch angle starts at -100 degrees
+
+
+class ExpectedValuesGrid:
+    """
+    xBA and xSLG stored as 2-D arrays.
+
+    Attributes:
+        xba (np.ndarray): xBA with shape (exit velo bins, launch angle
+            bins). NaN where the table has no at bats
+        xslg (np.ndarray): xSLG with the same shape as xba
+    """
+    def __init__(self, xba: np.ndarray, xslg: np.ndarray):
+        self.xba = xba
+        self.xslg = xslg
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'ExpectedValuesGrid':
+        """
+        Builds the grid from the expected_values.csv DataFrame
+
+        Args:
+            df (pd.DataFrame): expected_values DataFrame
+
+        Returns:
+            ExpectedValuesGrid: The grid
+        """
+        ev_index = np.rint(df['exit_velocity'].to_numpy(dtype=np.float64) * EV_SCALE).astype(np.int64)
+        la_index = np.rint(df['launch_angle'].to_numpy(dtype=np.float64)).astype(np.int64) + LA_OFFSET
+
+        shape = (int(ev_index.max()) + 1, int(la_index.max()) + 1)
+        xba = np.full(shape, np.nan)
+        xslg = np.full(shape, np.nan)
+
+        xba[ev_index, la_index] = pd.to_numeric(df['xba'], errors='coerce').to_numpy(dtype=np.float64)
+        xslg[ev_index, la_index] = pd.to_numeric(df['xslg'], errors='coerce').to_numpy(dtype=np.float64)
+
+        return cls(xba, xslg)
+
+    def lookup(self, exit_velo, launch_angle, interpolate: bool = False
+        ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns xBA and xSLG for arrays of exit velocities and launch
+        angles. Batted balls outside of the grid or in an empty cell
+        are NaN.
+
+        Args:
+            exit_velo (np.ndarray): Exit velocities (mph)
+            launch_angle (np.ndarray): Launch angles (degrees)
+            interpolate (bool, optional): Use bilinear interpolation
+                between the surrounding cells instead of rounding to
+                the nearest cell. Empty cells are skipped. Defaults
+                to False.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: xba, xslg
+        """
+        ev = np.asarray(exit_velo, dtype=np.float64) * EV_SCALE
+        la = np.asarray(launch_angle, dtype=np.float64) + LA_OFFSET
+
+        if interpolate is False:
+            return (self._take(self.xba, np.rint(ev), np.rint(la)),
+                    self._take(self.xslg, np.rint(ev), np.rint(la)))
+
+        ev0 = np.floor(ev)
+        la0 = np.floor(la)
+        dev = ev - ev0
+        dla = la - la0
+
+        corners = (
+            (ev0, la0, (1 - dev) * (1 - dla)),
+            (ev0 + 1, la0, dev * (1 - dla)),
+            (ev0, la0 + 1, (1 - dev) * dla),
+            (ev0 + 1, la0 + 1, dev * dla),
+        )
+
+        results = []
+        for grid in (self.xba, self.xslg):
+            total = np.zeros(np.shape(ev))
+            weights = np.zeros(np.shape(ev))
+
+            for i, j, w in corners:
+                value = self._take(grid, i, j)
+                has_value = ~np.isnan(value)
+                total += np.where(has_value, w * np.nan_to_num(value), 0)
+                weights += np.where(has_value, w, 0)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                results.append(np.where(weights > 0, total / weights, np.nan))
+
+        return (results[0], results[1])
+
+    @staticmethod
+    def _take(grid: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        inside = ((i >= 0) & (i < grid.shape[0]) & (j >= 0) & (j < grid.shape[1]))
+        inside &= ~(np.isnan(i) | np.isnan(j))
+
+        i = np.where(inside, i, 0).astype(np.int64)
+        j = np.where(inside, j, 0).astype(np.int64)
+
+        return np.where(inside, grid[i, j], np.nan)
+
+
+@lru_cache(maxsize=None)
+def get_expected_values_grid() -> ExpectedValuesGrid:
+    """
+    Returns expected_values.csv as an ExpectedValuesGrid. Only loaded
+    once per process.
+
+    Returns:
+        ExpectedValuesGrid: The grid
+    """
+    return ExpectedValuesGrid.from_dataframe(get_expected_values_dataframe())
+
+
+def score_batted_balls(at_bat_event_type, exit_velo, launch_angle,
+    interpolate: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns xBA and xSLG for arrays of pitches using the same rules as
+    game_parser.batted_ball_expected_values: batted balls use the grid,
+    strikeouts are 0 and everything else is NaN.
+
+    Args:
+        at_bat_event_type (np.ndarray): at_bat_event_type of each pitch
+        exit_velo (np.ndarray): Exit velocities, None/NaN if not a
+            batted ball
+        launch_angle (np.ndarray): Launch angles, None/NaN if not a
+            batted ball
+        interpolate (bool, optional): See ExpectedValuesGrid.lookup.
+            Defaults to False.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: xba, xslg
+    """
+    event_type = np.asarray(at_bat_event_type, dtype=object)
+    ev = np.asarray(exit_velo, dtype=np.float64)
+    la = np.asarray(launch_angle, dtype=np.float64)
+
+    xba = np.full(ev.shape, np.nan)
+    xslg = np.full(ev.shape, np.nan)
+
+    batted_ball = ~(np.isnan(ev) | np.isnan(la))
+    if batted_ball.any():
+        grid = get_expected_values_grid()
+        xba[batted_ball], xslg[batted_ball] = grid.lookup(ev[batted_ball],
+            la[batted_ball], interpolate=interpolate)
+
+    strikeout = ~batted_ball & (event_type == 'strikeout')
+    xba[strikeout] = 0
+    xslg[strikeout] = 0
+
+    return (xba, xslg)
@@ -0,0 +1,225 @@
+"""
+Builds expected_values.csv (xBA and xSLG for every exit velocity and
+launch angle) from pitch.csv with NumPy.
+
+Every batted ball counts toward the cells around it: exit velocities
+within the EV bin width and launch angles within the LA bin width.
+Instead of adding each batted ball to every cell of its neighborhood,
+the hits, total bases and at bats are counted once per 0.1 mph x 1
+degree cell. The neighborhood sums of every cell are then read from a
+summed-area table (2-D cumulative sum) with four lookups, so the bin
+widths do not change the run time.
+
+The window of a cell is half open: with the default widths the cell
+(90.0, 10) counts batted balls from 87.1 to 93.0 mph and from 10 to 11
+degrees, the same as "7. expected_batting_average.py" did.
+
+Example:
+    df = pd.read_csv('pitch.csv', usecols=BATTED_BALL_COLUMNS)
+    table = build_expected_values(df, ev_bin_width=3, la_bin_width=1)
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from at_bat.expected_values import EV_SCALE, LA_OFFSET
+
+EV_BIN_WIDTH = 3 # unit: mph
+LA_BIN_WIDTH = 1 # unit: degrees
+
+# cells of expected_values.csv, same indexes as ExpectedValuesGrid
+EV_CELLS = (10, 1300) # 1.0 to 129.9 mph
+LA_CELLS = (0, 200) # -100 to 99 degrees
+
+BATTED_BALL_COLUMNS = ['at_bat_event_type', 'batted_ball_launch_speed',
+    'batted_ball_launch_angle']
+EXPECTED_VALUES_COLUMNS = ['exit_velocity', 'launch_angle', 'xba', 'xslg', 'hits',
+    'total_bases', 'at_bats']
+
+IGNORE = (
+    'field_error',
+    'sac_fly',
+    'catchers_interf',
+    'sac_bunt',
+    'sac_fly_double_play', # only 3 in 2024. not sure it should count against batter
+)
+
+OUTS = (
+    'field_out',
+    'force_out',
+    'grounded_into_double_play',
+    'fielders_choice',
+    'fielders_choice_out',
+    'double_play',
+)
+
+HITS = {
+    'single': 1,
+    'double': 2,
+    'triple': 3,
+    'home_run': 4,
+}
+
+
+def _window(width: float, scale: int) -> Tuple[int, int]:
+    """
+    Returns how many cells below and above a cell are in its window
+    """
+    steps = int(round(width * scale))
+    if steps < 1:
+        raise ValueError('bin width must be at least one cell')
+    return (steps - 1, steps)
+
+
+def batted_ball_counts(df: pd.DataFrame, ev_cells: Tuple[int, int] = EV_CELLS,
+    la_cells: Tuple[int, int] = LA_CELLS) -> np.ndarray:
+    """
+    Counts hits, total bases and at bats per 0.1 mph x 1 degree cell.
+    Batted balls without an exit velocity or launch angle, events in
+    IGNORE and other events (ex: strikeouts) are not counted.
+
+    Args:
+        df (pd.DataFrame): pitch.csv with BATTED_BALL_COLUMNS
+        ev_cells (Tuple[int, int], optional): First and last + 1
+            exit velocity index (round(exit_velo * 10))
+        la_cells (Tuple[int, int], optional): First and last + 1
+            launch angle index (launch_angle + 100)
+
+    Returns:
+        np.ndarray: int64 counts with shape (3, ev cells, la cells) in
+            the order hits, total bases, at bats
+    """
+    event = df['at_bat_event_type']
+    total_bases = event.map(HITS).fillna(0).to_numpy(dtype=np.int64)
+    is_hit = total_bases > 0
+    is_at_bat = is_hit | event.isin(OUTS).to_numpy()
+
+    ev = df['batted_ball_launch_speed'].to_numpy(dtype=np.float64)
+    la = df['batted_ball_launch_angle'].to_numpy(dtype=np.float64)
+    is_at_bat &= ~(np.isnan(ev) | np.isnan(la))
+
+    ev_index = np.rint(ev[is_at_bat] * EV_SCALE).astype(np.int64) - ev_cells[0]
+    la_index = np.rint(la[is_at_bat]).astype(np.int64) + LA_OFFSET - la_cells[0]
+    shape = (ev_cells[1] - ev_cells[0], la_cells[1] - la_cells[0])
+
+    inside = ((ev_index >= 0) & (ev_index < shape[0]) & (la_index >= 0)
+        & (la_index < shape[1]))
+    cell = np.ravel_multi_index((ev_index[inside], la_index[inside]), shape)
+    size = shape[0] * shape[1]
+
+    counts = np.stack([
+        np.bincount(cell, weights=is_hit[is_at_bat][inside], minlength=size),
+        np.bincount(cell, weights=total_bases[is_at_bat][inside], minlength=size),
+        np.bincount(cell, minlength=size),
+    ]).astype(np.int64)
+    return counts.reshape((3,) + shape)
+
+
+def window_sums(counts: np.ndarray, ev_window: Tuple[int, int],
+    la_window: Tuple[int, int]) -> np.ndarray:
+    """
+    Sums the cells in the window around every cell of the last two axes
+    with a summed-area table. Cells past the edges count as 0.
+
+    Args:
+        counts (np.ndarray): Counts with shape (..., ev cells, la cells)
+        ev_window (Tuple[int, int]): Cells (below, above) each cell
+        la_window (Tuple[int, int]): Cells (below, above) each cell
+
+    Returns:
+        np.ndarray: Window sums with the same shape as counts
+    """
+    rows, columns = counts.shape[-2:]
+    table = np.zeros(counts.shape[:-2] + (rows + 1, columns + 1), dtype=counts.dtype)
+    table[..., 1:, 1:] = counts.cumsum(axis=-2).cumsum(axis=-1)
+
+    # window of cell i is i - below to i + above, as table rows
+    # i - below to i + above + 1
+    top = np.clip(np.arange(rows) - ev_window[0], 0, rows)
+    bottom = np.clip(np.arange(rows) + ev_window[1] + 1, 0, rows)
+    left = np.clip(np.arange(columns) - la_window[0], 0, columns)
+    right = np.clip(np.arange(columns) + la_window[1] + 1, 0, columns)
+
+    return (table[..., bottom[:, None], right] - table[..., top[:, None], right]
+        - table[..., bottom[:, None], left] + table[..., top[:, None], left])
+
+
+def expected_values_from_counts(counts: np.ndarray, ev_cells: Tuple[int, int],
+    la_cells: Tuple[int, int], ev_bin_width: float = EV_BIN_WIDTH,
+    la_bin_width: int = LA_BIN_WIDTH) -> pd.DataFrame:
+    """
+    Builds the expected_values.csv table from batted_ball_counts()
+
+    Args:
+        counts (np.ndarray): batted_ball_counts() output
+        ev_cells (Tuple[int, int]): ev_cells of the counts. Cells
+            outside of them are taken as empty
+        la_cells (Tuple[int, int]): la_cells of the counts
+        ev_bin_width (float, optional): Exit velocity window (mph).
+            Defaults to 3.
+        la_bin_width (int, optional): Launch angle window (degrees).
+            Defaults to 1.
+
+    Returns:
+        pd.DataFrame: EXPECTED_VALUES_COLUMNS, one row per cell. xba
+            and xslg are NaN for cells without at bats
+    """
+    ev_window = _window(ev_bin_width, EV_SCALE)
+    la_window = _window(la_bin_width, 1)
+
+    # cells missing from the counts have no batted balls
+    ev_pad = (max(ev_cells[0] - (EV_CELLS[0] - ev_window[0]), 0),
+        max(EV_CELLS[1] + ev_window[1] - ev_cells[1], 0))
+    la_pad = (max(la_cells[0] - (LA_CELLS[0] - la_window[0]), 0),
+        max(LA_CELLS[1] + la_window[1] - la_cells[1], 0))
+    counts = np.pad(counts, ((0, 0), ev_pad, la_pad))
+
+    sums = window_sums(counts, ev_window, la_window)
+    ev_start = EV_CELLS[0] - ev_cells[0] + ev_pad[0]
+    la_start = LA_CELLS[0] - la_cells[0] + la_pad[0]
+    hits, total_bases, at_bats = sums[:, ev_start:ev_start + EV_CELLS[1] - EV_CELLS[0],
+        la_start:la_start + LA_CELLS[1] - LA_CELLS[0]]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        xba = np.where(at_bats > 0, hits / at_bats, np.nan)
+        xslg = np.where(at_bats > 0, total_bases / at_bats, np.nan)
+
+    ev, la = np.meshgrid(np.arange(*EV_CELLS), np.arange(*LA_CELLS), indexing='ij')
+    return pd.DataFrame({
+        'exit_velocity': np.round(ev.ravel() / EV_SCALE, 1),
+        'launch_angle': la.ravel() - LA_OFFSET,
+        'xba': xba.ravel(),
+        'xslg': xslg.ravel(),
+        'hits': hits.ravel(),
+        'total_bases': total_bases.ravel(),
+        'at_bats': at_bats.ravel(),
+    }, columns=EXPECTED_VALUES_COLUMNS)
+
+
+def build_expected_values(df: pd.DataFrame, ev_bin_width: float = EV_BIN_WIDTH,
+    la_bin_width: int = LA_BIN_WIDTH) -> pd.DataFrame:
+    """
+    Builds the expected_values.csv table
+
+    Args:
+        df (pd.DataFrame): pitch.csv with BATTED_BALL_COLUMNS
+        ev_bin_width (float, optional): Exit velocity window (mph).
+            Defaults to 3.
+        la_bin_width (int, optional): Launch angle window (degrees).
+            Defaults to 1.
+
+    Returns:
+        pd.DataFrame: See expected_values_from_counts()
+    """
+    ev_window = _window(ev_bin_width, EV_SCALE)
+    la_window = _window(la_bin_width, 1)
+
+    # batted balls just outside of the table still count for its edges
+    ev_cells = (EV_CELLS[0] - ev_window[0], EV_CELLS[1] + ev_window[1])
+    la_cells = (LA_CELLS[0] - la_window[0], LA_CELLS[1] + la_window[1])
+    counts = batted_ball_counts(df, ev_cells, la_cells)
+
+    return expected_values_from_counts(counts, ev_cells, la_cells, ev_bin_width,
+        la_bin_width)
@@ -0,0 +1,317 @@
+"""
+On-disk cache of raw game feeds (the dictionary returned by
+statsapi.get('game')) so historical games are only downloaded once.
+
+Only final games are stored. A final game does not change, so its feed
+answers any request for that gamepk with a timecode at or after the
+feed's metaData.timeStamp. Live and scheduled games are never cached.
+
+Feeds are gzip compressed and stored by content hash in a sharded
+directory (objects/ab/abcdef....json.gz). index.jsonl maps each gamepk
+to its object and is only ever appended to, except when it is
+compacted during eviction. When the cache grows past max_bytes the
+least recently read feeds are deleted. Several processes (see
+at_bat.ingest) can share a cache: writes to the index hold a lock on
+index.lock.
+
+The cache is off unless the AT_BAT_FEED_CACHE environment variable is
+set to a directory (for example ~/.cache/at_bat/feeds) or a cache is
+passed to set_feed_cache().
+
+Example:
+    cache = FeedCache('/tmp/feeds', max_bytes=2 * 1024**3)
+    set_feed_cache(cache)
+    data = Game.get_dict(748534) # downloaded and cached
+    data = Game.get_dict(748534) # read from disk
+"""
+
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Union
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_MAX_BYTES = 5 * 1024**3
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """
+    Holds an exclusive lock on path (created if needed) so only one
+    process at a time changes the files it guards
+    """
+    with open(path, 'a+b') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def is_cacheable(data: dict) -> bool:
+    """
+    Returns True if the feed is for a final game and can be cached
+
+    Args:
+        data (dict): Game dictionary
+
+    Returns:
+        bool: True for final games
+    """
+    try:
+        status = data['gameData']['status']
+        time_stamp = data['metaData']['timeStamp']
+    except (KeyError, TypeError):
+        return False
+
+    return status.get('codedGameState', None) == 'F' and time_stamp is not None
+
+
+class FeedCache:
+    """
+    Compressed, content addressed cache of final game feeds
+
+    Attributes:
+        root (str): Cache directory
+        max_bytes (int): Compressed size the cache is kept under
+        hits (int): Number of reads served from disk
+        misses (int): Number of reads that were not in the cache
+    """
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(root, 'index.jsonl')
+        self._index_lock_path = os.path.join(root, 'index.lock')
+        self._entries: Dict[int, dict] = {}
+        self._total_bytes = 0
+
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        self._entries = {}
+        self._total_bytes = 0
+
+        if not os.path.exists(self._index_path):
+            return
+
+        with open(self._index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # partly written line from a crash
+
+                if entry.get('digest', None) is None:
+                    self._entries.pop(entry['gamepk'], None)
+                elif os.path.exists(self._object_path(entry['digest'])):
+                    self._entries[entry['gamepk']] = entry
+
+        self._total_bytes = sum(entry['size'] for entry in self._entries.values())
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], f'{digest}.json.gz')
+
+    def _append_index(self, entry: dict):
+        with _file_lock(self._index_lock_path):
+            with open(self._index_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(entry) + '\n')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, gamepk: int):
+        return gamepk in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, gamepk: int, timecode: str = None) -> Union[dict, None]:
+        """
+        Returns the cached feed for a game
+
+        Args:
+            gamepk (int): gamepk of the game
+            timecode (str, optional): Requested time (YYYYMMDD_HHMMSS).
+                The cached feed is only returned if it is from at or
+                before this time. Defaults to None (any time).
+
+        Returns:
+            Union[dict, None]: The game dictionary, None if not cached
+        """
+        entry = self._entries.get(gamepk, None)
+
+        if entry is None or (timecode is not None and timecode < entry['timecode']):
+            self.misses += 1
+            return None
+
+        path = self._object_path(entry['digest'])
+        try:
+            with gzip.open(path, 'rb') as file:
+                data = json.loads(file.read())
+        except (OSError, EOFError, json.JSONDecodeError):
+            # deleted or corrupted by something else
+            with self._lock:
+                self._remove(gamepk)
+            self.misses += 1
+            return None
+
+        os.utime(path) # last read time for eviction
+        self.hits += 1
+        return data
+
+    def put(self, gamepk: int, data: dict) -> bool:
+        """
+        Stores a feed if the game is final
+
+        Args:
+            gamepk (int): gamepk of the game
+            data (dict): Game dictionary
+
+        Returns:
+            bool: True if the feed was stored
+        """
+        if not is_cacheable(data):
+            return False
+
+        raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            old = self._entries.get(gamepk, None)
+            if old is not None and old['digest'] == digest:
+                return True
+
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with gzip.open(tmp_path, 'wb', compresslevel=6) as file:
+                    file.write(raw)
+                os.replace(tmp_path, path)
+
+            if old is not None:
+                self._remove(gamepk, log=False)
+
+            entry = {
+                'gamepk': gamepk,
+                'timecode': data['metaData']['timeStamp'],
+                'digest': digest,
+                'size': os.path.getsize(path),
+            }
+            self._entries[gamepk] = entry
+            self._total_bytes += entry['size']
+            self._append_index(entry)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+        return True
+
+    def _remove(self, gamepk: int, log: bool = True):
+        entry = self._entries.pop(gamepk, None)
+        if entry is None:
+            return
+
+        self._total_bytes -= entry['size']
+
+        # the same content can be shared by more than one gamepk
+        if all(e['digest'] != entry['digest'] for e in self._entries.values()):
+            try:
+                os.remove(self._object_path(entry['digest']))
+            except FileNotFoundError:
+                pass
+
+        if log:
+            self._append_index({'gamepk': gamepk, 'digest': None})
+
+    def _evict(self):
+        def last_read(entry: dict) -> float:
+            try:
+                return os.path.getmtime(self._object_path(entry['digest']))
+            except FileNotFoundError:
+                return 0
+
+        with _file_lock(self._index_lock_path):
+            # other processes may have added feeds since the index was
+            # read, so evict and compact from what is on disk now
+            self._load_index()
+
+            for entry in sorted(self._entries.values(), key=last_read):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._remove(entry['gamepk'], log=False)
+
+            # compact the index so it does not keep growing
+            tmp_path = f'{self._index_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                for entry in self._entries.values():
+                    file.write(json.dumps(entry) + '\n')
+            os.replace(tmp_path, self._index_path)
+
+    def clear(self):
+        """
+        Deletes every cached feed
+        """
+        with self._lock:
+            for gamepk in list(self._entries):
+                self._remove(gamepk, log=False)
+            with _file_lock(self._index_lock_path):
+                open(self._index_path, 'w', encoding='utf-8').close()
+
+
+_feed_cache: Union[FeedCache, None, bool] = False # False = not created yet
+
+
+def get_feed_cache() -> Union[FeedCache, None]:
+    """
+    Returns the process-wide FeedCache used by Game.get_dict. Created
+    the first time it is needed in the directory named by the
+    AT_BAT_FEED_CACHE environment variable
+
+    Returns:
+        Union[FeedCache, None]: None if the cache is turned off (the
+            default)
+    """
+    global _feed_cache # pylint: disable=W0603
+
+    if _feed_cache is False:
+        root = os.environ.get('AT_BAT_FEED_CACHE', '')
+        if root.lower() in ('', '0', 'off', 'false', 'none'):
+            _feed_cache = None
+        else:
+            _feed_cache = FeedCache(os.path.expanduser(root))
+
+    return _feed_cache
+
+
+def set_feed_cache(cache: Union[FeedCache, None]):
+    """
+    Replaces the process-wide FeedCache. None turns caching off
+
+    Args:
+        cache (Union[FeedCache, None]): The new cache
+    """
+    global _feed_cache # pylint: disable=W0603
+    _feed_cache = cache
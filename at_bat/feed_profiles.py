@@ -0,0 +1,119 @@
+"""
+Named projections of the game feed (statsapi.get('game')) for the
+API's fields parameter, so consumers that only need the linescore or
+the current play do not download the whole feed (boxscore, players,
+every play, ...).
+
+The fields parameter is a list of key names. A key is kept if its name
+is in the list, at any depth, and only while its parents are kept too.
+A profile is therefore the names of every key on the way down to the
+values that are needed, plus the keys the classes in at_bat/game.py
+require to be built.
+
+Profiles:
+    'full': The whole feed
+    'scoreboard': gamePk, metaData, the status/teams/datetime/venue
+        parts of gameData and liveData.linescore
+    'last_pitch': 'scoreboard' plus liveData.plays.currentPlay
+
+Example:
+    data = Game.get_dict(748534, profile='last_pitch')
+    game = Game(data, profile='last_pitch')
+    pitch = game.liveData.plays.currentPlay.playEvents[-1]
+"""
+
+from typing import Dict, Iterable, Tuple, Union
+
+_META_DATA = ('gamePk', 'metaData', 'wait', 'timeStamp')
+
+_GAME_DATA = (
+    'gameData',
+    'datetime', 'dateTime', 'officialDate',
+    'status', 'abstractGameState', 'codedGameState', 'detailedState', 'statusCode',
+    'abstractGameCode',
+    'teams', 'away', 'home', 'id', 'name', 'abbreviation', 'teamName', 'locationName',
+    'venue', 'timeZone', 'offset', 'offsetAtGameTime', 'tz',
+    'review', 'absChallenges', 'hasChallenges', 'used', 'remaining', 'usedSuccessful',
+    'usedFailed',
+)
+
+_LINESCORE = (
+    'liveData', 'linescore',
+    'currentInning', 'currentInningOrdinal', 'inningState', 'inningHalf', 'isTopInning',
+    'scheduledInnings', 'innings', 'num', 'ordinalNum',
+    'runs', 'hits', 'errors', 'leftOnBase',
+    'defense', 'offense', 'batter', 'onDeck', 'inHole', 'first', 'second', 'third',
+    'pitcher', 'catcher', 'battingOrder', 'fullName', 'link',
+    'balls', 'strikes', 'outs',
+)
+
+_CURRENT_PLAY = (
+    'plays', 'currentPlay', 'atBatIndex', 'playEndTime', 'pitchIndex', 'actionIndex',
+    'result', 'type', 'event', 'eventType', 'description', 'rbi', 'awayScore',
+    'homeScore', 'isOut',
+    'about', 'halfInning', 'inning', 'startTime', 'endTime', 'isComplete',
+    'isScoringPlay', 'hasReview', 'hasOut',
+    'count', 'matchup', 'batSide', 'pitchHand', 'code',
+    'runners', 'movement', 'originBase', 'start', 'end', 'outBase', 'outNumber',
+    'details', 'movementReason', 'runner', 'isScoringEvent', 'earned', 'playIndex',
+    'playEvents', 'index', 'playId', 'pitchNumber', 'isPitch', 'isBaseRunningPlay',
+    'call', 'isStrike', 'isBall',
+    'pitchData', 'startSpeed', 'endSpeed', 'strikeZoneTop', 'strikeZoneBottom', 'zone',
+    'typeConfidence', 'plateTime', 'extension',
+    'coordinates', 'aX', 'aY', 'aZ', 'pfxX', 'pfxZ', 'pX', 'pZ', 'vX0', 'vY0', 'vZ0',
+    'x', 'y', 'x0', 'y0', 'z0',
+    'breaks', 'breakAngle', 'breakLength', 'breakY', 'breakVertical',
+    'breakVerticalInduced', 'breakHorizontal', 'spinRate', 'spinDirection',
+    'hitData', 'launchSpeed', 'launchAngle', 'totalDistance', 'trajectory', 'hardness',
+    'location', 'coordX', 'coordY',
+)
+
+FEED_PROFILES: Dict[str, Union[Tuple[str, ...], None]] = {
+    'full': None,
+    'scoreboard': _META_DATA + _GAME_DATA + _LINESCORE,
+    'last_pitch': _META_DATA + _GAME_DATA + _LINESCORE + _CURRENT_PLAY,
+}
+
+
+def profile_fields(profile: str) -> Union[str, None]:
+    """
+    Returns the fields parameter for a profile
+
+    Args:
+        profile (str): Key of FEED_PROFILES
+
+    Raises:
+        ValueError: If the profile does not exist
+
+    Returns:
+        Union[str, None]: Comma separated key names, None for 'full'
+    """
+    if profile not in FEED_PROFILES:
+        raise ValueError(f'unknown feed profile {profile!r}, expected one of {list(FEED_PROFILES)}')
+
+    names = FEED_PROFILES[profile]
+    if names is None:
+        return None
+    return ','.join(dict.fromkeys(names))
+
+
+def project_feed(data: dict, names: Iterable[str]):
+    """
+    Applies the fields filter locally. Used to cut a full feed (from
+    the feed cache) down to a profile and in tests
+
+    Args:
+        data (dict): Game dictionary (or any part of it)
+        names (Iterable[str]): Key names to keep
+
+    Returns:
+        The filtered copy of data
+    """
+    if not isinstance(names, (set, frozenset)):
+        names = frozenset(names)
+
+    if isinstance(data, dict):
+        return {key: project_feed(value, names) for key, value in data.items() if key in names}
+    if isinstance(data, list):
+        return [project_feed(item, names) for item in data]
+    return data
@@ -11,6 +11,17 @@ Important classes are:
         represents each pitch in an at bat. Also has data for pickoffs,
         mound visits, pitching changes, and pinch players
 
+Game(data, lazy=True) only builds the child objects of Game, LiveData,
+Plays, AllPlays and PlayEvents the first time they are read, and
+allPlays, playEvents and runners become LazyLists that wrap each item
+when it is indexed. Attribute names and values are the same in both
+modes.
+
+Game(data, profile='scoreboard') builds a game from a partial feed
+downloaded with Game.get_dict(profile=...) (see at_bat.feed_profiles).
+It is always lazy and parts of the feed that were not downloaded are
+None or empty.
+
 Example
 from src.statsapi_plus import get_game_dict
 from src.game import Game
@@ -19,17 +30,19 @@ from src.game import Game
 # pylint: disable=C0103, C0111
 
 import os
-from typing import List, Tuple, Union
+from collections.abc import Sequence
+from typing import Any, Callable, List, Tuple, Union
 import math
 from datetime import datetime, timedelta, timezone
-from time import sleep
 import requests
 from tzlocal import get_localzone
 import pytz
-import statsapi # pylint: disable=E0401
 from tqdm import tqdm
 from dateutil import tz
 from at_bat.statsapi_plus import get_daily_gamepks
+from at_bat.feed_cache import get_feed_cache
+from at_bat.http_client import get_client
+from at_bat.feed_profiles import FEED_PROFILES, profile_fields, project_feed
 
 MARGIN_OF_ERROR = 0.25/12 # Margin of Error of hawkeye system (inches)
 
@@ -41,20 +54,133 @@ KNOWN_GAMESTATES = ('S','P','PI','PL','PO','PR','PY','PW','I','IO','IR',
                     'NQ','TR','UR','O','OO','OR','OT','F','FG','FO',
                     'FR','FT','FW','DI','DC','DR','CR','CG','CI')
 
+
+class _LazyChild:
+    """
+    Class attribute that builds a child object from the raw dictionary
+    the first time it is read and caches it on the instance. Instances
+    that set the attribute themselves (eager mode) never reach it.
+    """
+    def __init__(self, build: Callable[[Any], Any]):
+        self.build = build
+        self.name: str = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = self.build(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class _LazySlot(_LazyChild):
+    """
+    _LazyChild for subclasses of classes with __slots__. The value is
+    stored in the slot of the same name on the base class.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = next(vars(base)[name] for base in owner.__mro__[1:] if name in vars(base))
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.build(instance)
+            self.slot.__set__(instance, value)
+            return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+
+def _optional(cls, data, **kwargs):
+    if data is None:
+        return None
+    return cls(data, **kwargs)
+
+
+class LazyList(Sequence):
+    """
+    A read only list of raw dictionaries that are only converted into
+    their class when the item is read. Converted items are cached so
+    the same object is returned every time.
+    """
+    def __init__(self, items: list, factory: Callable[[dict], Any]):
+        self._items = items
+        self._factory = factory
+        self._cache = [None] * len(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+
+        item = self._cache[index]
+        if item is None:
+            item = self._factory(self._items[index])
+            self._cache[index] = item
+        return item
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, LazyList)):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
 class Game:
     """
     Initial class that the user interacts with to get the class started.
     The argument for this class is the dictionary returned by
     either statsapi.get() or get_game_dict() (both return the same
     thing).
+
+    If lazy is True, liveData and everything under it is only built
+    when it is first read.
+
+    profile is the feed profile data was downloaded with. Anything
+    other than 'full' is built lazily.
     """
-    def __init__(self, data:dict):
-        self.gameData = data['gameData']
-        self.liveData = data['liveData']
-        self.metaData = data['metaData']
+    gameData = _LazyChild(lambda self: GameData(self._game_dict['gameData']))
+    liveData = _LazyChild(lambda self: _optional(LiveData, self._game_dict.get('liveData', None), lazy=True))
+    metaData = _LazyChild(lambda self: _optional(MetaData, self._game_dict.get('metaData', None)))
+
+    def __init__(self, data:dict, lazy: bool = False, profile: str = 'full'):
+        if profile not in FEED_PROFILES:
+            raise ValueError(f'unknown feed profile {profile!r}')
+
         self.gamepk = data.get('gamePk', None)
+        self.profile = profile
         self._game_dict = data
-        self._children()
+
+        if profile != 'full':
+            # missing subtrees are only an error when they are read
+            lazy = True
+
+        if lazy is False:
+            self.gameData = data['gameData']
+            self.liveData = data['liveData']
+            self.metaData = data['metaData']
+            self._children()
 
         if self.gameData.status.statusCode not in KNOWN_GAMESTATES:
             self._unknown_statuscode()
@@ -95,19 +221,47 @@ class Game:
     def __repr__(self):
         return f'{self.gamepk}'
 
+    @property
+    def fingerprint(self) -> Tuple[str, int]:
+        """
+        feed_fingerprint() of the dictionary the game was built from
+        """
+        return feed_fingerprint(self._game_dict)
+
+    def pitch_arrays(self) -> dict:
+        """
+        Returns every pitch in the game as typed NumPy columns, one for
+        each field in GameParser.field_names. See at_bat.pitch_arrays
+
+        Returns:
+            dict: field name to NumPy array or pandas Categorical
+        """
+        # pylint: disable=C0415
+        from at_bat.pitch_arrays import extract_pitch_arrays
+        return extract_pitch_arrays(self)
+
     def __eq__(self, other):
         if self._game_dict == other._game_dict:
             return True
         return False
 
     @classmethod
-    def get_game_from_pk(cls, gamepk: int, iso_time: str = None, delay_seconds: int = 0) -> 'Game':
+    def get_game_from_pk(cls, gamepk: int, iso_time: str = None, delay_seconds: int = 0,
+        lazy: bool = False, profile: str = 'full') -> 'Game':
         """
         Returns a game instance for the given game based of the gamePk
 
         Args:
             gamepk (int): gamepk of the game
             delay_seconds (int): Delay in seconds
+            lazy (bool, optional): Only build child objects when they
+                are read. Defaults to False.
+            profile (str, optional): Feed profile to download (see
+                at_bat.feed_profiles). Defaults to 'full'.
+
+        Raises:
+            requests.exceptions.RetryError: If the game could not be
+                downloaded
 
         Returns:
             Game: Game class instance
@@ -115,54 +269,73 @@ class Game:
         if gamepk is None:
             raise ValueError('gamePk not provided')
 
+        kwargs = {} if profile == 'full' else {'profile': profile}
+
         if iso_time is not None:
-            game_dict = cls.get_dict(gamepk=gamepk, iso_time=iso_time)
-            return Game(game_dict)
+            game_dict = cls.get_dict(gamepk=gamepk, iso_time=iso_time, **kwargs)
+        else:
+            game_dict = cls.get_dict(gamepk=gamepk, delay_seconds=delay_seconds, **kwargs)
 
-        game_dict = cls.get_dict(gamepk=gamepk, delay_seconds=delay_seconds)
-        return Game(game_dict)
+        if game_dict is None:
+            raise requests.exceptions.RetryError(f'could not download game {gamepk}')
+        return Game(game_dict, lazy=lazy, profile=profile)
 
     @classmethod
     def get_dict(cls, gamepk: int = None, iso_time: Union[str, None] = None,
-        delay_seconds: Union[int, None] = 0) -> dict:
+        delay_seconds: Union[int, None] = 0, profile: str = 'full') -> dict:
         """
         Returns the game data for a given gamePk. If time is provided, the game
         data at that time is returned. If time is not provided, the game data
-        at the current time is returned.
+        at the current time is returned. Final games are read from and saved
+        to the feed cache when it is turned on (see at_bat.feed_cache).
 
         Args:
             gamepk (int): gamepk for the desired game. Defaults to None.
             time (str, optional): time (ISO 8601). Defaults to None.
             delay_seconds (int, optional): number of seconds to be delayed.
                 Defaults to 0.
+            profile (str, optional): Only download the parts of the feed
+                in this profile (see at_bat.feed_profiles). Partial
+                feeds are not cached. Defaults to 'full'.
 
         Raises:
             ValueError: No gamepk  provided
-            MaxRetriesError: Max retries reached
 
         Returns:
-            dict: The game data for the given gamePk
+            dict: The game data for the given gamePk. None if the
+                request still failed after the client's retries
         """
-        max_retries = 10
-
         if gamepk is None:
             raise ValueError('gamePk not provided')
 
+        fields = profile_fields(profile)
+
         if iso_time is not None:
             delay_time = _get_utc_time_from_zulu(iso_time)
         else:
             delay_time = _get_utc_time(delay_seconds=delay_seconds)
 
-        for i in range(max_retries):
-            try:
-                data = statsapi.get('game',
-                    {'gamePk': gamepk, 'timecode': delay_time},
-                    request_kwargs={'timeout': 10}, force=True)
+        feed_cache = get_feed_cache()
+        if feed_cache is not None:
+            data = feed_cache.get(gamepk, delay_time)
+            if data is not None:
+                if fields is not None:
+                    data = project_feed(data, FEED_PROFILES[profile])
                 return data
-            except requests.exceptions.RequestException:
-                print(f'RequestException ({i+1}/{max_retries})')
-                # print(f'Error: {e}')
-                sleep(min(2**i, 30))  # Exponential backoff
+
+        params = {'gamePk': gamepk, 'timecode': delay_time}
+        if fields is not None:
+            params['fields'] = fields
+
+        try:
+            # retries, backoff and error counts are handled by the client
+            data = get_client().get('game', params, force=True)
+        except requests.exceptions.RequestException:
+            return None
+
+        if feed_cache is not None and fields is None:
+            feed_cache.put(gamepk, data)
+        return data
 
 class GameData:
     """
@@ -171,11 +344,11 @@ class GameData:
     def __init__(self, gameData):
         # comment
         self._gameData = gameData
-        self.game = gameData['game']
+        self.game = gameData.get('game', None)
         self.datetime = gameData['datetime']
         self.status = gameData['status']
         self.teams = gameData['teams']
-        self.players = gameData['players']
+        self.players = gameData.get('players', None)
         self.venue = gameData['venue']
         self.review = gameData.get('review', None)
         self.abs_challenges = gameData.get('absChallenges', None)
@@ -472,13 +645,20 @@ class PrimaryDatacaster:
 
 
 class LiveData:
-    def __init__(self, liveData):
+    plays = _LazyChild(lambda self: _optional(Plays, self._liveData.get('plays', None), lazy=True))
+    linescore = _LazyChild(lambda self: _optional(Linescore, self._liveData.get('linescore', None)))
+    boxscore = _LazyChild(lambda self: _optional(Boxscore, self._liveData.get('boxscore', None)))
+    decisions = _LazyChild(lambda self: _optional(Decisions, self._liveData.get('decisions', None)))
+
+    def __init__(self, liveData, lazy: bool = False):
         self._liveData = liveData
-        self.plays = liveData.get('plays', None)
-        self.linescore = liveData.get('linescore', None)
-        self.boxscore = liveData.get('boxscore', None)
-        self.decisions = liveData.get('decisions', None)
-        self._children()
+
+        if lazy is False:
+            self.plays = liveData.get('plays', None)
+            self.linescore = liveData.get('linescore', None)
+            self.boxscore = liveData.get('boxscore', None)
+            self.decisions = liveData.get('decisions', None)
+            self._children()
 
     def _children(self):
         if self.plays is not None:
@@ -500,11 +680,18 @@ class LiveData:
 
 
 class Plays:
-    def __init__(self, plays):
+    currentPlay = _LazyChild(lambda self: _optional(AllPlays, self._test.get('currentPlay', None), lazy=True))
+
+    def __init__(self, plays, lazy: bool = False):
         self._test = plays
-        self.allPlays: List[AllPlays] = [AllPlays(play) for play in plays['allPlays']]
-        self.currentPlay = plays.get('currentPlay', None)
-        self._children()
+
+        if lazy is False:
+            self.allPlays: List[AllPlays] = [AllPlays(play) for play in plays['allPlays']]
+            self.currentPlay = plays.get('currentPlay', None)
+            self._children()
+        else:
+            # partial feeds may only have currentPlay
+            self.allPlays = LazyList(plays.get('allPlays', []), lambda play: AllPlays(play, lazy=True))
 
     def _children(self):
         if self.currentPlay is not None:
@@ -515,20 +702,30 @@ class AllPlays:
     """
     Holds data for each at bat
     """
-    def __init__(self, allPlays: dict):
+    result = _LazyChild(lambda self: Result(self._allPlays.get('result', None)))
+    about = _LazyChild(lambda self: About(self._allPlays.get('about', None)))
+    count = _LazyChild(lambda self: Count(self._allPlays.get('count', None)))
+    matchup = _LazyChild(lambda self: Matchup(self._allPlays.get('matchup', None)))
+
+    def __init__(self, allPlays: dict, lazy: bool = False):
         self._allPlays = allPlays
-        self.result = allPlays.get('result', None)
-        self.about = allPlays.get('about', None)
-        self.count = allPlays.get('count', None)
-        self.matchup = allPlays.get('matchup', None)
         self.pitchIndex = allPlays.get('pitchIndex', None)
         self.actionIndex: List[int] = allPlays.get('actionIndex', None)
-        self.runners = allPlays.get('runners', None)
-        events = allPlays.get('playEvents', None)
-        self.playEvents: List[PlayEvents] = [PlayEvents(i) for i in events]
         self.playEndTime = allPlays.get('playEndTime', None)
         self.atBatIndex = allPlays.get('atBatIndex', None)
-        self._children()
+        events = allPlays.get('playEvents', None)
+
+        if lazy is False:
+            self.result = allPlays.get('result', None)
+            self.about = allPlays.get('about', None)
+            self.count = allPlays.get('count', None)
+            self.matchup = allPlays.get('matchup', None)
+            self.runners = allPlays.get('runners', None)
+            self.playEvents: List[PlayEvents] = [PlayEvents(i) for i in events]
+            self._children()
+        else:
+            self.runners = LazyList(allPlays.get('runners', None) or [], RunnersMovement)
+            self.playEvents = LazyList(events or [], lambda event: PlayEvents(event, lazy=True))
 
     def _children(self):
         self.result = Result(self.result)
@@ -578,6 +775,8 @@ class About:
 
 
 class Count:
+    __slots__ = ('balls', 'strikes', 'outs')
+
     def __init__(self, count):
         self.balls = int(count.get('balls', None))
         self.strikes = int(count.get('strikes', None))
@@ -621,6 +820,8 @@ class Matchup:
 
 
 class RunnersMovement:
+    __slots__ = ('movement', 'details', 'create')
+
     def __init__(self, runners):
         self.movement = runners.get('movement', None)
         self.details = runners.get('details', None)
@@ -694,12 +895,17 @@ class Splits:
 class PlayEvents:
     MOE = MARGIN_OF_ERROR
 
-    def __init__(self, playEvents: dict):
+    __slots__ = ('_playEvents', 'details', 'count', 'pitch_data', 'hit_data', 'index',
+        'playId', 'pitch_number', 'start_time', 'end_time', 'is_pitch',
+        'is_base_running_play', 'type')
+
+    def __new__(cls, playEvents: dict = None, lazy: bool = False): # pylint: disable=W0613
+        if lazy is True and cls is PlayEvents:
+            cls = _LazyPlayEvents
+        return super().__new__(cls)
+
+    def __init__(self, playEvents: dict, lazy: bool = False):
         self._playEvents = playEvents
-        self.details = playEvents.get('details', None)
-        self.count = playEvents.get('count', None)
-        self.pitch_data = playEvents.get('pitchData', None)
-        self.hit_data = playEvents.get('hitData', None)
         self.index = playEvents.get('index', None)
         self.playId = playEvents.get('playId', None)
         self.pitch_number = playEvents.get('pitchNumber', None)
@@ -715,7 +921,12 @@ class PlayEvents:
         if self.index is not None:
             self.index = int(self.index)
 
-        self._children()
+        if lazy is False:
+            self.details = playEvents.get('details', None)
+            self.count = playEvents.get('count', None)
+            self.pitch_data = playEvents.get('pitchData', None)
+            self.hit_data = playEvents.get('hitData', None)
+            self._children()
 
     def _children(self):
         if self.details is not None:
@@ -741,7 +952,24 @@ class PlayEvents:
         return self.details.description
 
 
+class _LazyPlayEvents(PlayEvents):
+    """
+    PlayEvents(lazy=True). Builds details, count, pitch_data and
+    hit_data when they are first read
+    """
+    __slots__ = ()
+
+    details = _LazySlot(lambda self: _optional(Details, self._playEvents.get('details', None)))
+    count = _LazySlot(lambda self: _optional(Count, self._playEvents.get('count', None)))
+    pitch_data = _LazySlot(lambda self: _optional(PitchData, self._playEvents.get('pitchData', None)))
+    hit_data = _LazySlot(lambda self: _optional(HitData, self._playEvents.get('hitData', None)))
+
+
 class Details:
+    __slots__ = ('call', 'description', 'event', 'eventType', 'code', 'ballColor',
+        'trailColor', 'isPitch', 'isBaseRunningPlay', 'isStrike', 'isBall', 'type',
+        'isOut', 'hasReview')
+
     def __init__(self, details):
         self.call = details.get('call', None)
         self.description = details.get('description', None)
@@ -774,6 +1002,9 @@ class PitchType:
 
 
 class PitchData:
+    __slots__ = ('_pitchData', 'startSpeed', 'endSpeed', '_sz_top', '_sz_bot',
+        'coordinates', 'breaks', 'zone', 'typeConfidence', 'plateTime', 'extension')
+
     def __init__(self, pitchData):
         self._pitchData = pitchData
         self.startSpeed = pitchData.get('startSpeed', None)
@@ -825,6 +1056,19 @@ class PitchCoordinates:
     PX_MIN = (-PLATE_WIDTH_FEET / 2) - BALL_RADIUS_FEET
     PX_MAX = (PLATE_WIDTH_FEET / 2) + BALL_RADIUS_FEET
 
+    # Fields read from the coordinates dictionary and converted to
+    # float. Missing fields are None
+    FLOAT_FIELDS = (
+        'aX', 'aY', 'aZ', # Acceleration in X,Y,Z directions
+        'pfxX', 'pfxZ', # Movement of Pitch at y=40ft
+        'pX', 'pZ', # Pitch Location
+        'vX0', 'vY0', 'vZ0', # Velocity of Pitch at Release in X,Y,Z directions
+        'x', 'y', # Old Pitch Location Data
+        'x0', 'y0', 'z0', # Position of Pitch at Release in X,Y,Z directions
+    )
+
+    __slots__ = ('pX_min', 'pX_max', 'sZ_top', 'sZ_bot', 'pZ_max', 'pZ_min') + FLOAT_FIELDS
+
     def __init__(self, coor, sz_top, sz_bot):
 
         self.pX_min = self.PX_MIN
@@ -838,79 +1082,11 @@ class PitchCoordinates:
         self.pZ_max = self.sZ_top + self.BALL_RADIUS_FEET
         self.pZ_min = self.sZ_bot - self.BALL_RADIUS_FEET
 
-        # Acceleration in X,Y,Z directions
-        self.aX = coor.get('aX', None)
-        self.aY = coor.get('aY', None)
-        self.aZ = coor.get('aZ', None)
-
-        if self.aX is not None:
-            self.aX = float(self.aX)
-
-        if self.aY is not None:
-            self.aY = float(self.aY)
-
-        if self.aZ is not None:
-            self.aZ = float(self.aZ)
-
-        # Movement of Pitch at y=40ft
-        self.pfxX = coor.get('pfxX', None)
-        self.pfxZ = coor.get('pfxZ', None)
-
-        if self.pfxX is not None:
-            self.pfxX = float(self.pfxX)
-
-        if self.pfxZ is not None:
-            self.pfxZ = float(self.pfxZ)
-
-        # Pitch Location
-        self.pX = coor.get('pX', None)
-        self.pZ = coor.get('pZ', None)
-
-        if self.pX is not None:
-            self.pX = float(self.pX)
-
-        if self.pZ is not None:
-            self.pZ = float(self.pZ)
-
-        # Velocity of Pitch at Release in X,Y,Z directions
-        self.vX0 = coor.get('vX0', None)
-        self.vY0 = coor.get('vY0', None)
-        self.vZ0 = coor.get('vZ0', None)
-
-        if self.vX0 is not None:
-            self.vX0 = float(self.vX0)
-
-        if self.vY0 is not None:
-            self.vY0 = float(self.vY0)
-
-        if self.vZ0 is not None:
-            self.vZ0 = float(self.vZ0)
-
-        # Old Pitch Location Data
-        self.x = coor.get('x', None)
-        self.y = coor.get('y', None)
-
-        if self.x:
-            self.x = float(self.x)
-        if self.y:
-            self.y = float(self.y)
-
-        # Position of Pitch at Release in X,Y,Z directions
-        self.x0 = coor.get('x0', None)
-        self.y0 = coor.get('y0', None)
-        self.z0 = coor.get('z0', None)
-
-        if self.x0 is not None:
-            self.x0 = float(self.x0)
-
-        if self.y0 is not None:
-            self.y0 = float(self.y0)
-
-        if self.z0 is not None:
-            self.z0 = float(self.z0)
-
-        #self.above_zone = self.pZ - self.pZ_top
-        #self.below_zone = self.pZ_bot - self.pZ
+        for field in self.FLOAT_FIELDS:
+            value = coor.get(field, None)
+            if value is not None:
+                value = float(value)
+            setattr(self, field, value)
 
         # no children
 
@@ -921,6 +1097,9 @@ class PitchCoordinates:
 
 
 class Breaks:
+    __slots__ = ('breakAngle', 'breakLength', 'breakY', 'breakVertical',
+        'breakVerticalInduced', 'breakHorizontal', 'spinRate', 'spinDirection')
+
     def __init__(self, breaks):
         self.breakAngle = breaks.get('breakAngle', None)
         self.breakLength = breaks.get('breakLength', None)
@@ -934,6 +1113,9 @@ class Breaks:
 
 
 class HitData:
+    __slots__ = ('launchSpeed', 'launchAngle', 'totalDistance', 'trajectory',
+        'hardness', 'location', 'coordinates')
+
     def __init__(self, hitData):
         self.launchSpeed = hitData.get('launchSpeed', None)
         self.launchAngle = hitData.get('launchAngle', None)
@@ -1321,6 +1503,43 @@ class MetaData:
         self.logical_events = metaData.get('logicalEvents', None)
 
 
+def feed_fingerprint(data: dict) -> Tuple[str, int]:
+    """
+    Returns a fingerprint of a game dictionary that is cheap enough to
+    check before building any objects: metaData.timeStamp plus a hash
+    of the parts of the feed that change with every pitch. If two
+    feeds have the same fingerprint nothing needs to be rebuilt.
+
+    Args:
+        data (dict): Game dictionary
+
+    Returns:
+        Tuple[str, int]: (timeStamp, content hash)
+    """
+    meta_data = data.get('metaData', None) or {}
+    live_data = data.get('liveData', None) or {}
+    plays = live_data.get('plays', None) or {}
+    current_play = plays.get('currentPlay', None) or {}
+    linescore = live_data.get('linescore', None) or {}
+    teams = linescore.get('teams', None) or {}
+    status = (data.get('gameData', None) or {}).get('status', None) or {}
+
+    content = (
+        status.get('statusCode', None),
+        len(plays.get('allPlays', None) or ()),
+        current_play.get('atBatIndex', None),
+        len(current_play.get('playEvents', None) or ()),
+        (current_play.get('about', None) or {}).get('isComplete', None),
+        linescore.get('balls', None),
+        linescore.get('strikes', None),
+        linescore.get('outs', None),
+        (teams.get('away', None) or {}).get('runs', None),
+        (teams.get('home', None) or {}).get('runs', None),
+    )
+
+    return (meta_data.get('timeStamp', None), hash(content))
+
+
 def _convert_zulu_to_local(zulu_time_str) -> Tuple[int, int, str]:
     if zulu_time_str is None:
         return None
@@ -1355,11 +1574,17 @@ def _get_division(code: str) -> Union[str, None]: # pylint: disable=R0911
 
 
 def get_games() -> List[Game]:
+    """
+    Returns every game of the day. Games that could not be downloaded
+    are left out
+    """
     gamepks = get_daily_gamepks()
     games = []
 
     for pk in tqdm(gamepks):
-        data = statsapi.get('game', {'gamePk': pk})
+        data = Game.get_dict(gamepk=pk)
+        if data is None:
+            continue
         games.append(Game(data))
 
     return games
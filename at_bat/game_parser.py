@@ -1,14 +1,16 @@
 import csv
+import os
 
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+import numpy as np
 import pandas as pd
 
-from at_bat.game import Game, AllPlays
+from at_bat.game import Game, AllPlays, PlayEvents
 from at_bat.runners import Runners
-from at_bat.statsapi_plus import get_expected_values_dataframe
-from at_bat.umpire import Umpire
+from at_bat.expected_values import score_batted_balls
+from at_bat.state_tables import runners_bitmask
+from at_bat.umpire import calculate_favors_batch
 
-xdf = get_expected_values_dataframe()
 def batted_ball_expected_values(at_bat_event_type: str, exit_velo: float, launch_angle: int) -> Tuple[float, float]:
     """
     Returns expected batting average and expected slugging percentage
@@ -20,24 +22,245 @@ def batted_ball_expected_values(at_bat_event_type: str, exit_velo: float, launch
         launch_angle (int): batted ball's launch angle
 
     Returns:
-        Tuple[float, float]: xba, xslg
+        Tuple[float, float]: xba, xslg. (None, None) if there is no
+            value for the batted ball
     """
-    if (exit_velo is not None) and (launch_angle is not None):
-        exit_velo = round(exit_velo, 1)
-        launch_angle = round(launch_angle, 0)
-        row = xdf.query('(exit_velocity == @exit_velo) & (launch_angle == @launch_angle)')
-        xba = float(row['xba'].iloc[0])
-        xslg = float(row['xslg'].iloc[0])
-        return (xba, xslg)
-    if at_bat_event_type is None:
-        return (None, None)
-    if at_bat_event_type in ('strikeout'):
-        return (0, 0)
-    if at_bat_event_type in ('walk', 'hit_by_pitch', 'catchers_inferf'):
-        return (None, None)
-    if (exit_velo is None) or (launch_angle is None):
+    xba, xslg = score_batted_balls([at_bat_event_type], [exit_velo], [launch_angle])
+
+    if np.isnan(xba[0]):
         return (None, None)
-    return (None, None)
+    return (float(xba[0]), float(xslg[0]))
+
+
+def game_fields(game: Game) -> dict:
+    """
+    Returns the game level fields that are the same for every pitch
+
+    Args:
+        game (Game): The game
+
+    Returns:
+        dict: field name to value
+    """
+    return {
+        'gamepk': game.gamepk,
+
+        # game.gameData
+        'game_time': game.gameData.datetime.date_time,
+        'stadium': game.gameData.venue.name,
+        'venue_id': game.gameData.venue.id,
+        'time_zone': game.gameData.venue.timeZone.offset,
+        'field_type': game.gameData.venue.fieldInfo.turfType,
+        'roof_type': game.gameData.venue.fieldInfo.roofType,
+        'weather_sky': game.gameData.weather.condition,
+        'temperature': game.gameData.weather.temp,
+        'wind': game.gameData.weather.wind,
+        'attendance': game.gameData.gameInfo.attendance,
+        'game_duration': game.gameData.gameInfo.gameDurationMinutes,
+        'away_final_score': game.liveData.linescore.teams.away.runs,
+        'home_final_score': game.liveData.linescore.teams.home.runs,
+        'innings_final': game.liveData.linescore.currentInning,
+    }
+
+
+class PitchWalker:
+    """
+    Walks the pitches of a game and keeps the state the feed does not
+    give for every pitch: the score before the at bat, the runs in the
+    half inning, the count and the runners. GameParser and
+    at_bat.pitch_arrays both use it so their rows always agree.
+
+    For every at bat call start_at_bat(), iterate pitches() and then
+    call end_at_bat().
+    """
+    def __init__(self, game: Game):
+        self.game = game
+        self.runners: Runners = Runners()
+        self.away_score: int = 0
+        self.home_score: int = 0
+
+        self.inning: int = None
+        self.is_top_inning: bool = None
+        self.last_is_top_inning: bool = None
+        self.runs_at_start: int = 0 # runs at start of half inning
+        self.runs_to_start: int = 0 # runs since the start of the half inning
+        self.total_half_inning_runs: int = 0 # total runs in the half inning
+
+    @property
+    def runs_to_end(self) -> int:
+        """
+        Returns:
+            int: Runs still to be scored in the half inning
+        """
+        return self.total_half_inning_runs - self.runs_to_start
+
+    def half_inning_runs(self, inning: int, is_top_inning: bool) -> int:
+        """
+        Returns the runs scored in a half inning from the linescore
+
+        Args:
+            inning (int): Inning
+            is_top_inning (bool): Top (away team batting) or bottom
+
+        Returns:
+            int: Runs scored
+        """
+        if is_top_inning:
+            runs = self.game.liveData.linescore.innings[inning - 1].away.runs
+        else:
+            runs = self.game.liveData.linescore.innings[inning - 1].home.runs
+
+        if runs is None:
+            # There was an error where the runs were not defined
+            # for a half inning (2023-04-28 MIA vs CLE B9 I believe)
+            runs = 0
+
+        return runs
+
+    def save_state(self) -> tuple:
+        """
+        Returns:
+            tuple: Everything restore_state() needs to go back to now
+        """
+        return (
+            list(self.runners.runners),
+            self.runners.isTopInning,
+            self.runners.inning,
+            self.away_score,
+            self.home_score,
+            self.inning,
+            self.is_top_inning,
+            self.last_is_top_inning,
+            self.runs_at_start,
+            self.runs_to_start,
+            self.total_half_inning_runs,
+        )
+
+    def restore_state(self, state: tuple):
+        """
+        Args:
+            state (tuple): Return value of save_state()
+        """
+        (runners, self.runners.isTopInning, self.runners.inning,
+            self.away_score, self.home_score, self.inning,
+            self.is_top_inning, self.last_is_top_inning,
+            self.runs_at_start, self.runs_to_start,
+            self.total_half_inning_runs) = state
+        self.runners.runners = list(runners)
+
+    def start_at_bat(self, at_bat: AllPlays):
+        """
+        Moves the state to the start of an at bat
+
+        Args:
+            at_bat (AllPlays): The at bat
+        """
+        self.inning = at_bat.about.inning
+        self.is_top_inning = at_bat.about.isTopInning
+
+        self.runners.new_at_bat(at_bat)
+
+        # runs to start/end of inning
+        self.total_half_inning_runs = self.half_inning_runs(self.inning, self.is_top_inning)
+
+        if self.last_is_top_inning != self.is_top_inning:
+            self.last_is_top_inning = self.is_top_inning
+
+            if self.is_top_inning:
+                self.runs_at_start = self.away_score
+            else:
+                self.runs_at_start = self.home_score
+
+        if self.is_top_inning:
+            self.runs_to_start = self.away_score - self.runs_at_start
+        else:
+            self.runs_to_start = self.home_score - self.runs_at_start
+
+    def pitches(self, at_bat: AllPlays) -> Iterator[Tuple[PlayEvents, int, int]]:
+        """
+        Yields every pitch of an at bat with the count before it. The
+        runners are moved up to each pitch before it is yielded
+
+        Args:
+            at_bat (AllPlays): The at bat, after start_at_bat()
+
+        Yields:
+            Tuple[PlayEvents, int, int]: pitch, balls, strikes
+        """
+        balls = 0
+        strikes = 0
+
+        if len(at_bat.playEvents) == 0:
+            # No pitches thrown in the at bat
+            # Santos to Olivares | 2023-09-05 | B9 (walkoff balk)
+            return
+
+        at_bat_last_pitch = at_bat.playEvents[-1].index
+
+        for i, play_event in enumerate(at_bat.playEvents):
+
+            if i != at_bat_last_pitch:
+                # igonres the last pitch of the at bat
+                # ball in play or what not
+                # handled by end_at_bat
+                self.runners.process_runner_movement(at_bat.runners, play_event.index)
+
+            if not play_event.is_pitch:
+                continue
+
+            yield play_event, balls, strikes
+
+            # Placed after so the count recorded is before the pitch
+            if play_event.details.isBall:
+                balls += 1
+
+            if play_event.details.isStrike:
+                if play_event.details.code == 'F' and strikes == 2:
+                    pass # Foul on 2 strikes, no change in count
+                    # bunt foul ball on 2 strikes should be caught
+                    # by the next at bat event
+                else:
+                    strikes += 1
+
+    def end_at_bat(self, at_bat: AllPlays):
+        """
+        Moves the state to the end of an at bat
+
+        Args:
+            at_bat (AllPlays): The at bat
+        """
+        self.runners.end_at_bat(at_bat)
+
+        self.away_score = at_bat.result.awayScore
+        self.home_score = at_bat.result.homeScore
+
+
+def csv_append_columns(file_path: str) -> List[str]:
+    """
+    Returns the columns to write when appending rows to a pitch csv.
+    That is the header already in the file, so rows appended to a
+    pitch.csv written before the id columns were added still line up
+    with it. New or empty files get GameParser.field_names.
+
+    Args:
+        file_path (str): Pitch csv
+
+    Raises:
+        ValueError: If the header has columns GameParser does not write
+
+    Returns:
+        List[str]: Column names in file order
+    """
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return list(GameParser.field_names)
+
+    with open(file_path, 'r', newline='', encoding='UTF-8') as csv_file:
+        header = next(csv.reader(csv_file), [])
+
+    unknown = [name for name in header if name not in GameParser.field_names]
+    if unknown:
+        raise ValueError(f'{file_path} has columns {unknown} that are not pitch fields')
+    return header
 
 
 class GameParser:
@@ -117,7 +340,13 @@ class GameParser:
             'spin_rate',
             'spin_direction',
             'umpire_wp_favor',
-            'umpire_run_favor'
+            'umpire_run_favor',
+            # ids are last so rows appended to an older pitch.csv
+            # line up with its columns, see csv_append_columns()
+            'venue_id',
+            'at_bat_index',
+            'batter_id',
+            'pitcher_id',
         ]
 
     def __init__(self, game: Game = None, gamepk: int = None, iso_time: str = None, delay_seconds: int = 60):
@@ -131,255 +360,377 @@ class GameParser:
             elif delay_seconds is not None:
                 self.game = Game.get_game_from_pk(gamepk, delay_seconds=delay_seconds)
 
-        self._runners: Runners = Runners()
-        self._away_score = 0
-        self._home_score = 0
-
-        self._inning: int = None
-        self._is_top_inning: bool = None
-        self._last_is_top_inning: bool = None
-        self._runs_at_start: int = 0 # runs at start of half inning
-        self._runs_to_start: int = 0 # runs since the start of the half inning
-        self._total_half_inning_runs: int = 0 # total runs in the half inning
+        self._walker = PitchWalker(self.game)
 
         self._dict_game = {}
         self._dict_at_bat = {}
         self._dict_pitch = {}
         self.game_data: List[dict] = []
 
-        self._dict_game['gamepk'] = self.gamepk
+        # bookkeeping for advance(). One entry per parsed at bat:
+        # the first row of the at bat, the parser state before the
+        # at bat and a cheap signature to tell if the at bat changed
+        self._at_bat_rows: List[int] = []
+        self._at_bat_states: List[tuple] = []
+        self._at_bat_signatures: List[tuple] = []
 
-        # game.gameData
-        self._dict_game['game_time'] = self.game.gameData.datetime.date_time
-        self._dict_game['stadium'] = self.game.gameData.venue.name
-        self._dict_game['time_zone'] = self.game.gameData.venue.timeZone.offset
-        self._dict_game['field_type'] = self.game.gameData.venue.fieldInfo.turfType
-        self._dict_game['roof_type'] = self.game.gameData.venue.fieldInfo.roofType
-        self._dict_game['weather_sky'] = self.game.gameData.weather.condition
-        self._dict_game['temperature'] = self.game.gameData.weather.temp
-        self._dict_game['wind'] = self.game.gameData.weather.wind
-        self._dict_game['attendance'] = self.game.gameData.gameInfo.attendance
-        self._dict_game['game_duration'] = self.game.gameData.gameInfo.gameDurationMinutes
-        self._dict_game['away_final_score'] = self.game.liveData.linescore.teams.away.runs
-        self._dict_game['home_final_score'] = self.game.liveData.linescore.teams.home.runs
-        self._dict_game['innings_final'] = self.game.liveData.linescore.currentInning
+        # False after advance() if the new copy of the game did not
+        # change any rows
+        self.changed: bool = True
+
+        self._dict_game.update(self._game_fields())
 
         self._iterate_at_bats()
+        self._calculate_umpire_favors(self.game_data)
+        self._calculate_expected_values(self.game_data)
         self.dataframe: pd.DataFrame = pd.DataFrame(self.game_data)
 
-    def _iterate_at_bats(self):
-        for at_bat in self.game.liveData.plays.allPlays:
-            # half inning total runs
-            self._inning = at_bat.about.inning
-
-            # if self.inning >= 9:
+    def _game_fields(self) -> dict:
+        return game_fields(self.game)
+
+    def advance(self, game: Game) -> 'GameParser':
+        """
+        Updates the parser with a newer copy of the same game. Only at
+        bats that are new, were still in progress the last time or
+        have changed since are parsed again, so polling a live game
+        does not re-parse every pitch.
+
+        Args:
+            game (Game): A newer Game object for the same gamepk
+
+        Raises:
+            ValueError: If the game is for a different gamepk
+
+        Returns:
+            GameParser: self
+        """
+        if game.gamepk != self.gamepk:
+            raise ValueError(f'cannot advance {self.gamepk} with {game.gamepk}')
+
+        self.game = game
+        self._walker.game = game
+        all_plays = game.liveData.plays.allPlays
+
+        # re-parse from the first at bat that was still in progress or
+        # has changed since. Every stored at bat is checked because a
+        # scorer can change an older at bat (hit to error, etc.)
+        start = min(len(all_plays), len(self._at_bat_signatures))
+        for i in range(start):
+            old_signature = self._at_bat_signatures[i]
+            if old_signature[0] is not True or old_signature != self._signature(all_plays[i]):
+                start = i
+                break
+
+        if start < len(self._at_bat_signatures):
+            first_row = self._at_bat_rows[start]
+            old_rows = self.game_data[first_row:]
+            self._walker.restore_state(self._at_bat_states[start])
+            del self.game_data[first_row:]
+            del self._at_bat_rows[start:]
+            del self._at_bat_states[start:]
+            del self._at_bat_signatures[start:]
+        else:
+            first_row = len(self.game_data)
+            old_rows = []
+
+        # game level fields (final score, duration, etc.) are on
+        # every row so older rows get updated when they change
+        game_fields = self._game_fields()
+        changed_fields = {key: value for key, value in game_fields.items()
+            if self._dict_game.get(key, None) != value}
+        self._dict_game.update(game_fields)
+        if changed_fields:
+            for row in self.game_data:
+                row.update(changed_fields)
+
+        self._iterate_at_bats(all_plays[start:])
+        new_rows = self.game_data[first_row:]
+        self._calculate_umpire_favors(new_rows)
+        self._calculate_expected_values(new_rows)
+
+        # earlier rows of the current half inning need the latest
+        # total_half_inning_runs
+        refresh_row = self._refresh_half_inning_runs(first_row)
+
+        # the re-parsed at bats usually come out the same between two
+        # polls so the dataframe does not need to be rebuilt
+        self.changed = bool(changed_fields) or refresh_row < first_row or new_rows != old_rows
+        if not self.changed:
+            return self
+
+        if refresh_row == 0:
+            self.dataframe = pd.DataFrame(self.game_data)
+        else:
+            for key, value in changed_fields.items():
+                self.dataframe[key] = value
+            self.dataframe = pd.concat([self.dataframe.iloc[:refresh_row],
+                pd.DataFrame(self.game_data[refresh_row:])], ignore_index=True)
+
+        return self
+
+    def _refresh_half_inning_runs(self, first_row: int) -> int:
+        """
+        Updates total_half_inning_runs/runs_to_end for the rows before
+        first_row that are in the same half inning as first_row
+
+        Returns:
+            int: The first row that was modified (first_row if none)
+        """
+        if first_row == 0 or first_row > len(self.game_data):
+            return first_row
+
+        if first_row < len(self.game_data):
+            half_inning = (self.game_data[first_row]['inning'], self.game_data[first_row]['is_top_inning'])
+        else:
+            half_inning = (self._walker.inning, self._walker.is_top_inning)
+
+        total = self._walker.half_inning_runs(*half_inning)
+
+        row_index = first_row
+        while row_index > 0:
+            row = self.game_data[row_index - 1]
+            if (row['inning'], row['is_top_inning']) != half_inning:
+                break
+            if row['total_half_inning_runs'] == total:
+                break # rows before this one already have it too
+            row['total_half_inning_runs'] = total
+            row['runs_to_end'] = total - row['runs_to_start']
+            row_index -= 1
+
+        return row_index
+
+    @staticmethod
+    def _signature(at_bat: AllPlays) -> tuple:
+        return (
+            at_bat.about.isComplete,
+            len(at_bat.playEvents),
+            at_bat.playEndTime,
+            at_bat.result.eventType,
+            at_bat.result.awayScore,
+            at_bat.result.homeScore,
+            len(at_bat.runners),
+        )
+
+    def _iterate_at_bats(self, all_plays: List[AllPlays] = None):
+        if all_plays is None:
+            all_plays = self.game.liveData.plays.allPlays
+
+        walker = self._walker
+
+        for at_bat in all_plays:
+            self._at_bat_rows.append(len(self.game_data))
+            self._at_bat_states.append(walker.save_state())
+            self._at_bat_signatures.append(self._signature(at_bat))
+
+            # if at_bat.about.inning >= 9:
             #     # ignore potential walk off scenarios that lead
             #     # to abbreviated innings
             #     return
 
-            self._is_top_inning = at_bat.about.isTopInning
-
-            self._runners.new_at_bat(at_bat)
+            walker.start_at_bat(at_bat)
 
             self._dict_at_bat = {}
 
             # runs to start/end of inning
-            if self._is_top_inning:
-                self._total_half_inning_runs = self.game.liveData.linescore.innings[self._inning - 1].away.runs
-            else:
-                self._total_half_inning_runs = self.game.liveData.linescore.innings[self._inning - 1].home.runs
-
-            if self._total_half_inning_runs is None:
-                # There was an error where the runs were not defined
-                # for a half inning (2023-04-28 MIA vs CLE B9 I believe)
-                self._total_half_inning_runs = 0
-
-            self._dict_at_bat['total_half_inning_runs'] = self._total_half_inning_runs
-
-            if self._last_is_top_inning != self._is_top_inning:
-                self._last_is_top_inning = self._is_top_inning
-
-                if self._is_top_inning:
-                    self._runs_at_start = self._away_score
-                else:
-                    self._runs_at_start = self._home_score
-
-            if self._is_top_inning:
-                self._runs_to_start = self._away_score - self._runs_at_start
-            else:
-                self._runs_to_start = self._home_score - self._runs_at_start
-
-            self._dict_at_bat['runs_to_start'] = self._runs_to_start
-            self._dict_at_bat['runs_to_end'] = self._total_half_inning_runs - self._runs_to_start
+            self._dict_at_bat['total_half_inning_runs'] = walker.total_half_inning_runs
+            self._dict_at_bat['runs_to_start'] = walker.runs_to_start
+            self._dict_at_bat['runs_to_end'] = walker.runs_to_end
 
             # atBat.about
             self._dict_at_bat['inning'] = at_bat.about.inning
             self._dict_at_bat['is_top_inning'] = at_bat.about.isTopInning
-            self._dict_at_bat['away_score'] = self._away_score
-            self._dict_at_bat['home_score'] = self._home_score
+            self._dict_at_bat['at_bat_index'] = at_bat.about.atBatIndex
+            self._dict_at_bat['away_score'] = walker.away_score
+            self._dict_at_bat['home_score'] = walker.home_score
 
             # atBat.matchup
             self._dict_at_bat['batter'] = at_bat.matchup.batter.fullName
+            self._dict_at_bat['batter_id'] = at_bat.matchup.batter.id
             self._dict_at_bat['bat_side'] = at_bat.matchup.bat_side.description
             self._dict_at_bat['pitcher'] = at_bat.matchup.pitcher.fullName
+            self._dict_at_bat['pitcher_id'] = at_bat.matchup.pitcher.id
             self._dict_at_bat['pitch_hand'] = at_bat.matchup.pitch_hand.description
 
             self._iterate_pitches(at_bat)
-            self._runners.end_at_bat(at_bat)
-
-            self._away_score = at_bat.result.awayScore
-            self._home_score = at_bat.result.homeScore
+            walker.end_at_bat(at_bat)
 
     def _iterate_pitches(self, at_bat: AllPlays):
-        balls = 0
-        strikes = 0
-
         if len(at_bat.playEvents) == 0:
             # No pitches thrown in the at bat
-            # Santos to Olivares | 2023-09-05 | B9 (walkoff balk)
             return
 
         at_bat_last_pitch = at_bat.playEvents[-1].index
 
-        for i, play_event in enumerate(at_bat.playEvents):
+        for play_event, balls, strikes in self._walker.pitches(at_bat):
+            self._dict_pitch = {}
+            # playEvent.details
+            self._dict_pitch['pitch_result'] = play_event.details.description
+            self._dict_pitch['pitch_result_code'] = play_event.details.code
 
-            if i != at_bat_last_pitch:
-                # igonres the last pitch of the at bat
-                # ball in play or what not
-                # handled by
-                self._runners.process_runner_movement(at_bat.runners, play_event.index)
-
-            if play_event.is_pitch:
-                self._dict_pitch = {}
-                # playEvent.details
-                self._dict_pitch['pitch_result'] = play_event.details.description
-                self._dict_pitch['pitch_result_code'] = play_event.details.code
-
-                if play_event.details.type is not None:
-                    self._dict_pitch['pitch_type_code'] = play_event.details.type.code
-                    self._dict_pitch['pitch_type_description'] = play_event.details.type.description
-                else:
-                    self._dict_pitch['pitch_type_code'] = None
-                    self._dict_pitch['pitch_type_description'] = None
-
-                if (balls == 4) or (strikes == 3):
-                    print()
-                    print(f'{balls}-{strikes} {at_bat.matchup.pitcher.fullName} to {at_bat.matchup.batter.fullName} {at_bat.about.halfInning} {at_bat.about.inning} in {self.gamepk}')
-
-                # playEvent.count
-                self._dict_pitch['balls'] = balls
-                self._dict_pitch['strikes'] = strikes
-                self._dict_pitch['outs'] = play_event.count.outs
-                self._dict_pitch['pitch_index'] = play_event.index
-
-                # playEvent.pitchData
-                self._dict_pitch['pitch_start_speed'] = play_event.pitch_data.startSpeed
-                self._dict_pitch['pitch_end_speed'] = play_event.pitch_data.endSpeed
-                self._dict_pitch['strike_zone_top'] = play_event.pitch_data.coordinates.sZ_top
-                self._dict_pitch['strike_zone_bottom'] = play_event.pitch_data.coordinates.sZ_bot
-
-                self._dict_pitch['zone'] = play_event.pitch_data.zone
-                self._dict_pitch['type_confidence'] = play_event.pitch_data.typeConfidence
-                self._dict_pitch['plate_time'] = play_event.pitch_data.plateTime
-                self._dict_pitch['extension'] = play_event.pitch_data.extension
-
-                # playEvents.pitchData
-                self._dict_pitch['px_min'] = play_event.pitch_data.coordinates.pX_max
-                self._dict_pitch['px_max'] = play_event.pitch_data.coordinates.pX_min
-                self._dict_pitch['pz_min'] = play_event.pitch_data.coordinates.pZ_min
-                self._dict_pitch['pz_max'] = play_event.pitch_data.coordinates.pZ_max
-
-                # playEvent.pitchData.coordinates
-                self._dict_pitch['px'] = play_event.pitch_data.coordinates.pX
-                self._dict_pitch['pz'] = play_event.pitch_data.coordinates.pZ
-
-                # playEvent.pitchData.breaks
-                if play_event.pitch_data.breaks:
-                    self._dict_pitch['breaks_angle'] = play_event.pitch_data.breaks.breakAngle
-                    self._dict_pitch['breaks_length'] = play_event.pitch_data.breaks.breakLength
-                    self._dict_pitch['breaks_y'] = play_event.pitch_data.breaks.breakY
-                    self._dict_pitch['break_vertical'] = play_event.pitch_data.breaks.breakVertical
-                    self._dict_pitch['break_vertical_induced'] = play_event.pitch_data.breaks.breakVerticalInduced
-                    self._dict_pitch['break_horizontal'] = play_event.pitch_data.breaks.breakHorizontal
-                    self._dict_pitch['spin_rate'] = play_event.pitch_data.breaks.spinRate
-                    self._dict_pitch['spin_direction'] = play_event.pitch_data.breaks.spinDirection
-                else:
-                    self._dict_pitch['breaks_angle'] = None
-                    self._dict_pitch['breaks_length'] = None
-                    self._dict_pitch['breaks_y'] = None
-                    self._dict_pitch['break_vertical'] = None
-                    self._dict_pitch['break_vertical_induced'] = None
-                    self._dict_pitch['break_horizontal'] = None
-                    self._dict_pitch['spin_rate'] = None
-                    self._dict_pitch['spin_direction'] = None
-
-                self._dict_game['pitch_start_time'] = play_event.start_time
-                self._dict_game['pitch_end_time'] = play_event.end_time
-
-                # runners
-                self._dict_pitch['is_first_base'] = bool(self._runners.runners[0])
-                self._dict_pitch['is_second_base'] = bool(self._runners.runners[1])
-                self._dict_pitch['is_third_base'] = bool(self._runners.runners[2])
-
-                at_bat_event_type = None
-                if play_event.index == at_bat_last_pitch:
-                    self._dict_pitch['at_bat_event'] = at_bat.result.event
-                    at_bat_event_type = at_bat.result.eventType
-                    self._dict_pitch['at_bat_event_type'] = at_bat_event_type
-                    self._dict_pitch['at_bat_description'] = at_bat.result.description
-                    self._dict_pitch['at_bat_rbi'] = at_bat.result.rbi
-
-                ev = None
-                la = None
-                if play_event.hit_data is not None:
-                    ev = play_event.hit_data.launchSpeed
-                    la = play_event.hit_data.launchAngle
-                    self._dict_pitch['batted_ball_launch_speed'] = ev
-                    self._dict_pitch['batted_ball_launch_angle'] = la
-                    self._dict_pitch['batted_ball_total_distance'] = play_event.hit_data.totalDistance
-                    self._dict_pitch['batted_ball_trajectory'] = play_event.hit_data.trajectory
-                    self._dict_pitch['batted_ball_hardness'] = play_event.hit_data.hardness
-                    self._dict_pitch['batted_ball_location'] = play_event.hit_data.location
-                    self._dict_pitch['batted_ball_coordinates_x'] = play_event.hit_data.coordinates.coordX
-                    self._dict_pitch['batted_ball_coordinates_y'] = play_event.hit_data.coordinates.coordY
-
-                umpire = Umpire()
-                umpire.from_game_parser(self._dict_at_bat, self._dict_pitch, self._runners)
-                x = umpire.calculate_favors()
-                umpire_run_favor, wp_favor = x
-                self._dict_pitch['umpire_run_favor'] = umpire_run_favor
-                self._dict_pitch['umpire_wp_favor'] = wp_favor
-
-                xba, xslg = batted_ball_expected_values(at_bat_event_type, ev, la)
-                self._dict_pitch['batted_ball_xba'] = xba
-                self._dict_pitch['batted_ball_xslg'] = xslg
-
-                # Placed after so the count recorded is before the pitch
-                if play_event.details.isBall:
-                    balls += 1
-
-                if play_event.details.isStrike:
-                    if play_event.details.code == 'F' and strikes == 2:
-                        pass # Foul on 2 strikes, no change in count
-                        # bunt foul ball on 2 strikes should be caught
-                        # by the next at bat event
-                    else:
-                        strikes += 1
-
-                combined_dict = {}
-                combined_dict.update(self._dict_game)
-                combined_dict.update(self._dict_at_bat)
-                combined_dict.update(self._dict_pitch)
-                self.game_data.append(combined_dict)
+            if play_event.details.type is not None:
+                self._dict_pitch['pitch_type_code'] = play_event.details.type.code
+                self._dict_pitch['pitch_type_description'] = play_event.details.type.description
+            else:
+                self._dict_pitch['pitch_type_code'] = None
+                self._dict_pitch['pitch_type_description'] = None
+
+            if (balls == 4) or (strikes == 3):
+                print()
+                print(f'{balls}-{strikes} {at_bat.matchup.pitcher.fullName} to {at_bat.matchup.batter.fullName} {at_bat.about.halfInning} {at_bat.about.inning} in {self.gamepk}')
+
+            # playEvent.count
+            self._dict_pitch['balls'] = balls
+            self._dict_pitch['strikes'] = strikes
+            self._dict_pitch['outs'] = play_event.count.outs
+            self._dict_pitch['pitch_index'] = play_event.index
+
+            # playEvent.pitchData
+            self._dict_pitch['pitch_start_speed'] = play_event.pitch_data.startSpeed
+            self._dict_pitch['pitch_end_speed'] = play_event.pitch_data.endSpeed
+            self._dict_pitch['strike_zone_top'] = play_event.pitch_data.coordinates.sZ_top
+            self._dict_pitch['strike_zone_bottom'] = play_event.pitch_data.coordinates.sZ_bot
+
+            self._dict_pitch['zone'] = play_event.pitch_data.zone
+            self._dict_pitch['type_confidence'] = play_event.pitch_data.typeConfidence
+            self._dict_pitch['plate_time'] = play_event.pitch_data.plateTime
+            self._dict_pitch['extension'] = play_event.pitch_data.extension
+
+            # playEvents.pitchData
+            self._dict_pitch['px_min'] = play_event.pitch_data.coordinates.pX_max
+            self._dict_pitch['px_max'] = play_event.pitch_data.coordinates.pX_min
+            self._dict_pitch['pz_min'] = play_event.pitch_data.coordinates.pZ_min
+            self._dict_pitch['pz_max'] = play_event.pitch_data.coordinates.pZ_max
+
+            # playEvent.pitchData.coordinates
+            self._dict_pitch['px'] = play_event.pitch_data.coordinates.pX
+            self._dict_pitch['pz'] = play_event.pitch_data.coordinates.pZ
+
+            # playEvent.pitchData.breaks
+            if play_event.pitch_data.breaks:
+                self._dict_pitch['breaks_angle'] = play_event.pitch_data.breaks.breakAngle
+                self._dict_pitch['breaks_length'] = play_event.pitch_data.breaks.breakLength
+                self._dict_pitch['breaks_y'] = play_event.pitch_data.breaks.breakY
+                self._dict_pitch['break_vertical'] = play_event.pitch_data.breaks.breakVertical
+                self._dict_pitch['break_vertical_induced'] = play_event.pitch_data.breaks.breakVerticalInduced
+                self._dict_pitch['break_horizontal'] = play_event.pitch_data.breaks.breakHorizontal
+                self._dict_pitch['spin_rate'] = play_event.pitch_data.breaks.spinRate
+                self._dict_pitch['spin_direction'] = play_event.pitch_data.breaks.spinDirection
+            else:
+                self._dict_pitch['breaks_angle'] = None
+                self._dict_pitch['breaks_length'] = None
+                self._dict_pitch['breaks_y'] = None
+                self._dict_pitch['break_vertical'] = None
+                self._dict_pitch['break_vertical_induced'] = None
+                self._dict_pitch['break_horizontal'] = None
+                self._dict_pitch['spin_rate'] = None
+                self._dict_pitch['spin_direction'] = None
+
+            self._dict_game['pitch_start_time'] = play_event.start_time
+            self._dict_game['pitch_end_time'] = play_event.end_time
+
+            # runners
+            runners = self._walker.runners.runners
+            self._dict_pitch['is_first_base'] = bool(runners[0])
+            self._dict_pitch['is_second_base'] = bool(runners[1])
+            self._dict_pitch['is_third_base'] = bool(runners[2])
+
+            if play_event.index == at_bat_last_pitch:
+                self._dict_pitch['at_bat_event'] = at_bat.result.event
+                self._dict_pitch['at_bat_event_type'] = at_bat.result.eventType
+                self._dict_pitch['at_bat_description'] = at_bat.result.description
+                self._dict_pitch['at_bat_rbi'] = at_bat.result.rbi
+
+            if play_event.hit_data is not None:
+                self._dict_pitch['batted_ball_launch_speed'] = play_event.hit_data.launchSpeed
+                self._dict_pitch['batted_ball_launch_angle'] = play_event.hit_data.launchAngle
+                self._dict_pitch['batted_ball_total_distance'] = play_event.hit_data.totalDistance
+                self._dict_pitch['batted_ball_trajectory'] = play_event.hit_data.trajectory
+                self._dict_pitch['batted_ball_hardness'] = play_event.hit_data.hardness
+                self._dict_pitch['batted_ball_location'] = play_event.hit_data.location
+                self._dict_pitch['batted_ball_coordinates_x'] = play_event.hit_data.coordinates.coordX
+                self._dict_pitch['batted_ball_coordinates_y'] = play_event.hit_data.coordinates.coordY
+
+            combined_dict = {}
+            combined_dict.update(self._dict_game)
+            combined_dict.update(self._dict_at_bat)
+            combined_dict.update(self._dict_pitch)
+            self.game_data.append(combined_dict)
+
+    def _calculate_umpire_favors(self, rows: List[dict]):
+        """
+        Fills in umpire_run_favor and umpire_wp_favor for every row at
+        once instead of creating an Umpire for each pitch
+        """
+        if len(rows) == 0:
+            return
+
+        def column(key: str) -> list:
+            return [row.get(key, None) for row in rows]
+
+        runners = runners_bitmask(column('is_first_base'), column('is_second_base'),
+            column('is_third_base'))
+        home_lead = np.subtract(column('home_score'), column('away_score'))
+
+        run_favor, wp_favor = calculate_favors_batch(
+            pitch_result_code=column('pitch_result_code'),
+            px=column('px'),
+            pz=column('pz'),
+            pz_min=column('pz_min'),
+            pz_max=column('pz_max'),
+            balls=column('balls'),
+            strikes=column('strikes'),
+            outs=column('outs'),
+            runners=runners,
+            inning=column('inning'),
+            is_top_inning=column('is_top_inning'),
+            home_lead=home_lead)
+
+        for row, run, wp in zip(rows, run_favor, wp_favor):
+            row['umpire_run_favor'] = float(run)
+            row['umpire_wp_favor'] = float(wp)
+
+    def _calculate_expected_values(self, rows: List[dict]):
+        """
+        Fills in batted_ball_xba and batted_ball_xslg for every row at
+        once using the expected values grid
+        """
+        if len(rows) == 0:
+            return
+
+        xba, xslg = score_batted_balls(
+            [row.get('at_bat_event_type', None) for row in rows],
+            [row.get('batted_ball_launch_speed', None) for row in rows],
+            [row.get('batted_ball_launch_angle', None) for row in rows])
+
+        for row, x, y in zip(rows, xba, xslg):
+            row['batted_ball_xba'] = None if np.isnan(x) else float(x)
+            row['batted_ball_xslg'] = None if np.isnan(y) else float(y)
 
     def write_csv(self, file_path: str, write_header: bool = False):
+        # without a header the rows go under the columns already there
+        fieldnames = GameParser.field_names if write_header else csv_append_columns(file_path)
         with open(file_path, 'a', newline='', encoding='UTF-8') as csv_file:
-            writer = csv.DictWriter(csv_file, fieldnames=GameParser.field_names)
+            writer = csv.DictWriter(csv_file, fieldnames=fieldnames, extrasaction='ignore')
             if write_header is True:
                 writer.writeheader()
             for row in self.game_data:
                 writer.writerow(row)
 
+    def write_parquet(self, root: str) -> int:
+        """
+        Writes the game to the Parquet pitch store, see
+        at_bat.pitch_store
+
+        Args:
+            root (str): Store directory
+
+        Returns:
+            int: Rows written
+        """
+        # pyarrow is only imported when the store is used
+        from at_bat.pitch_store import write_pitches # pylint: disable=C0415
+        return write_pitches(self.game_data, root)
+
     def __str__(self):
         return self.dataframe.to_string()
 
@@ -0,0 +1,409 @@
+"""
+One HTTP client for every request to the MLB Stats API.
+
+statsapi.get() opens a new connection for every request and each
+caller had its own retry loop. StatsApiClient builds the same urls from
+statsapi's endpoint table but sends them through one requests.Session
+(keep-alive connection pool) with:
+
+    - a limit on the number of requests in flight at once
+    - a token bucket rate limit
+    - retries with jittered exponential backoff on connection errors,
+      429 and 5xx responses
+    - a timeout per endpoint
+    - conditional requests (If-None-Match/If-Modified-Since) when the
+      API sent an ETag or Last-Modified header
+    - single-flight coalescing: callers asking for the same url while
+      a request for it is in flight wait for that request and share
+      its response instead of sending their own
+    - counters for requests, retries, deduplicated calls, latency and
+      bytes received
+
+The process-wide client is returned by get_client(). The
+AT_BAT_STATSAPI_URL environment variable (or base_url) points it at
+another server, such as a local stub in tests.
+
+Example:
+    client = get_client()
+    data = client.get('game', {'gamePk': 748534})
+    print(client.stats())
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from statsapi.endpoints import ENDPOINTS
+
+STATSAPI_URL = 'https://statsapi.mlb.com'
+
+Timeout = Union[float, Tuple[float, float]]
+
+# (connect, read) seconds. The live game feed can be several MB
+DEFAULT_TIMEOUT: Timeout = (3.05, 10)
+ENDPOINT_TIMEOUTS: Dict[str, Timeout] = {
+    'game': (3.05, 15),
+    'schedule': (3.05, 10),
+    'standings': (3.05, 10),
+}
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _coalesce_key(url: str) -> str:
+    """
+    The url with its query parameters sorted, so the same request
+    built from params in a different order is coalesced too
+    """
+    path, _, query = url.partition('?')
+    return f'{path}?{"&".join(sorted(query.split("&")))}' if query else path
+
+
+class _Call:
+    """
+    A request in flight. Callers that coalesce onto it wait on done
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.content: bytes = None
+        self.error: Exception = None
+
+
+class _RateLimiter:
+    """
+    Token bucket. acquire() blocks until a token is available
+    """
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate is None:
+            return
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            self._sleep(wait)
+
+
+class StatsApiClient:
+    """
+    Pooled, rate limited client for the MLB Stats API
+
+    Attributes:
+        base_url (str): Replaces https://statsapi.mlb.com in every url
+        max_retries (int): Attempts after the first one
+    """
+    def __init__(self, base_url: str = None, max_concurrency: int = 8,
+        rate_per_second: float = 20.0, burst: int = 20, max_retries: int = 5,
+        backoff_seconds: float = 1.0, max_backoff_seconds: float = 30.0,
+        timeouts: Dict[str, Timeout] = None, conditional_cache_size: int = 256,
+        coalesce: bool = True, session: requests.Session = None,
+        sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            base_url (str, optional): Server to send requests to.
+                Defaults to https://statsapi.mlb.com
+            max_concurrency (int, optional): Requests in flight at once.
+                Defaults to 8.
+            rate_per_second (float, optional): Average requests per
+                second. None turns the rate limit off. Defaults to 20.
+            burst (int, optional): Requests that can be sent at once
+                before the rate limit applies. Defaults to 20.
+            max_retries (int, optional): Defaults to 5.
+            backoff_seconds (float, optional): Largest wait before the
+                first retry. Doubles every retry. Defaults to 1.
+            max_backoff_seconds (float, optional): Defaults to 30.
+            timeouts (Dict[str, Timeout], optional): Timeout by
+                endpoint name. Defaults to ENDPOINT_TIMEOUTS
+            conditional_cache_size (int, optional): Responses kept for
+                conditional requests. Defaults to 256.
+            coalesce (bool, optional): Share one request between
+                callers asking for the same url at the same time.
+                Defaults to True.
+            session (requests.Session, optional): Defaults to a new
+                session
+            sleep (Callable[[float], None], optional): Defaults to
+                time.sleep
+        """
+        self.base_url = (base_url or STATSAPI_URL).rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.timeouts = dict(ENDPOINT_TIMEOUTS if timeouts is None else timeouts)
+        self.coalesce = coalesce
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._rate_limiter = _RateLimiter(rate_per_second, burst, sleep=sleep)
+
+        # url -> (etag, last modified, body) for conditional requests
+        self._validators: 'OrderedDict[str, Tuple[str, str, bytes]]' = OrderedDict()
+        self._validators_lock = threading.Lock()
+        self._conditional_cache_size = conditional_cache_size
+
+        # coalesce key -> request in flight
+        self._in_flight: Dict[str, _Call] = {}
+        self._in_flight_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'retries': 0,
+            'deduplicated': 0,
+            'errors': 0,
+            'not_modified': 0,
+            'bytes_received': 0,
+            'latency_seconds': 0.0,
+            'max_latency_seconds': 0.0,
+        }
+
+    def url(self, endpoint: str, params: dict = None, force: bool = False) -> str:
+        """
+        Returns the url for an endpoint, the same way statsapi.get()
+        builds it. Parameters the endpoint does not know are dropped
+        unless force is True
+
+        Args:
+            endpoint (str): Key of statsapi.endpoints.ENDPOINTS
+            params (dict, optional): Path and query parameters
+            force (bool, optional): Keep unknown parameters. Defaults
+                to False.
+
+        Raises:
+            ValueError: If the endpoint does not exist or a required
+                path parameter is missing
+
+        Returns:
+            str: The url
+        """
+        ep = ENDPOINTS.get(endpoint, None)
+        if ep is None:
+            raise ValueError(f'Invalid endpoint ({endpoint}).')
+
+        url: str = ep['url'].replace(STATSAPI_URL, self.base_url, 1)
+        query = {}
+
+        def path_value(path_param: dict, value: str) -> str:
+            leading = '/' if path_param.get('leading_slash', False) else ''
+            trailing = '/' if path_param.get('trailing_slash', False) else ''
+            return f'{leading}{value}{trailing}'
+
+        for key, value in (params or {}).items():
+            if key in ep['path_params']:
+                url = url.replace('{' + key + '}', path_value(ep['path_params'][key], str(value)))
+            elif key in ep['query_params'] or force:
+                query[key] = str(value)
+
+        # path parameters that were not given
+        for key, path_param in ep['path_params'].items():
+            if '{' + key + '}' not in url:
+                continue
+
+            if not path_param.get('required', False):
+                url = url.replace('{' + key + '}', '')
+            elif path_param.get('default', ''):
+                url = url.replace('{' + key + '}', path_value(path_param, path_param['default']))
+            else:
+                raise ValueError(f'Missing required path parameter {{{key}}}')
+
+        if query:
+            url = f'{url}?{urlencode(query, safe=",()")}'
+        return url
+
+    def get(self, endpoint: str, params: dict = None, force: bool = False,
+        timeout: Timeout = None) -> dict:
+        """
+        Sends a GET request and returns the decoded JSON. If the same
+        url is already being requested, waits for that request instead.
+        Every caller gets its own decoded copy of the response
+
+        Args:
+            endpoint (str): Key of statsapi.endpoints.ENDPOINTS
+            params (dict, optional): Path and query parameters
+            force (bool, optional): Keep parameters the endpoint does
+                not know. Defaults to False.
+            timeout (Timeout, optional): Defaults to the endpoint's
+                timeout
+
+        Raises:
+            requests.exceptions.RequestException: If every attempt
+                failed or the server returned a 4xx error
+
+        Returns:
+            dict: The response
+        """
+        url = self.url(endpoint, params, force=force)
+        if timeout is None:
+            timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+        if not self.coalesce:
+            return json.loads(self._fetch(url, timeout))
+
+        key = _coalesce_key(url)
+        with self._in_flight_lock:
+            call = self._in_flight.get(key, None)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+
+        if not leader:
+            self._count('deduplicated')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return json.loads(call.content)
+
+        try:
+            call.content = self._fetch(url, timeout)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            call.done.set()
+
+        return json.loads(call.content)
+
+    def _fetch(self, url: str, timeout: Timeout) -> bytes:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._get_once(url, timeout)
+            except requests.exceptions.RequestException as e:
+                response = getattr(e, 'response', None)
+                retry = response is None or response.status_code in RETRY_STATUS_CODES
+                if not retry or attempt == self.max_retries:
+                    self._count('errors')
+                    raise
+
+            self._count('retries')
+            # full jitter so many clients do not retry at the same time
+            backoff = min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt)
+            self._sleep(random.uniform(0, backoff))
+
+        raise AssertionError('unreachable')
+
+    def _get_once(self, url: str, timeout: Timeout) -> bytes:
+        headers = {}
+        with self._validators_lock:
+            validators = self._validators.get(url, None)
+        if validators is not None:
+            etag, last_modified, _ = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        self._rate_limiter.acquire()
+        with self._slots:
+            start = time.perf_counter()
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            content = response.content
+            latency = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats['bytes_received'] += len(content)
+            self._stats['latency_seconds'] += latency
+            self._stats['max_latency_seconds'] = max(self._stats['max_latency_seconds'], latency)
+
+        if response.status_code == 304 and validators is not None:
+            self._count('not_modified')
+            return validators[2]
+
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag', None)
+        last_modified = response.headers.get('Last-Modified', None)
+        if etag or last_modified:
+            with self._validators_lock:
+                self._validators[url] = (etag, last_modified, content)
+                self._validators.move_to_end(url)
+                while len(self._validators) > self._conditional_cache_size:
+                    self._validators.popitem(last=False)
+
+        return content
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the counters since the client was created
+
+        Returns:
+            dict: requests, retries, deduplicated (calls that shared
+                another caller's request), errors, not_modified,
+                bytes_received, latency_seconds (total),
+                max_latency_seconds and mean_latency_seconds
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['mean_latency_seconds'] = stats['latency_seconds'] / max(stats['requests'], 1)
+        return stats
+
+
+_client: Union[StatsApiClient, None] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> StatsApiClient:
+    """
+    Returns the process-wide StatsApiClient. Created the first time it
+    is needed
+
+    Returns:
+        StatsApiClient: The client
+    """
+    global _client # pylint: disable=W0603
+
+    with _client_lock:
+        if _client is None:
+            _client = StatsApiClient(base_url=os.environ.get('AT_BAT_STATSAPI_URL', None))
+        return _client
+
+
+def set_client(client: Union[StatsApiClient, None]):
+    """
+    Replaces the process-wide StatsApiClient. None creates a new
+    default client the next time get_client() is called
+
+    Args:
+        client (Union[StatsApiClient, None]): The new client
+    """
+    global _client # pylint: disable=W0603
+
+    with _client_lock:
+        _client = client
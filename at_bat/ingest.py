@@ -0,0 +1,257 @@
+"""
+Parallel, resumable ingestion of many games into one pitch csv or
+the Parquet pitch store (at_bat.pitch_store).
+
+Games are downloaded in a thread pool (network bound) and parsed with
+GameParser in a process pool (CPU bound), with a bounded number of
+games in flight at once. Each parser process writes the rows of a
+game to its own shard file (a temporary file that is renamed when it
+is complete) and the main process records the gamepk in a checkpoint
+file once the game is written. When every game is done the shards are
+merged into the output csv. With the Parquet store each game is
+written to its own Parquet shard and the main process merges the
+shards into the store, which only allows one writer.
+
+If a run is stopped, running it again skips every gamepk in the
+checkpoint. A game that was written to a shard but not checkpointed is
+parsed again and its shard is replaced.
+
+Example:
+    ingest_games(gamepks, 'pitch.csv')
+"""
+
+import csv
+import io
+import os
+import shutil
+import time
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+    ThreadPoolExecutor, wait)
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+import tqdm
+
+from at_bat.game import Game
+from at_bat.game_parser import GameParser
+
+
+def read_checkpoint(checkpoint_path: str) -> Set[int]:
+    """
+    Returns the gamepks that have already been written
+
+    Args:
+        checkpoint_path (str): Checkpoint file, one gamepk per line
+
+    Returns:
+        Set[int]: Completed gamepks
+    """
+    if not os.path.exists(checkpoint_path):
+        return set()
+
+    with open(checkpoint_path, 'r', encoding='utf-8') as file:
+        return {int(line) for line in file if line.strip()}
+
+
+def _fetch_game(gamepk: int) -> dict:
+    return Game.get_dict(gamepk=gamepk)
+
+
+def parse_game(data: dict, shard_dir: str) -> int:
+    """
+    Parses a game and writes it to its own csv shard. The shard only
+    shows up under its name once it is complete, so a crash never
+    leaves half a game behind. Runs in a parser process.
+
+    Args:
+        data (dict): Game dictionary
+        shard_dir (str): Directory with the shard files
+
+    Returns:
+        int: Number of pitches written
+    """
+    parser = GameParser(game=Game(data))
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=GameParser.field_names)
+    writer.writerows(parser.game_data)
+
+    # merge_shards() skips files starting with '.'
+    path = os.path.join(shard_dir, f'{parser.gamepk}.csv')
+    tmp_path = os.path.join(shard_dir, f'.{parser.gamepk}.csv.{os.getpid()}')
+    with open(tmp_path, 'w', newline='', encoding='UTF-8') as shard:
+        shard.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+    return len(parser.game_data)
+
+
+def parse_game_to_parquet(data: dict, shard_dir: str) -> int:
+    """
+    Parses a game and writes it to its own Parquet shard. Runs in a
+    parser process.
+
+    Args:
+        data (dict): Game dictionary
+        shard_dir (str): Directory with the shard files
+
+    Returns:
+        int: Number of pitches written
+    """
+    from at_bat.pitch_store import write_shard # pylint: disable=C0415
+    parser = GameParser(game=Game(data))
+    return write_shard(parser.game_data, shard_dir, parser.gamepk)
+
+
+def merge_shards(shard_dir: str, output_path: str) -> int:
+    """
+    Merges every shard from parse_game() into the output csv. Rows
+    that do not have a value for every column are skipped.
+
+    Args:
+        shard_dir (str): Directory with the shard files
+        output_path (str): Output csv
+
+    Returns:
+        int: Number of rows written
+    """
+    names = sorted(name for name in os.listdir(shard_dir)
+        if name.endswith('.csv') and not name.startswith('.'))
+    columns = len(GameParser.field_names)
+    rows = 0
+
+    with open(output_path, 'w', newline='', encoding='UTF-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(GameParser.field_names)
+
+        for name in names:
+            with open(os.path.join(shard_dir, name), 'r', newline='', encoding='UTF-8') as shard:
+                for row in csv.reader(shard):
+                    if len(row) != columns:
+                        continue
+                    writer.writerow(row)
+                    rows += 1
+
+    return rows
+
+
+def ingest_games(gamepks: Iterable[int], output_path: str, work_dir: str = None,
+    fetch_workers: int = 8, parse_workers: int = None, max_in_flight: int = 32,
+    fetch: Callable[[int], dict] = None, output_format: str = 'csv') -> Tuple[int, List[int]]:
+    """
+    Downloads and parses every game into output_path
+
+    Args:
+        gamepks (Iterable[int]): Games to ingest
+        output_path (str): Output csv, or the store directory for
+            output_format 'parquet'
+        work_dir (str, optional): Directory for the checkpoint file and
+            shards. Defaults to output_path + '.work'
+        fetch_workers (int, optional): Download threads. Defaults to 8.
+        parse_workers (int, optional): Parser processes. Defaults to
+            the number of CPUs.
+        max_in_flight (int, optional): Games being downloaded or parsed
+            at once. Limits memory use. Defaults to 32.
+        fetch (Callable[[int], dict], optional): Returns the game
+            dictionary for a gamepk. Defaults to Game.get_dict
+        output_format (str, optional): 'csv' or 'parquet'. Defaults to
+            'csv'.
+
+    Returns:
+        Tuple[int, List[int]]: Rows in the output, gamepks that failed
+            (they are retried the next run)
+    """
+    if fetch is None:
+        fetch = _fetch_game
+    if output_format not in ('csv', 'parquet'):
+        raise ValueError(f'unknown output_format {output_format}')
+
+    if work_dir is None:
+        work_dir = f'{output_path}.work'
+    shard_dir = os.path.join(work_dir, 'shards')
+    checkpoint_path = os.path.join(work_dir, 'checkpoint.txt')
+    os.makedirs(shard_dir, exist_ok=True)
+
+    gamepks = list(dict.fromkeys(gamepks))
+    completed = read_checkpoint(checkpoint_path)
+    remaining = [gamepk for gamepk in gamepks if gamepk not in completed]
+    todo = iter(remaining)
+
+    failed: List[int] = []
+    start = time.monotonic()
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+        ProcessPoolExecutor(max_workers=parse_workers) as parse_pool, \
+        open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+        tqdm.tqdm(total=len(gamepks), initial=len(gamepks) - len(remaining), unit='game') as progress:
+
+        pending: Dict[Future, Tuple[str, int]] = {}
+
+        def fill():
+            while len(pending) < max_in_flight:
+                gamepk = next(todo, None)
+                if gamepk is None:
+                    return
+                pending[fetch_pool.submit(fetch, gamepk)] = ('fetch', gamepk)
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                stage, gamepk = pending.pop(future)
+
+                try:
+                    result = future.result()
+                except Exception as e: # pylint: disable=W0718
+                    print(f'{type(e).__name__} {gamepk} | {e}')
+                    failed.append(gamepk)
+                    continue
+
+                if stage == 'fetch':
+                    if result is None:
+                        failed.append(gamepk)
+                        continue
+                    if output_format == 'parquet':
+                        future = parse_pool.submit(parse_game_to_parquet, result, shard_dir)
+                    else:
+                        future = parse_pool.submit(parse_game, result, shard_dir)
+                    pending[future] = ('parse', gamepk)
+                    continue
+
+                checkpoint.write(f'{gamepk}\n')
+                checkpoint.flush()
+                done += 1
+
+                elapsed = time.monotonic() - start
+                progress.set_postfix_str(f'{done / elapsed:.2f} games/s')
+                progress.update(1)
+
+            fill()
+
+    elapsed = time.monotonic() - start
+    print(f'{done} games in {elapsed:.0f}s ({done / max(elapsed, 1e-9):.2f} games/s), {len(failed)} failed')
+
+    if output_format == 'parquet':
+        from at_bat.pitch_store import merge_shards as merge_parquet_shards # pylint: disable=C0415
+        from at_bat.pitch_store import row_counts # pylint: disable=C0415
+        merge_parquet_shards(shard_dir, output_path)
+        return (sum(row_counts(output_path).values()), failed)
+
+    rows = merge_shards(shard_dir, output_path)
+    return (rows, failed)
+
+
+def clear_work_dir(output_path: str, work_dir: str = None):
+    """
+    Deletes the checkpoint and shards so the next run starts over
+
+    Args:
+        output_path (str): Output csv passed to ingest_games
+        work_dir (str, optional): work_dir passed to ingest_games
+    """
+    if work_dir is None:
+        work_dir = f'{output_path}.work'
+
+    if os.path.exists(work_dir):
+        shutil.rmtree(work_dir)
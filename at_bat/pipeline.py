@@ -0,0 +1,517 @@
+"""
+Runs the every_pitch_csv tables (scripts 3-7) as one pipeline.
+
+Each stage declares the tables it reads and writes. Tables are handed
+from stage to stage in memory and also written to their csv files.
+A stage is skipped when its fingerprint (a hash of the stage and
+everything upstream of it, down to the contents of the source files)
+matches the last run and its output files have not been touched since.
+Stages that do not depend on each other run at the same time in a
+thread pool. Every run reports the wall time and peak memory of each
+stage.
+
+Fingerprints are kept in pipeline_manifest.json next to the tables.
+Source files are only hashed again when their size or modification
+time changes. A source can be a directory (the Parquet pitch store),
+then every file in it is hashed. A missing source fails the stages
+that read it.
+
+Stages:
+    pitches/ or pitch.csv -> re288 -> re640 -> red288
+                                   -> wp351360 -> wp780800 -> wpd351360
+                          -> expected_values
+
+Example:
+    reports = pitch_tables_pipeline('every_pitch_csv').run()
+    print_reports(reports)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Sequence, Set
+
+import pandas as pd
+from tabulate import tabulate
+
+from at_bat.expected_values_builder import BATTED_BALL_COLUMNS, build_expected_values
+from at_bat.state_table_builder import (RE288, RE640_AXES, StateCounts, ValueTable,
+    build_re640, build_red288)
+from at_bat.wp_table_builder import (WP351360_AXES, WP780800_AXES, WP_COLUMNS,
+    build_wp351360, build_wp780800, build_wpd351360)
+
+MANIFEST_FILE = 'pipeline_manifest.json'
+PITCH_STORE_DIR = 'pitches'
+
+
+class Artifact:
+    """
+    A table read or written by the pipeline
+
+    Attributes:
+        name (str): Name stages use for the table
+        filename (str): File of the table in the pipeline directory.
+            Sources can also be a directory
+        load (Callable[[str], Any]): Reads the table from a path
+        save (Callable[[Any, str], None]): Writes the table to a path.
+            None for source files
+    """
+    def __init__(self, name: str, filename: str, load: Callable[[str], Any],
+        save: Callable[[Any, str], None] = None):
+        self.name = name
+        self.filename = filename
+        self.load = load
+        self.save = save
+
+
+class Stage:
+    """
+    A step of the pipeline
+
+    Attributes:
+        name (str): Stage name
+        func (Callable): Called with the input tables in order.
+            Returns the output table (one output) or a tuple of them
+        inputs (List[str]): Artifact names the stage reads
+        outputs (List[Artifact]): Tables the stage makes
+        version (str): Change it when the stage's code changes so the
+            next run does not skip it
+    """
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str],
+        outputs: Sequence[Artifact], version: str = '1'):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.version = version
+
+
+class StageReport:
+    """
+    What happened to a stage in a run
+
+    Attributes:
+        name (str): Stage name
+        status (str): 'ran', 'skipped', 'failed' or 'blocked' (an
+            upstream stage failed)
+        seconds (float): Wall time. 0 if the stage did not run
+        peak_bytes (int): Peak memory traced by tracemalloc while the
+            stage ran. Includes stages running at the same time. None
+            if memory was not traced
+        error (Exception): Exception of a failed stage
+    """
+    def __init__(self, name: str, status: str, seconds: float = 0.0,
+        peak_bytes: int = None, error: Exception = None):
+        self.name = name
+        self.status = status
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.error = error
+
+
+def file_sha256(path: str) -> str:
+    """
+    Returns the SHA-256 of a file's contents
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stat(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class _MemoryTracker:
+    """
+    Peak tracemalloc memory of each running stage. The peak since the
+    last stage started or finished is added to every stage that was
+    running, then the peak is reset.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._peaks: Dict[str, int] = {}
+
+    def _fold(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for name in self._peaks:
+            self._peaks[name] = max(self._peaks[name], peak)
+        tracemalloc.reset_peak()
+
+    def start(self, name: str):
+        with self._lock:
+            self._fold()
+            self._peaks[name] = tracemalloc.get_traced_memory()[0]
+
+    def stop(self, name: str) -> int:
+        with self._lock:
+            self._fold()
+            return self._peaks.pop(name)
+
+
+class Pipeline:
+    """
+    Stages and source files of a pipeline
+
+    Attributes:
+        directory (str): Directory of the source files, tables and
+            manifest
+        sources (Dict[str, Artifact]): Source files by name
+        stages (Dict[str, Stage]): Stages by name, in the order given
+    """
+    def __init__(self, directory: str, sources: Sequence[Artifact], stages: Sequence[Stage]):
+        self.directory = directory
+        self.sources = {source.name: source for source in sources}
+        self.stages = {stage.name: stage for stage in stages}
+
+        self._producer: Dict[str, Stage] = {}
+        for stage in stages:
+            for artifact in stage.outputs:
+                if artifact.name in self._producer or artifact.name in self.sources:
+                    raise ValueError(f'{artifact.name} is made by more than one stage')
+                self._producer[artifact.name] = stage
+
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.sources and name not in self._producer:
+                    raise ValueError(f'{stage.name} reads unknown table {name}')
+
+        self._manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self._values: Dict[str, Any] = {}
+        self._value_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, artifact: Artifact) -> str:
+        return os.path.join(self.directory, artifact.filename)
+
+    def _upstream(self, stage: Stage) -> List[Stage]:
+        return [self._producer[name] for name in stage.inputs if name in self._producer]
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault('files', {})
+        manifest.setdefault('stages', {})
+        return manifest
+
+    def _write_manifest(self, manifest: dict):
+        tmp_path = f'{self._manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _file_hash(self, filename: str, manifest: dict) -> str:
+        path = os.path.join(self.directory, filename)
+        stat = _file_stat(path)
+
+        known = manifest['files'].get(filename)
+        if known is not None and known['stat'] == stat:
+            return known['sha256']
+
+        sha256 = file_sha256(path)
+        manifest['files'][filename] = {'stat': stat, 'sha256': sha256}
+        return sha256
+
+    def _source_hash(self, source: Artifact, manifest: dict) -> str:
+        """
+        Returns the hash of a source file, or of every file in a source
+        directory. None if the source does not exist
+        """
+        path = self._path(source)
+        if not os.path.isdir(path):
+            try:
+                return self._file_hash(source.filename, manifest)
+            except FileNotFoundError:
+                return None
+
+        files = []
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                # files starting with '.' are being written
+                if not name.startswith('.'):
+                    filename = os.path.relpath(os.path.join(dirpath, name), self.directory)
+                    files.append([filename, self._file_hash(filename, manifest)])
+        return hashlib.sha256(json.dumps(files).encode('utf-8')).hexdigest()
+
+    def _missing_sources(self, stage: Stage) -> List[str]:
+        return [self.sources[name].filename for name in stage.inputs
+            if name in self.sources and not os.path.exists(self._path(self.sources[name]))]
+
+    def fingerprints(self, manifest: dict = None) -> Dict[str, str]:
+        """
+        Returns the fingerprint of every stage. It changes when a
+        source file upstream of the stage changes or when the name,
+        version, inputs or outputs of the stage or a stage upstream of
+        it change.
+
+        Returns:
+            Dict[str, str]: Stage name to hex digest
+        """
+        if manifest is None:
+            manifest = self._read_manifest()
+
+        fingerprints: Dict[str, str] = {}
+
+        def fingerprint(stage: Stage) -> str:
+            if stage.name not in fingerprints:
+                parts = [stage.name, stage.version, [a.filename for a in stage.outputs]]
+                for name in stage.inputs:
+                    if name in self.sources:
+                        parts.append([name, self._source_hash(self.sources[name], manifest)])
+                    else:
+                        parts.append([name, fingerprint(self._producer[name])])
+                raw = json.dumps(parts).encode('utf-8')
+                fingerprints[stage.name] = hashlib.sha256(raw).hexdigest()
+            return fingerprints[stage.name]
+
+        for stage in self.stages.values():
+            fingerprint(stage)
+        return fingerprints
+
+    def _is_current(self, stage: Stage, fingerprint: str, manifest: dict) -> bool:
+        entry = manifest['stages'].get(stage.name)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return False
+
+        for artifact in stage.outputs:
+            path = self._path(artifact)
+            if not os.path.exists(path) or entry['outputs'].get(artifact.filename) != _file_stat(path):
+                return False
+        return True
+
+    def _value(self, name: str) -> Any:
+        """
+        Returns a table from memory, or reads it from its file if the
+        stage that makes it was skipped
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            lock = self._value_locks.setdefault(name, threading.Lock())
+
+        with lock:
+            if name not in self._values:
+                artifact = self.sources.get(name) or next(a for a in
+                    self._producer[name].outputs if a.name == name)
+                value = artifact.load(self._path(artifact))
+                with self._lock:
+                    self._values[name] = value
+            return self._values[name]
+
+    def _run_stage(self, stage: Stage, memory: _MemoryTracker = None) -> StageReport:
+        if memory is not None:
+            memory.start(stage.name)
+        start = time.perf_counter()
+
+        try:
+            result = stage.func(*[self._value(name) for name in stage.inputs])
+            if len(stage.outputs) == 1:
+                result = (result,)
+
+            for artifact, value in zip(stage.outputs, result):
+                with self._lock:
+                    self._values[artifact.name] = value
+                artifact.save(value, self._path(artifact))
+            status, error = 'ran', None
+        except Exception as e: # pylint: disable=W0718
+            status, error = 'failed', e
+
+        seconds = time.perf_counter() - start
+        peak = None if memory is None else memory.stop(stage.name)
+        return StageReport(stage.name, status, seconds, peak, error)
+
+    def run(self, targets: Sequence[str] = None, workers: int = 4, force: bool = False,
+        trace_memory: bool = True) -> List[StageReport]:
+        """
+        Runs every stage that is not current
+
+        Args:
+            targets (Sequence[str], optional): Only run these stages and
+                the stages upstream of them. Defaults to None (every
+                stage).
+            workers (int, optional): Stages run at once. Defaults to 4.
+            force (bool, optional): Run stages even if they are
+                current. Defaults to False.
+            trace_memory (bool, optional): Measure peak memory with
+                tracemalloc. It slows down stages that allocate many
+                small objects. Defaults to True.
+
+        Returns:
+            List[StageReport]: One per stage in the order they finished
+        """
+        manifest = self._read_manifest()
+        fingerprints = self.fingerprints(manifest)
+
+        selected: Set[str] = set()
+        def select(stage: Stage):
+            if stage.name not in selected:
+                selected.add(stage.name)
+                for upstream in self._upstream(stage):
+                    select(upstream)
+        for name in (self.stages if targets is None else targets):
+            select(self.stages[name])
+
+        stages = [stage for stage in self.stages.values() if stage.name in selected]
+        reports: Dict[str, StageReport] = {}
+        self._values = {}
+
+        memory = None
+        started_tracing = False
+        if trace_memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            memory = _MemoryTracker()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending: Dict[Future, Stage] = {}
+
+                def submit_ready():
+                    for stage in stages:
+                        if stage.name in reports or stage in pending.values():
+                            continue
+
+                        upstream = [reports.get(s.name) for s in self._upstream(stage)]
+                        if any(r is None for r in upstream):
+                            continue
+                        if any(r.status in ('failed', 'blocked') for r in upstream):
+                            reports[stage.name] = StageReport(stage.name, 'blocked')
+                            continue
+
+                        missing = self._missing_sources(stage)
+                        if missing:
+                            reports[stage.name] = StageReport(stage.name, 'failed',
+                                error=FileNotFoundError(f'missing source {missing[0]}'))
+                            continue
+
+                        upstream_ran = any(r.status == 'ran' for r in upstream)
+                        if (not force and not upstream_ran
+                            and self._is_current(stage, fingerprints[stage.name], manifest)):
+                            reports[stage.name] = StageReport(stage.name, 'skipped')
+                            continue
+
+                        pending[pool.submit(self._run_stage, stage, memory)] = stage
+
+                while True:
+                    count = -1
+                    while count != len(reports):
+                        count = len(reports)
+                        submit_ready()
+                    if not pending:
+                        break
+
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage = pending.pop(future)
+                        report = future.result()
+                        reports[stage.name] = report
+
+                        if report.status == 'ran':
+                            manifest['stages'][stage.name] = {
+                                'fingerprint': fingerprints[stage.name],
+                                'outputs': {a.filename: _file_stat(self._path(a))
+                                    for a in stage.outputs},
+                            }
+                            self._write_manifest(manifest)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._values = {}
+
+        self._write_manifest(manifest)
+        return list(reports.values())
+
+
+def print_reports(reports: Sequence[StageReport]):
+    """
+    Prints the wall time and peak memory of each stage
+    """
+    rows = []
+    for report in reports:
+        peak = '' if report.peak_bytes is None else f'{report.peak_bytes / 2**20:.1f}'
+        seconds = f'{report.seconds:.2f}' if report.status in ('ran', 'failed') else ''
+        rows.append([report.name, report.status, seconds, peak])
+
+    print(tabulate(rows, headers=['stage', 'status', 'seconds', 'peak MB'],
+        tablefmt='rounded_outline'))
+
+    for report in reports:
+        if report.error is not None:
+            print(f'{report.name} | {type(report.error).__name__}: {report.error}')
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, float_precision='round_trip')
+
+
+def _to_csv(table: Any, path: str):
+    if not isinstance(table, pd.DataFrame):
+        table = table.to_dataframe()
+    table.to_csv(path, index=False)
+
+
+def _value_table(axes, columns) -> Callable[[str], ValueTable]:
+    return lambda path: ValueTable.from_dataframe(_read_csv(path), axes, columns)
+
+
+def pitch_tables_pipeline(directory: str) -> Pipeline:
+    """
+    Returns the pipeline of the tables made by scripts 3-7. Like the
+    scripts, the pitches come from the Parquet pitch store (pitches/)
+    if it exists, otherwise from pitch.csv.
+
+    Args:
+        directory (str): every_pitch_csv directory
+
+    Returns:
+        Pipeline: The pipeline
+    """
+    columns = list(dict.fromkeys(RE288.columns + BATTED_BALL_COLUMNS))
+    if os.path.isdir(os.path.join(directory, PITCH_STORE_DIR)):
+        # pyarrow is only imported when the store is used
+        from at_bat.pitch_store import read_pitches # pylint: disable=C0415
+        pitches = Artifact('pitches', PITCH_STORE_DIR, lambda path: read_pitches(path, columns))
+    else:
+        pitches = Artifact('pitches', 'pitch.csv', lambda path: pd.read_csv(path,
+            usecols=columns))
+
+    re288 = Artifact('re288', 're288.csv',
+        lambda path: StateCounts.from_dataframe(_read_csv(path), RE288.axes), _to_csv)
+    re640 = Artifact('re640', 're640.csv',
+        lambda path: StateCounts.from_dataframe(_read_csv(path), RE640_AXES), _to_csv)
+    red288 = Artifact('red288', 'red288.csv', _value_table(RE288.axes, ['run_value']), _to_csv)
+    wp351360 = Artifact('wp351360', 'wp351360.csv', _value_table(WP351360_AXES, WP_COLUMNS),
+        _to_csv)
+    wp780800 = Artifact('wp780800', 'wp780800.csv', _value_table(WP780800_AXES, WP_COLUMNS),
+        _to_csv)
+    wpd351360 = Artifact('wpd351360', 'wpd351360.csv', _value_table(WP351360_AXES, ['wpa']),
+        _to_csv)
+    expected_values = Artifact('expected_values', 'expected_values.csv', _read_csv, _to_csv)
+
+    return Pipeline(directory, [pitches], [
+        Stage('re288', RE288.build, ['pitches'], [re288]),
+        Stage('re640', build_re640, ['re288'], [re640]),
+        Stage('red288', build_red288, ['re640'], [red288]),
+        Stage('wp351360', build_wp351360, ['re288'], [wp351360]),
+        Stage('wp780800', build_wp780800, ['wp351360'], [wp780800]),
+        Stage('wpd351360', build_wpd351360, ['wp780800'], [wpd351360]),
+        Stage('expected_values', build_expected_values, ['pitches'], [expected_values]),
+    ])
@@ -0,0 +1,261 @@
+"""
+Columnar version of GameParser. The pitches are walked once with the
+same PitchWalker as GameParser and every field in
+GameParser.field_names is written into a preallocated, typed NumPy
+column instead of building a dictionary per pitch. Repeated
+strings (pitch codes, batter, pitcher, ...) are dictionary encoded as
+pandas Categoricals.
+
+The values are the same as GameParser.dataframe except that missing
+numbers are NaN instead of None.
+
+Example:
+    game = Game.get_game_from_pk(748534)
+    columns = game.pitch_arrays()
+    df = pitch_dataframe(game)
+"""
+
+from typing import Dict, Sequence, Union
+import numpy as np
+import pandas as pd
+
+from at_bat.game import Game, AllPlays
+from at_bat.game_parser import GameParser, PitchWalker, game_fields
+from at_bat.expected_values import score_batted_balls
+from at_bat.state_tables import runners_bitmask
+from at_bat.umpire import calculate_favors_batch
+
+Column = Union[np.ndarray, pd.Categorical]
+
+INT_COLUMNS = ('inning', 'at_bat_index', 'runs_to_start', 'runs_to_end', 'total_half_inning_runs',
+    'away_score', 'home_score', 'balls', 'strikes', 'outs', 'pitch_index')
+
+# MLB ids do not fit in int16
+ID_COLUMNS = ('batter_id', 'pitcher_id')
+
+BOOL_COLUMNS = ('is_top_inning', 'is_first_base', 'is_second_base', 'is_third_base')
+
+CATEGORY_COLUMNS = ('batter', 'bat_side', 'pitcher', 'pitch_hand', 'pitch_result',
+    'pitch_result_code', 'pitch_type_code', 'pitch_type_description', 'at_bat_event',
+    'at_bat_event_type', 'batted_ball_trajectory', 'batted_ball_hardness',
+    'batted_ball_location')
+
+OBJECT_COLUMNS = ('at_bat_description', 'pitch_start_time', 'pitch_end_time')
+
+# column, attribute of game.Breaks
+_BREAKS = (
+    ('breaks_angle', 'breakAngle'),
+    ('breaks_length', 'breakLength'),
+    ('breaks_y', 'breakY'),
+    ('break_vertical', 'breakVertical'),
+    ('break_vertical_induced', 'breakVerticalInduced'),
+    ('break_horizontal', 'breakHorizontal'),
+    ('spin_rate', 'spinRate'),
+    ('spin_direction', 'spinDirection'),
+)
+
+
+class _CategoryColumn:
+    """
+    Dictionary encodes a column while it is being filled in
+    """
+    def __init__(self, size: int):
+        self.codes = np.full(size, -1, dtype=np.int32)
+        self.categories: Dict[object, int] = {}
+
+    def __setitem__(self, row: int, value):
+        if value is None:
+            return
+
+        code = self.categories.get(value, None)
+        if code is None:
+            code = len(self.categories)
+            self.categories[value] = code
+        self.codes[row] = code
+
+    def to_categorical(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.codes, categories=list(self.categories))
+
+
+def _float(value) -> float:
+    if value is None:
+        return np.nan
+    return float(value)
+
+
+def _constant_column(value, size: int) -> Column:
+    if value is None:
+        return np.full(size, np.nan)
+    if isinstance(value, str):
+        return pd.Categorical.from_codes(np.zeros(size, dtype=np.int32), categories=[value])
+    if isinstance(value, bool):
+        return np.full(size, value, dtype=np.bool_)
+    if isinstance(value, int):
+        return np.full(size, value, dtype=np.int64)
+    return np.full(size, value, dtype=np.float64)
+
+
+def _count_pitches(all_plays: Sequence[AllPlays]) -> int:
+    return sum(1 for at_bat in all_plays for event in at_bat.playEvents if event.is_pitch)
+
+
+def extract_pitch_arrays(game: Game) -> Dict[str, Column]:
+    """
+    Returns one column per field in GameParser.field_names for every
+    pitch in the game
+
+    Args:
+        game (Game): The game
+
+    Returns:
+        Dict[str, Column]: field name to NumPy array or Categorical
+    """
+    all_plays = game.liveData.plays.allPlays
+    size = _count_pitches(all_plays)
+    constants = game_fields(game)
+
+    ints = {name: np.zeros(size, dtype=np.int16) for name in INT_COLUMNS}
+    ints.update({name: np.zeros(size, dtype=np.int64) for name in ID_COLUMNS})
+    bools = {name: np.zeros(size, dtype=np.bool_) for name in BOOL_COLUMNS}
+    categories = {name: _CategoryColumn(size) for name in CATEGORY_COLUMNS}
+    objects = {name: np.full(size, None, dtype=object) for name in OBJECT_COLUMNS}
+
+    floats = {name: np.full(size, np.nan) for name in GameParser.field_names
+        if not any(name in group for group in (ints, bools, categories, objects, constants))}
+
+    # same score, half inning runs, count and runners as GameParser
+    walker = PitchWalker(game)
+    row = 0
+
+    for at_bat in all_plays:
+        walker.start_at_bat(at_bat)
+
+        about = at_bat.about
+        matchup = at_bat.matchup
+        result = at_bat.result
+        last_index = at_bat.playEvents[-1].index if len(at_bat.playEvents) > 0 else None
+
+        for event, balls, strikes in walker.pitches(at_bat):
+            details = event.details
+            pitch_data = event.pitch_data
+            coordinates = pitch_data.coordinates
+
+            ints['inning'][row] = about.inning
+            bools['is_top_inning'][row] = about.isTopInning
+            ints['at_bat_index'][row] = about.atBatIndex
+            ints['runs_to_start'][row] = walker.runs_to_start
+            ints['runs_to_end'][row] = walker.runs_to_end
+            ints['total_half_inning_runs'][row] = walker.total_half_inning_runs
+            ints['away_score'][row] = walker.away_score
+            ints['home_score'][row] = walker.home_score
+            categories['batter'][row] = matchup.batter.fullName
+            ints['batter_id'][row] = matchup.batter.id
+            categories['bat_side'][row] = matchup.bat_side.description
+            categories['pitcher'][row] = matchup.pitcher.fullName
+            ints['pitcher_id'][row] = matchup.pitcher.id
+            categories['pitch_hand'][row] = matchup.pitch_hand.description
+
+            categories['pitch_result'][row] = details.description
+            categories['pitch_result_code'][row] = details.code
+            if details.type is not None:
+                categories['pitch_type_code'][row] = details.type.code
+                categories['pitch_type_description'][row] = details.type.description
+
+            ints['balls'][row] = balls
+            ints['strikes'][row] = strikes
+            ints['outs'][row] = event.count.outs
+            ints['pitch_index'][row] = event.index
+
+            floats['pitch_start_speed'][row] = _float(pitch_data.startSpeed)
+            floats['pitch_end_speed'][row] = _float(pitch_data.endSpeed)
+            floats['strike_zone_top'][row] = _float(coordinates.sZ_top)
+            floats['strike_zone_bottom'][row] = _float(coordinates.sZ_bot)
+            floats['zone'][row] = _float(pitch_data.zone)
+            floats['type_confidence'][row] = _float(pitch_data.typeConfidence)
+            floats['plate_time'][row] = _float(pitch_data.plateTime)
+            floats['extension'][row] = _float(pitch_data.extension)
+
+            # same (swapped) columns as GameParser
+            floats['px_min'][row] = _float(coordinates.pX_max)
+            floats['px_max'][row] = _float(coordinates.pX_min)
+            floats['pz_min'][row] = _float(coordinates.pZ_min)
+            floats['pz_max'][row] = _float(coordinates.pZ_max)
+            floats['px'][row] = _float(coordinates.pX)
+            floats['pz'][row] = _float(coordinates.pZ)
+
+            breaks = pitch_data.breaks
+            if breaks:
+                for name, attribute in _BREAKS:
+                    floats[name][row] = _float(getattr(breaks, attribute))
+
+            objects['pitch_start_time'][row] = event.start_time
+            objects['pitch_end_time'][row] = event.end_time
+
+            runners = walker.runners.runners
+            bools['is_first_base'][row] = runners[0]
+            bools['is_second_base'][row] = runners[1]
+            bools['is_third_base'][row] = runners[2]
+
+            if event.index == last_index:
+                categories['at_bat_event'][row] = result.event
+                categories['at_bat_event_type'][row] = result.eventType
+                objects['at_bat_description'][row] = result.description
+                floats['at_bat_rbi'][row] = _float(result.rbi)
+
+            hit_data = event.hit_data
+            if hit_data is not None:
+                floats['batted_ball_launch_speed'][row] = _float(hit_data.launchSpeed)
+                floats['batted_ball_launch_angle'][row] = _float(hit_data.launchAngle)
+                floats['batted_ball_total_distance'][row] = _float(hit_data.totalDistance)
+                categories['batted_ball_trajectory'][row] = hit_data.trajectory
+                categories['batted_ball_hardness'][row] = hit_data.hardness
+                categories['batted_ball_location'][row] = hit_data.location
+                floats['batted_ball_coordinates_x'][row] = _float(hit_data.coordinates.coordX)
+                floats['batted_ball_coordinates_y'][row] = _float(hit_data.coordinates.coordY)
+
+            row += 1
+
+        walker.end_at_bat(at_bat)
+
+    floats['umpire_run_favor'], floats['umpire_wp_favor'] = calculate_favors_batch(
+        pitch_result_code=categories['pitch_result_code'].to_categorical().astype(object),
+        px=floats['px'],
+        pz=floats['pz'],
+        pz_min=floats['pz_min'],
+        pz_max=floats['pz_max'],
+        balls=ints['balls'],
+        strikes=ints['strikes'],
+        outs=ints['outs'],
+        runners=runners_bitmask(bools['is_first_base'], bools['is_second_base'],
+            bools['is_third_base']),
+        inning=ints['inning'],
+        is_top_inning=bools['is_top_inning'],
+        home_lead=ints['home_score'].astype(np.int64) - ints['away_score'])
+
+    floats['batted_ball_xba'], floats['batted_ball_xslg'] = score_batted_balls(
+        categories['at_bat_event_type'].to_categorical().astype(object),
+        floats['batted_ball_launch_speed'], floats['batted_ball_launch_angle'])
+
+    columns: Dict[str, Column] = {}
+    columns.update(ints)
+    columns.update(bools)
+    columns.update(floats)
+    columns.update(objects)
+    columns.update({name: column.to_categorical() for name, column in categories.items()})
+    columns.update({name: _constant_column(value, size) for name, value in constants.items()})
+
+    return {name: columns[name] for name in GameParser.field_names}
+
+
+def pitch_dataframe(game: Game) -> pd.DataFrame:
+    """
+    Returns the same pitches as GameParser(game).dataframe built
+    directly from the columns of extract_pitch_arrays
+
+    Args:
+        game (Game): The game
+
+    Returns:
+        pd.DataFrame: One row per pitch
+    """
+    return pd.DataFrame(extract_pitch_arrays(game), columns=GameParser.field_names)
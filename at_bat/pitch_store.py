@@ -0,0 +1,624 @@
+"""
+Columnar pitch store: the rows of GameParser as Parquet files instead
+of one pitch.csv.
+
+The wide rows are split into tables joined by integer keys:
+
+    games               one row per gamepk
+    plate_appearances   one row per (gamepk, at_bat_index)
+    pitches             one row per (gamepk, at_bat_index, pitch_index)
+    players             player_id (MLB id) to name
+    venues              venue_id (MLB id) to stadium, field and roof
+
+so game and plate appearance columns are stored once instead of on
+every pitch, and batter and pitcher are MLB ids instead of names. Every
+column has a fixed Arrow type and repeated strings are dictionary
+encoded. The fact tables are partitioned by season and local game
+date, one file per date:
+
+    pitches/pitches/season=2024/game_date=2024-06-01/pitches.parquet
+    pitches/players.parquet
+
+Writing a game again replaces its rows, so a resumed download never
+duplicates rows. One file per game would be simpler to write but every
+file adds a fixed cost to reading, a few ms each. read_pitches() joins
+the tables back into wide rows, reading only the tables and columns it
+needs, and read_table() returns a table as it is stored for joins with
+standings or boxscore data.
+
+Example:
+    write_pitches(GameParser(gamepk=745123).game_data, 'pitches')
+    df = read_pitches('pitches', columns=RE288.columns, seasons=[2024])
+    games = read_table('pitches', 'games', seasons=[2024])
+"""
+
+import datetime
+import os
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+PITCH_SCHEMA = pa.schema([
+    ('gamepk', pa.int32()),
+    ('game_time', pa.string()),
+    ('away_final_score', pa.int16()),
+    ('home_final_score', pa.int16()),
+    ('innings_final', pa.int16()),
+    ('stadium', _CATEGORY),
+    ('time_zone', pa.int8()),
+    ('field_type', _CATEGORY),
+    ('roof_type', _CATEGORY),
+    ('weather_sky', _CATEGORY),
+    ('temperature', _CATEGORY),
+    ('wind', _CATEGORY),
+    ('attendance', pa.int32()),
+    ('game_duration', pa.int32()),
+    ('inning', pa.int8()),
+    ('is_top_inning', pa.bool_()),
+    ('runs_to_start', pa.int16()),
+    ('runs_to_end', pa.int16()),
+    ('total_half_inning_runs', pa.int16()),
+    ('away_score', pa.int16()),
+    ('home_score', pa.int16()),
+    ('batter', _CATEGORY),
+    ('bat_side', _CATEGORY),
+    ('pitcher', _CATEGORY),
+    ('pitch_hand', _CATEGORY),
+    ('pitch_result', _CATEGORY),
+    ('pitch_result_code', _CATEGORY),
+    ('pitch_type_code', _CATEGORY),
+    ('pitch_type_description', _CATEGORY),
+    ('plate_time', pa.float64()),
+    ('at_bat_event', _CATEGORY),
+    ('at_bat_event_type', _CATEGORY),
+    ('at_bat_description', pa.string()),
+    ('at_bat_rbi', pa.int8()),
+    ('batted_ball_launch_speed', pa.float64()),
+    ('batted_ball_launch_angle', pa.float64()),
+    ('batted_ball_total_distance', pa.float64()),
+    ('batted_ball_trajectory', _CATEGORY),
+    ('batted_ball_hardness', _CATEGORY),
+    ('batted_ball_location', _CATEGORY),
+    ('batted_ball_coordinates_x', pa.float64()),
+    ('batted_ball_coordinates_y', pa.float64()),
+    ('batted_ball_xba', pa.float64()),
+    ('batted_ball_xslg', pa.float64()),
+    ('is_first_base', pa.bool_()),
+    ('is_second_base', pa.bool_()),
+    ('is_third_base', pa.bool_()),
+    ('balls', pa.int8()),
+    ('strikes', pa.int8()),
+    ('outs', pa.int8()),
+    ('pitch_index', pa.int16()),
+    ('pitch_start_speed', pa.float64()),
+    ('pitch_end_speed', pa.float64()),
+    ('strike_zone_top', pa.float64()),
+    ('strike_zone_bottom', pa.float64()),
+    ('zone', pa.int8()),
+    ('type_confidence', pa.float64()),
+    ('pitch_start_time', pa.string()),
+    ('pitch_end_time', pa.string()),
+    ('extension', pa.float64()),
+    ('px', pa.float64()),
+    ('pz', pa.float64()),
+    ('px_min', pa.float64()),
+    ('px_max', pa.float64()),
+    ('pz_min', pa.float64()),
+    ('pz_max', pa.float64()),
+    ('breaks_angle', pa.float64()),
+    ('breaks_length', pa.float64()),
+    ('breaks_y', pa.float64()),
+    ('break_vertical', pa.float64()),
+    ('break_vertical_induced', pa.float64()),
+    ('break_horizontal', pa.float64()),
+    ('spin_rate', pa.int16()),
+    ('spin_direction', pa.int16()),
+    ('umpire_wp_favor', pa.float64()),
+    ('umpire_run_favor', pa.float64()),
+    ('venue_id', pa.int32()),
+    ('at_bat_index', pa.int16()),
+    ('batter_id', pa.int32()),
+    ('pitcher_id', pa.int32()),
+])
+
+# read as text from pitch.csv even if every value looks like a number
+# (ex: temperature)
+_TEXT_COLUMNS = [field.name for field in PITCH_SCHEMA
+    if pa.types.is_string(field.type) or pa.types.is_dictionary(field.type)]
+
+PARTITIONING = ds.partitioning(pa.schema([('season', pa.int16()),
+    ('game_date', pa.string())]), flavor='hive')
+
+# fact tables, partitioned by season and game date
+GAME_COLUMNS = ['gamepk', 'game_time', 'away_final_score', 'home_final_score',
+    'innings_final', 'venue_id', 'time_zone', 'weather_sky', 'temperature', 'wind',
+    'attendance', 'game_duration']
+
+# the result of the plate appearance is on one pitch of the wide rows,
+# result_pitch_index
+RESULT_COLUMNS = ['at_bat_event', 'at_bat_event_type', 'at_bat_description', 'at_bat_rbi']
+
+PLATE_APPEARANCE_COLUMNS = ['gamepk', 'at_bat_index', 'inning', 'is_top_inning',
+    'runs_to_start', 'runs_to_end', 'total_half_inning_runs', 'away_score', 'home_score',
+    'batter_id', 'bat_side', 'pitcher_id', 'pitch_hand', 'result_pitch_index'] + RESULT_COLUMNS
+
+# dimension tables, one file each
+VENUE_COLUMNS = ['venue_id', 'stadium', 'field_type', 'roof_type']
+
+# wide columns looked up in players
+PLAYER_NAME_COLUMNS = {'batter': 'batter_id', 'pitcher': 'pitcher_id'}
+
+PITCH_COLUMNS = ['gamepk', 'at_bat_index'] + [name for name in PITCH_SCHEMA.names
+    if name not in GAME_COLUMNS + PLATE_APPEARANCE_COLUMNS + VENUE_COLUMNS
+    and name not in PLAYER_NAME_COLUMNS]
+
+SCHEMAS = {
+    'games': pa.schema([PITCH_SCHEMA.field(name) for name in GAME_COLUMNS]),
+    'plate_appearances': pa.schema([PITCH_SCHEMA.field(name)
+        if name != 'result_pitch_index' else pa.field(name, pa.int16())
+        for name in PLATE_APPEARANCE_COLUMNS]),
+    'pitches': pa.schema([PITCH_SCHEMA.field(name) for name in PITCH_COLUMNS]),
+    'venues': pa.schema([PITCH_SCHEMA.field(name) for name in VENUE_COLUMNS]),
+    'players': pa.schema([('player_id', pa.int32()), ('name', pa.string())]),
+}
+
+FACT_TABLES = ('games', 'plate_appearances', 'pitches')
+
+# key of each dimension table
+DIMENSION_KEYS = {'venues': 'venue_id', 'players': 'player_id'}
+
+
+def game_date(game_time: str, time_zone: int) -> datetime.date:
+    """
+    Returns the local date of a game
+
+    Args:
+        game_time (str): UTC start time (ex: '2023-11-02T00:03:00Z')
+        time_zone (int): UTC offset of the stadium in hours
+
+    Returns:
+        datetime.date: Date at the stadium
+    """
+    start = datetime.datetime.fromisoformat(game_time.replace('Z', '+00:00'))
+    return (start + datetime.timedelta(hours=time_zone or 0)).date()
+
+
+def _date_path(root: str, name: str, date: datetime.date) -> str:
+    return os.path.join(root, name, f'season={date.year}', f'game_date={date.isoformat()}',
+        f'{name}.parquet')
+
+
+def _dimension_path(root: str, name: str) -> str:
+    return os.path.join(root, f'{name}.parquet')
+
+
+def _write_table(table: pa.Table, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # readers skip files starting with '.'
+    tmp_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{os.getpid()}')
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def _read_file(path: str, schema: pa.Schema = PITCH_SCHEMA) -> pa.Table:
+    return pq.read_table(path, partitioning=None).cast(schema)
+
+
+def pitch_table(rows: Union[List[dict], pd.DataFrame]) -> pa.Table:
+    """
+    Converts GameParser rows to an Arrow table with PITCH_SCHEMA
+
+    Args:
+        rows (Union[List[dict], pd.DataFrame]): GameParser.game_data or
+            a DataFrame with every column and text columns as str
+
+    Raises:
+        ValueError: If a DataFrame is missing columns (a pitch.csv
+            written before the id columns were added)
+
+    Returns:
+        pa.Table: The rows
+    """
+    if isinstance(rows, pd.DataFrame):
+        missing = [name for name in PITCH_SCHEMA.names if name not in rows.columns]
+        if missing:
+            raise ValueError(f'missing columns {missing}, write pitch.csv again with '
+                '"2. generate_pitch_csv.py"')
+        return pa.Table.from_pandas(rows[PITCH_SCHEMA.names], schema=PITCH_SCHEMA,
+            preserve_index=False)
+    return pa.Table.from_pylist(rows, schema=PITCH_SCHEMA)
+
+
+def _int_keys(*columns: pa.ChunkedArray) -> np.ndarray:
+    # one int64 per row, -1 where a key is missing. MLB ids and gamepks
+    # fit in 32 bits and at bat indexes in 16
+    keys = np.zeros(len(columns[0]), dtype=np.int64)
+    missing = np.zeros(len(columns[0]), dtype=np.bool_)
+    for column in columns:
+        missing |= column.is_null().to_numpy(zero_copy_only=False)
+        keys = (keys << 16) + pc.fill_null(column, 0).to_numpy().astype(np.int64)
+    keys[missing] = -1
+    return keys
+
+
+def _starts(keys: np.ndarray) -> np.ndarray:
+    # first row of every run of equal keys
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+def _lookup(keys: np.ndarray, table_keys: np.ndarray) -> pa.Array:
+    """
+    Returns the row of table_keys that has each key, null if there is
+    none. table_keys do not need to be sorted.
+    """
+    if len(table_keys) == 0:
+        return pa.nulls(len(keys), pa.int64())
+
+    order = np.argsort(table_keys, kind='stable')
+    sorted_keys = table_keys[order]
+    positions = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+    found = (sorted_keys[positions] == keys) & (keys != -1)
+    return pa.array(order[positions], mask=~found)
+
+
+def normalize(table: pa.Table) -> Dict[str, pa.Table]:
+    """
+    Splits wide GameParser rows into the store tables: one row per
+    game, plate appearance and pitch, plus the players and venues they
+    refer to
+
+    Args:
+        table (pa.Table): Rows with PITCH_SCHEMA, see pitch_table()
+
+    Returns:
+        Dict[str, pa.Table]: Table name to table with SCHEMAS[name]
+    """
+    # rows of a game and of a plate appearance are always next to
+    # each other
+    games = table.take(_starts(_int_keys(table.column('gamepk'))))
+
+    at_bat_keys = _int_keys(table.column('gamepk'), table.column('at_bat_index'))
+    plate_appearances = table.take(_starts(at_bat_keys))
+
+    has_result = np.zeros(table.num_rows, dtype=np.bool_)
+    for name in RESULT_COLUMNS:
+        has_result |= table.column(name).is_valid().to_numpy(zero_copy_only=False)
+    results = table.filter(pa.array(has_result))
+    rows = _lookup(_int_keys(plate_appearances.column('gamepk'),
+        plate_appearances.column('at_bat_index')), at_bat_keys[has_result])
+    results = results.take(rows)
+
+    plate_appearances = plate_appearances.select([name for name in PLATE_APPEARANCE_COLUMNS
+        if name != 'result_pitch_index' and name not in RESULT_COLUMNS])
+    plate_appearances = plate_appearances.append_column('result_pitch_index',
+        results.column('pitch_index'))
+    for name in RESULT_COLUMNS:
+        plate_appearances = plate_appearances.append_column(name, results.column(name))
+
+    players = pa.concat_tables([
+        pa.table({'player_id': table.column(key), 'name': table.column(name).cast(pa.string())})
+        for name, key in PLAYER_NAME_COLUMNS.items()])
+    venues = games.select(VENUE_COLUMNS)
+
+    return {
+        'games': games.select(GAME_COLUMNS),
+        'plate_appearances': plate_appearances.cast(SCHEMAS['plate_appearances']),
+        'pitches': table.select(PITCH_COLUMNS),
+        'venues': _unique(venues, 'venue_id'),
+        'players': _unique(players, 'player_id'),
+    }
+
+
+def _unique(table: pa.Table, key: str) -> pa.Table:
+    # last row of every key, sorted by key
+    table = table.filter(pc.is_valid(table.column(key)))
+    keys = table.column(key).to_numpy()
+    order = np.argsort(keys, kind='stable')[::-1]
+    _, first = np.unique(keys[order], return_index=True)
+    return table.take(order[first])
+
+
+def write_pitches(rows: Union[List[dict], pd.DataFrame, pa.Table], root: str) -> int:
+    """
+    Writes GameParser rows to the store. Games already in the store are
+    replaced. Only one process should write to a store at a time,
+    ingest_games has its workers write shards and merges them at the
+    end.
+
+    Args:
+        rows (Union[List[dict], pd.DataFrame, pa.Table]): See
+            pitch_table()
+        root (str): Store directory
+
+    Returns:
+        int: Rows written
+    """
+    table = rows if isinstance(rows, pa.Table) else pitch_table(rows)
+    if table.num_rows == 0:
+        return 0
+
+    starts = _starts(_int_keys(table.column('gamepk')))
+    games_by_date: Dict[datetime.date, List[pa.Table]] = {}
+    for start, end in zip(starts, np.append(starts[1:], table.num_rows)):
+        game = table.slice(start, end - start)
+        first = game.slice(0, 1).select(['game_time', 'time_zone']).to_pylist()[0]
+        date = game_date(first['game_time'], first['time_zone'])
+        games_by_date.setdefault(date, []).append(game)
+
+    dimensions: Dict[str, List[pa.Table]] = {name: [] for name in DIMENSION_KEYS}
+    for date, games in games_by_date.items():
+        tables = normalize(pa.concat_tables(games))
+        gamepks = tables['games'].column('gamepk')
+
+        for name in FACT_TABLES:
+            new = tables[name]
+            path = _date_path(root, name, date)
+
+            if os.path.exists(path):
+                old = _read_file(path, SCHEMAS[name])
+                replaced = pc.is_in(old.column('gamepk'), value_set=gamepks.combine_chunks())
+                new = pa.concat_tables([old.filter(pc.invert(replaced)), new])
+
+            _write_table(new, path)
+
+        for name in DIMENSION_KEYS:
+            dimensions[name].append(tables[name])
+
+    # the newest copy of a player or venue wins
+    for name, key in DIMENSION_KEYS.items():
+        path = _dimension_path(root, name)
+        tables = dimensions[name]
+        if os.path.exists(path):
+            tables = [_read_file(path, SCHEMAS[name])] + tables
+        _write_table(_unique(pa.concat_tables(tables), key), path)
+
+    return table.num_rows
+
+
+def write_shard(rows: List[dict], shard_dir: str, gamepk: int) -> int:
+    """
+    Writes the wide rows of one game to its own file in shard_dir.
+    Safe to call from many processes at once, see merge_shards()
+
+    Args:
+        rows (List[dict]): GameParser.game_data
+        shard_dir (str): Shard directory
+        gamepk (int): The game
+
+    Returns:
+        int: Rows written
+    """
+    table = pitch_table(rows)
+    _write_table(table, os.path.join(shard_dir, f'{gamepk}.parquet'))
+    return table.num_rows
+
+
+def merge_shards(shard_dir: str, root: str, batch_size: int = 500) -> int:
+    """
+    Writes every shard from write_shard() to the store and deletes it
+
+    Args:
+        shard_dir (str): Shard directory
+        root (str): Store directory
+        batch_size (int, optional): Shards written to the store at
+            once. Defaults to 500.
+
+    Returns:
+        int: Rows written
+    """
+    names = sorted(name for name in os.listdir(shard_dir) if name.endswith('.parquet'))
+    rows = 0
+
+    for i in range(0, len(names), batch_size):
+        paths = [os.path.join(shard_dir, name) for name in names[i:i + batch_size]]
+        rows += write_pitches(pa.concat_tables([_read_file(path) for path in paths]), root)
+        for path in paths:
+            os.remove(path)
+
+    return rows
+
+
+def read_table(root: str, name: str, columns: Sequence[str] = None,
+    seasons: Iterable[int] = None) -> pa.Table:
+    """
+    Reads one table of the store as it is stored, for joins with
+    other data keyed by gamepk or MLB id
+
+    Args:
+        root (str): Store directory
+        name (str): 'games', 'plate_appearances', 'pitches', 'venues'
+            or 'players'
+        columns (Sequence[str], optional): Columns to read. Defaults to
+            None (every column).
+        seasons (Iterable[int], optional): Only read these seasons
+            (fact tables only). Defaults to None (every season).
+
+    Raises:
+        KeyError: If name is not a store table
+
+    Returns:
+        pa.Table: The table
+    """
+    schema = SCHEMAS[name]
+    columns = schema.names if columns is None else list(columns)
+
+    if name in DIMENSION_KEYS:
+        path = _dimension_path(root, name)
+        if not os.path.exists(path):
+            return schema.empty_table().select(columns)
+        return _read_file(path, schema).select(columns)
+
+    path = os.path.join(root, name)
+    if not os.path.isdir(path):
+        return schema.empty_table().select(columns)
+
+    filter_expression = None
+    if seasons is not None:
+        filter_expression = ds.field('season').isin(list(seasons))
+
+    dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=filter_expression)
+    return table.cast(pa.schema([schema.field(column) for column in columns]))
+
+
+def _join(root: str, columns: List[str], seasons: Iterable[int] = None) -> pa.Table:
+    """
+    Rebuilds wide GameParser rows with columns from the store tables.
+    Only the tables the columns come from are read.
+    """
+    def needed(names: Iterable[str]) -> List[str]:
+        return [name for name in columns if name in names]
+
+    pitch_columns = needed(PITCH_COLUMNS)
+    plate_appearance_columns = needed(PLATE_APPEARANCE_COLUMNS)
+    player_columns = needed(PLAYER_NAME_COLUMNS)
+    venue_columns = needed(VENUE_COLUMNS[1:])
+    game_columns = needed(GAME_COLUMNS) + (['venue_id'] if venue_columns else [])
+    result_columns = needed(RESULT_COLUMNS)
+
+    keys = ['gamepk']
+    if plate_appearance_columns or player_columns:
+        keys += ['at_bat_index'] + (['pitch_index'] if result_columns else [])
+    pitches = read_table(root, 'pitches', list(dict.fromkeys(keys + pitch_columns)), seasons)
+    wide: Dict[str, pa.ChunkedArray] = {name: pitches.column(name) for name in pitch_columns}
+
+    if plate_appearance_columns or player_columns:
+        plate_appearances = read_table(root, 'plate_appearances', list(dict.fromkeys(
+            ['gamepk', 'at_bat_index'] + plate_appearance_columns
+            + [PLAYER_NAME_COLUMNS[name] for name in player_columns]
+            + (['result_pitch_index'] if result_columns else []))), seasons)
+        rows = _lookup(_int_keys(pitches.column('gamepk'), pitches.column('at_bat_index')),
+            _int_keys(plate_appearances.column('gamepk'),
+                plate_appearances.column('at_bat_index')))
+        plate_appearances = plate_appearances.take(rows)
+
+        for name in plate_appearance_columns:
+            if name not in RESULT_COLUMNS:
+                wide[name] = plate_appearances.column(name)
+
+        if result_columns:
+            # only the pitch that ended the plate appearance has the result
+            is_result = pc.fill_null(pc.equal(pitches.column('pitch_index'),
+                plate_appearances.column('result_pitch_index')), False)
+            result_rows = pa.array(np.arange(pitches.num_rows),
+                mask=~is_result.to_numpy(zero_copy_only=False))
+            for name in result_columns:
+                wide[name] = plate_appearances.column(name).take(result_rows)
+
+        if player_columns:
+            players = read_table(root, 'players')
+            player_keys = _int_keys(players.column('player_id'))
+            for name in player_columns:
+                rows = _lookup(_int_keys(plate_appearances.column(PLAYER_NAME_COLUMNS[name])),
+                    player_keys)
+                wide[name] = players.column('name').take(rows).dictionary_encode()
+
+    if game_columns:
+        games = read_table(root, 'games', list(dict.fromkeys(['gamepk'] + game_columns)),
+            seasons)
+        rows = _lookup(_int_keys(pitches.column('gamepk')), _int_keys(games.column('gamepk')))
+        games = games.take(rows)
+        wide.update({name: games.column(name) for name in game_columns})
+
+        if venue_columns:
+            venues = read_table(root, 'venues')
+            rows = _lookup(_int_keys(games.column('venue_id')),
+                _int_keys(venues.column('venue_id')))
+            venues = venues.take(rows)
+            wide.update({name: venues.column(name) for name in venue_columns})
+
+    schema = pa.schema([PITCH_SCHEMA.field(name) for name in columns])
+    return pa.table([wide[name] for name in columns], schema=schema)
+
+
+def read_pitches(path: str, columns: Sequence[str] = None,
+    seasons: Iterable[int] = None) -> pd.DataFrame:
+    """
+    Reads pitches from the store as wide GameParser rows, only the
+    columns asked for. pitch.csv files are still read with pd.read_csv.
+
+    Args:
+        path (str): Store directory or a pitch.csv file
+        columns (Sequence[str], optional): Columns to read. Defaults to
+            None (every column).
+        seasons (Iterable[int], optional): Only read these seasons
+            (store only). Defaults to None (every season).
+
+    Raises:
+        ValueError: If seasons is used with a pitch.csv file
+
+    Returns:
+        pd.DataFrame: The pitches. Dictionary encoded strings come back
+            as categoricals. Like pd.read_csv, int columns with missing
+            values come back as floats
+    """
+    columns = None if columns is None else list(dict.fromkeys(columns))
+
+    if not os.path.isdir(path):
+        if seasons is not None:
+            raise ValueError('seasons can only be read from the pitch store')
+        return pd.read_csv(path, usecols=columns)
+
+    if columns is None:
+        columns = PITCH_SCHEMA.names
+    return _join(path, columns, seasons).to_pandas()
+
+
+def row_counts(root: str) -> Dict[int, int]:
+    """
+    Returns the number of pitches of every game in the store. Only the
+    gamepk column is read.
+
+    Args:
+        root (str): Store directory
+
+    Returns:
+        Dict[int, int]: gamepk to rows
+    """
+    gamepks = read_table(root, 'pitches', ['gamepk']).column('gamepk')
+    counts = pc.value_counts(gamepks).to_pylist()
+    return {count['values']: count['counts'] for count in counts}
+
+
+def csv_to_store(csv_path: str, root: str, chunksize: int = 500_000) -> int:
+    """
+    Copies an existing pitch.csv into the store
+
+    Args:
+        csv_path (str): pitch.csv
+        root (str): Store directory
+        chunksize (int, optional): Rows read at once. Defaults to
+            500,000.
+
+    Raises:
+        ValueError: If pitch.csv was written before the id columns
+            (venue_id, at_bat_index, batter_id, pitcher_id) were added
+
+    Returns:
+        int: Rows written
+    """
+    rows = 0
+    carry = None
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize,
+        dtype=dict.fromkeys(_TEXT_COLUMNS, str)):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+
+        # the last game of a chunk can go on in the next chunk
+        last = chunk['gamepk'].iloc[-1]
+        carry = chunk[chunk['gamepk'] == last]
+        rows += write_pitches(chunk[chunk['gamepk'] != last], root)
+
+    if carry is not None:
+        rows += write_pitches(carry, root)
+    return rows
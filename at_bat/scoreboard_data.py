@@ -8,22 +8,22 @@ Raises:
     ValueError: If isTopInning is not a boolean
 """
 
-import copy
 from datetime import datetime, timedelta, timezone
 import json
 from typing import List
 import pandas as pd
+import requests
 
-from at_bat.statsapi_plus import get_re640_dataframe, get_wp780800_dataframe, get_expected_values_dataframe,find_division_from_abv
-from at_bat.game import Game
+from at_bat.state_tables import get_re640_table
+from at_bat.feed_profiles import FEED_PROFILES, project_feed
+from at_bat.game import Game, feed_fingerprint
 from at_bat.game_parser import GameParser
 from at_bat.runners import Runners
-from at_bat.standings import Standings
+from at_bat.standings import get_team_standings
+from at_bat.win_probability import get_win_probability
 
-re640 = get_re640_dataframe()
-wp780800 = get_wp780800_dataframe()
-expected_values = get_expected_values_dataframe()
-division_from_abv = find_division_from_abv()
+re640 = get_re640_table()
+wp780800 = get_win_probability()
 
 
 def dict_diff(dict1: dict, dict2: dict) -> dict:
@@ -70,14 +70,15 @@ class ScoreboardStandings:
     """
     Contains the standings data for any team based on their abbreviation.
     Seperate from the ScoreboardData object so that i can be called
-    without the need for a gamepk.
+    without the need for a gamepk. Reads from the process-wide
+    standings cache so no request is made per team.
     """
     def __init__(self, abv: str):
         self.abv = abv
 
-        try:
-            division = division_from_abv[abv]
-        except KeyError:
+        team = get_team_standings(abv)
+
+        if team is None:
             print(f'KeyError for {abv}')
             self.wins = 0
             self.losses = 0
@@ -86,46 +87,15 @@ class ScoreboardStandings:
             self.streak = 'W0'
             return None
 
-        league = division[0]
-        division = division[1]
-
-        # Spring Training
-        # if league == 'A':
-        #     standings = Standings.get_standings(league='AL')
-        #     if division == 'E':
-        #         standings = standings.central
-        #     elif division == 'C':
-        #         standings = standings.west
-        #     elif division == 'W':
-        #         standings = standings.east
-        # else:
-        #     standings = Standings.get_standings(league='NL')
-        #     if division == 'E':
-        #         standings = standings.west
-        #     elif division == 'C':
-        #         standings = standings.east
-        #     elif division == 'W':
-        #         standings = standings.central
-
-        standings = Standings.get_standings(league=f'{league}L')
-        if division == 'E':
-            standings = standings.east
-        elif division == 'C':
-            standings = standings.central
-        elif division == 'W':
-            standings = standings.west
-
-        for team in standings.team_records:
-            if team.team.abv == abv:
-                self.wins = team.wins
-                self.losses = team.losses
-                self.division_rank = team.division_rank
-                self.games_back = team.games_back
-
-                if team.streak is not None:
-                    self.streak = team.streak.streakCode
-                else:
-                    self.streak = 'W0'
+        self.wins = team.wins
+        self.losses = team.losses
+        self.division_rank = team.division_rank
+        self.games_back = team.games_back
+
+        if team.streak is not None:
+            self.streak = team.streak.streakCode
+        else:
+            self.streak = 'W0'
 
 class Flags:
     """
@@ -491,8 +461,10 @@ class Team:
             self.xba = 0
             self.xslg = 0
         else:
-            self.xba = df.loc[(df['is_top_inning'] == is_top_inning)]['batted_ball_xba'].mean()
-            self.xslg = df.loc[(df['is_top_inning'] == is_top_inning)]['batted_ball_xslg'].mean()
+            # the parser already scored every batted ball
+            team_df = df.loc[(df['is_top_inning'] == is_top_inning)]
+            self.xba = team_df['batted_ball_xba'].astype('float64').mean()
+            self.xslg = team_df['batted_ball_xslg'].astype('float64').mean()
 
         if pd.isna(self.xba):
             self.xba = 0
@@ -657,15 +629,15 @@ class HitDetails:
         self.exit_velo = pitch.get('batted_ball_launch_speed', None)
         self.launch_angle = pitch.get('batted_ball_launch_angle', None)
         self.distance = pitch.get('batted_ball_total_distance',  None)
-        self.xba = pitch.get('batted_ball_xba', None)
-        self.xslg = pitch.get('batted_ball_xslg', None)
+
+        xba = pitch.get('batted_ball_xba', None)
+        xslg = pitch.get('batted_ball_xslg', None)
+        self.xba = None if pd.isna(xba) else float(xba)
+        self.xslg = None if pd.isna(xslg) else float(xslg)
 
         if pd.isna(self.exit_velo):
             self._none()
 
-        self.xba = float(self.xba) if self.xba is not None else None
-        self.xslg = float(self.xslg) if self.xslg is not None else None
-
         return None
 
     def _none(self):
@@ -716,21 +688,13 @@ class RunExpectancy:
         runners.end_at_bat(at_bat)
         runners = int(runners)
 
-        is_first_base = bool(runners & 1)
-        is_second_base = bool(runners & 2)
-        is_third_base = bool(runners & 4)
-
-        state = ((re640['balls'] == balls) &
-                (re640['strikes'] == strikes) &
-                (re640['outs'] == outs) &
-                (re640['is_first_base'] == is_first_base) &
-                (re640['is_second_base'] == is_second_base) &
-                (re640['is_third_base'] == is_third_base))
+        state = re640.lookup_row(balls=balls, strikes=strikes, outs=outs,
+            runners=runners)
 
-        self.average_runs = re640[state]['average_runs'].iloc[0]
+        self.average_runs = state['average_runs']
 
-        no_score = re640[state]['0 runs'].iloc[0]
-        count = re640[state]['count'].iloc[0]
+        no_score = state['0 runs']
+        count = state['count']
 
         if count > 0:
             self.to_score = 1 - (no_score / count)
@@ -794,10 +758,6 @@ class WinProbability:
         runners.end_at_bat(at_bat)
         runners = int(runners)
 
-        is_first_base = bool(runners & 1)
-        is_second_base = bool(runners & 2)
-        is_third_base = bool(runners & 4)
-
         inning = game.liveData.linescore.currentInning
 
         if game_type == 'W':
@@ -833,21 +793,13 @@ class WinProbability:
             self.extras = 0
             return None
 
-        state = (
-            (wp780800['balls'] == balls) &
-            (wp780800['strikes'] == strikes) &
-            (wp780800['outs'] == outs) &
-            (wp780800['is_first_base'] == is_first_base) &
-            (wp780800['is_second_base'] == is_second_base) &
-            (wp780800['is_third_base'] == is_third_base) &
-            (wp780800['inning'] == inning) &
-            (wp780800['is_top_inning'] == isTopInning) &
-            (wp780800['home_lead'] == home_lead)
-        )
-
-        away_win = wp780800[state]['away_win'].iloc[0]
-        home_win = wp780800[state]['home_win'].iloc[0]
-        tie = wp780800[state]['tie'].iloc[0]
+        state = wp780800.lookup_row(balls=balls, strikes=strikes, outs=outs,
+            runners=runners, inning=inning, is_top_inning=isTopInning,
+            home_lead=home_lead)
+
+        away_win = state['away_win']
+        home_win = state['home_win']
+        tie = state['tie']
 
         # Split the tie between the two teams
         away_win = away_win + (tie / 2)
@@ -971,6 +923,18 @@ class BattingOrder:
             'batting_order': self.batting_order,
         }
 
+PROBE_PROFILE = 'scoreboard'
+
+
+def _probe_fingerprint(data: dict):
+    """
+    feed_fingerprint() of the PROBE_PROFILE part of a full feed. Equal
+    to the fingerprint of the probe downloaded by ScoreboardData.update
+    while the feed has not changed
+    """
+    return feed_fingerprint(project_feed(data, FEED_PROFILES[PROBE_PROFILE]))
+
+
 class ScoreboardData:
     """
     A simplified version of the Game object which holds information
@@ -982,10 +946,31 @@ class ScoreboardData:
         self.gamepk: int = gamepk
         self.delay_seconds: int = delay_seconds
 
-        self.game = Game.get_game_from_pk(gamepk=self.gamepk,
-            delay_seconds=delay_seconds)
+        # lazy so only the parts of the feed that are read get built
+        data = Game.get_dict(gamepk=self.gamepk, delay_seconds=delay_seconds)
+        if data is None:
+            raise requests.exceptions.RetryError(f'could not download game {gamepk}')
+        self.game = Game(data, lazy=True)
 
         self.parser = GameParser(game=self.game)
+        self._set_game(self.game)
+
+        # update() does nothing if the next feed has the same fingerprint
+        self._fingerprint = feed_fingerprint(data)
+        self._probe_fingerprint = _probe_fingerprint(data)
+        self.changed: bool = True
+
+        # last dictionary returned by to_dict() in
+        # update_return_difference(). Diffs are taken against it
+        # instead of a copy of the whole object
+        self._snapshot: dict = None
+
+    def _set_game(self, game: Game):
+        """
+        Sets every scoreboard attribute from the game. The parser is
+        expected to already be up to date with the game
+        """
+        self.game = game
         self.dataframe = self.parser.dataframe
 
         # success = False
@@ -1036,10 +1021,14 @@ class ScoreboardData:
         self.away = Team(game=self.game, df=self.dataframe, team='away')
         self.home = Team(game=self.game, df=self.dataframe, team='home')
         self.pitch_details = PitchDetails(game=self.game, df=self.dataframe)
-        self.hit_details = HitDetails(df=self.dataframe)
         self.run_expectancy = RunExpectancy(game=self.game)
         self.win_probability = WinProbability(game=self.game)
-        self.umpire = UmpireDetails(df=self.dataframe)
+
+        # these only depend on the parsed pitches so they are kept
+        # when the parser did not change any rows
+        if self.parser.changed or not hasattr(self, 'umpire'):
+            self.hit_details = HitDetails(df=self.dataframe)
+            self.umpire = UmpireDetails(df=self.dataframe)
         self.batting_order = BattingOrder(game=self.game, state=self.game_state)
         self.flags = Flags(game=self.game)
 
@@ -1054,34 +1043,69 @@ class ScoreboardData:
         Args:
             delay_seconds (int, optional): The number of seconds to delay
                 the data retrieval. Defaults to None.
+
+        Returns:
+            ScoreboardData: self
         """
         if delay_seconds is not None:
             self.delay_seconds = delay_seconds
 
-        new_game = ScoreboardData(gamepk=self.gamepk,
-                                  delay_seconds=self.delay_seconds)
+        # most polls land between pitches and return the same feed so
+        # only the small 'scoreboard' profile is downloaded to check.
+        # metaData.timeStamp is in it and changes with every update
+        probe = Game.get_dict(gamepk=self.gamepk, delay_seconds=self.delay_seconds,
+            profile=PROBE_PROFILE)
+        if probe is not None and feed_fingerprint(probe) == self._probe_fingerprint:
+            self.changed = False
+            return self
+
+        data = Game.get_dict(gamepk=self.gamepk, delay_seconds=self.delay_seconds)
+        if data is None:
+            # keep the last data until the next poll
+            self.changed = False
+            return self
 
-        new_game.check_postponed()
+        fingerprint = feed_fingerprint(data)
+        self._probe_fingerprint = _probe_fingerprint(data)
+        self.changed = fingerprint != self._fingerprint
+        if not self.changed:
+            return self
+        self._fingerprint = fingerprint
 
-        self.__dict__.update(new_game.__dict__)
+        game = Game(data, lazy=True)
 
-        return new_game
+        # only the new/changed at bats are parsed
+        self.parser.advance(game)
+        self._set_game(game)
+
+        return self
 
     def update_return_difference(self, delay_seconds: int = None) -> dict:
         """Return the difference between the current ScoreboardData
         object as a dictionary
         Also updates itself with the new data
 
+        Only the to_dict() output from the last call is kept to compare
+        against, so each update does not copy the whole object (game,
+        parser and dataframe)
+
         Returns:
             dict: The difference between the current ScoreboardData object
         """
+        old_snapshot = self._snapshot
+        if old_snapshot is None:
+            old_snapshot = self.to_dict()
 
-        old_game = copy.deepcopy(self)
-        new_game = self.update(delay_seconds=delay_seconds)
+        self.update(delay_seconds=delay_seconds)
+        if not self.changed:
+            self._snapshot = old_snapshot
+            return {}
 
-        diff = dict_diff(old_game.to_dict(), new_game.to_dict())
-
-        return diff
+        # the sections built only from the parsed pitches were kept
+        # by _set_game() if the parser did not change any rows
+        keep = old_snapshot if not self.parser.changed else None
+        self._snapshot = self._to_dict(keep=keep)
+        return dict_diff(old_snapshot, self._snapshot)
 
     def to_dict(self) -> dict:
         """Return a dictionary representation of the ScoreboardData object
@@ -1089,6 +1113,20 @@ class ScoreboardData:
         Returns:
             dict: Dictionary representation of the ScoreboardData object
         """
+        return self._to_dict()
+
+    def _to_dict(self, keep: dict = None) -> dict:
+        """
+        to_dict(), with the hit_details and umpire sections taken from
+        keep (an earlier to_dict()) instead of being built again
+        """
+        if keep is None:
+            hit_details = self.hit_details.to_dict()
+            umpire = self.umpire.to_dict()
+        else:
+            hit_details = keep['hit_details']
+            umpire = keep['umpire']
+
         return {'gamepk': self.gamepk,
                 'game_state': self.game_state,
                 'start_time': self.start_time,
@@ -1101,10 +1139,10 @@ class ScoreboardData:
                 'matchup': self.matchup.to_dict(),
                 'count': self.count.to_dict(),
                 'pitch_details': self.pitch_details.to_dict(),
-                'hit_details': self.hit_details.to_dict(),
+                'hit_details': hit_details,
                 'run_expectancy': self.run_expectancy.to_dict(),
                 'win_probability': self.win_probability.to_dict(),
-                'umpire': self.umpire.to_dict(),
+                'umpire': umpire,
                 'batting_order': self.batting_order.to_dict(),
                 'flags': self.flags.to_dict(),
                 'runners': self.runners}
@@ -0,0 +1,324 @@
+"""
+Scoreboard data for every game of a day from a single schedule
+request with the linescore hydrated, instead of downloading the full
+live feed of each game.
+
+The schedule only has what fits on a small scoreboard (score, inning,
+outs, runners, ...). SlateGame.scoreboard() downloads the full feed of
+a game when pitch level details are needed.
+
+Classes:
+    SlateSnapshot: Every game of the day
+    SlateGame: One game of the schedule
+    SlateHistory: Recent snapshots, to show the slate delay_seconds
+        behind like ScoreboardData(delay_seconds=...)
+
+Example:
+    slate = SlateSnapshot.get('2024-05-29')
+    for gamepk, game in slate.to_dict().items():
+        print(gamepk, game['away_score'], game['home_score'])
+
+    changes = SlateSnapshot.get('2024-05-29').diff(slate)
+"""
+
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, List, Tuple
+
+from at_bat.game import Linescore, Status, _convert_zulu_to_local
+from at_bat.http_client import get_client
+from at_bat.runners import Runners
+from at_bat.slate_poller import (DELAYED_INTERVAL, LIVE_INTERVAL, PREGAME_MAX_SLEEP,
+    poll_interval)
+
+HYDRATE = 'linescore,team,venue(timezone)'
+
+
+class SlateGame:
+    """
+    One game from the hydrated schedule. Has the same values as
+    ScoreboardData for the fields used by the scoreboard matrix
+    """
+    def __init__(self, game: dict):
+        self.gamepk: int = game['gamePk']
+        self.game_date: str = game['gameDate']
+
+        self.status = Status(game['status'])
+        self.game_state: str = self.status.game_state
+        self._check_postponed(game.get('venue', {}))
+
+        teams = game['teams']
+        self.away_abv: str = teams['away']['team'].get('abbreviation', None)
+        self.home_abv: str = teams['home']['team'].get('abbreviation', None)
+
+        start_time = _convert_zulu_to_local(self.game_date)
+        if start_time is None:
+            self.start_time = '0:00'
+        else:
+            self.start_time = f'{start_time[0]}:{start_time[1]:02d}'
+
+        linescore = Linescore(game.get('linescore', {}))
+
+        self.away_score: int = 0
+        self.home_score: int = 0
+        if linescore.teams is not None:
+            self.away_score = linescore.teams.away.runs or 0
+            self.home_score = linescore.teams.home.runs or 0
+
+        self.inning: int = linescore.currentInning
+        self.inning_state: str = 'T' if linescore.isTopInning is True else 'B'
+
+        # postponed or suspended games do not have an inning
+        if self.inning is None:
+            self.inning = 1
+            self.inning_state = 'T'
+
+        self.outs: int = linescore.outs or 0
+
+        runners = Runners()
+        if linescore.offense is not None:
+            runners.set_bases_from_offense(linescore.offense)
+        self.runners: int = int(runners)
+
+        self._scoreboard = None
+
+    def _check_postponed(self, venue: dict):
+        """
+        Same as ScoreboardData.check_postponed. The schedule moves the
+        start date of a postponed game instead of marking it
+        """
+        time_zone = venue.get('timeZone', None)
+        if time_zone is None or self.game_date is None:
+            return
+
+        utc_offset = timedelta(hours=time_zone['offset'])
+
+        game_start_zulu = datetime.fromisoformat(self.game_date.rstrip('Z'))
+        game_start_stadium = game_start_zulu + utc_offset
+        local_time_stadium = datetime.now(timezone.utc) + utc_offset
+
+        if game_start_stadium.date() > local_time_stadium.date():
+            self.game_state = 'S' # Suspended/Postponed
+
+    def scoreboard(self, delay_seconds: int = 0):
+        """
+        Downloads the full feed of the game for pitch level details.
+        Only downloaded the first time it is called
+
+        Args:
+            delay_seconds (int, optional): Passed to ScoreboardData.
+                Defaults to 0.
+
+        Returns:
+            ScoreboardData: The game
+        """
+        # imported here since scoreboard_data loads the state tables
+        from at_bat.scoreboard_data import ScoreboardData # pylint: disable=C0415
+
+        if self._scoreboard is None:
+            self._scoreboard = ScoreboardData(gamepk=self.gamepk, delay_seconds=delay_seconds)
+        return self._scoreboard
+
+    def to_dict(self) -> dict:
+        """
+        Return the scoreboard matrix fields of the game (the keys of
+        get_request_dict in examples/scoreboard_matrix.py)
+
+        Returns:
+            dict: Dictionary representation of the game
+        """
+        return {
+            'game_state': self.game_state,
+            'away_abv': self.away_abv,
+            'home_abv': self.home_abv,
+            'away_score': self.away_score,
+            'home_score': self.home_score,
+            'start_time': self.start_time,
+            'inning': self.inning,
+            'inning_state': self.inning_state,
+            'outs': self.outs,
+            'runners': self.runners,
+            'gamepk': self.gamepk,
+        }
+
+    @property
+    def start(self) -> datetime:
+        """
+        Returns:
+            datetime: Scheduled first pitch in UTC
+        """
+        return datetime.fromisoformat(self.game_date.replace('Z', '+00:00'))
+
+    def __repr__(self):
+        return f'{self.away_abv} {self.away_score} @ {self.home_abv} {self.home_score}'
+
+
+class SlateSnapshot:
+    """
+    Every game of a day from statsapi.get('schedule') with the
+    linescore hydrated
+
+    Attributes:
+        games (List[SlateGame]): Games in schedule order
+    """
+    def __init__(self, schedule: dict):
+        self.games: List[SlateGame] = []
+
+        for date in schedule.get('dates', []):
+            for game in date['games']:
+                self.games.append(SlateGame(game))
+
+    @classmethod
+    def get(cls, date: str = None) -> 'SlateSnapshot':
+        """
+        Downloads the schedule for a day
+
+        Args:
+            date (str, optional): Date in ISO 8601 format (YYYY-MM-DD).
+                Defaults to today.
+
+        Returns:
+            SlateSnapshot: Every game of the day
+        """
+        params = {'sportId': 1, 'hydrate': HYDRATE}
+        if date is not None:
+            params['date'] = date
+
+        schedule = get_client().get('schedule', params)
+        return cls(schedule)
+
+    @property
+    def gamepks(self) -> List[int]:
+        return [game.gamepk for game in self.games]
+
+    def game(self, gamepk: int) -> SlateGame:
+        """
+        Returns the game with the gamepk
+
+        Raises:
+            KeyError: If the game is not in the snapshot
+        """
+        for game in self.games:
+            if game.gamepk == gamepk:
+                return game
+        raise KeyError(gamepk)
+
+    def to_dict(self) -> Dict[int, dict]:
+        """
+        Returns:
+            Dict[int, dict]: gamepk to SlateGame.to_dict()
+        """
+        return {game.gamepk: game.to_dict() for game in self.games}
+
+    def diff(self, previous: 'SlateSnapshot') -> Dict[int, dict]:
+        """
+        Returns the fields of each game that changed since an older
+        snapshot. Games that are new have every field. Games without
+        changes are left out
+
+        Args:
+            previous (SlateSnapshot): The older snapshot
+
+        Returns:
+            Dict[int, dict]: gamepk to changed fields
+        """
+        old = previous.to_dict() if previous is not None else {}
+        changes = {}
+
+        for gamepk, new_game in self.to_dict().items():
+            old_game = old.get(gamepk, {})
+            changed = {key: value for key, value in new_game.items()
+                if old_game.get(key, None) != value}
+            if changed:
+                changes[gamepk] = changed
+
+        return changes
+
+    def next_interval(self, live_interval: float = LIVE_INTERVAL,
+        delayed_interval: float = DELAYED_INTERVAL,
+        pregame_max_sleep: float = PREGAME_MAX_SLEEP) -> float:
+        """
+        Returns how many seconds to wait before downloading the slate
+        again: the soonest any game needs it by the rules of
+        SlatePoller (fast when a game is live, not at all once every
+        game is final)
+
+        Returns:
+            float: Seconds to wait, None if every game has stopped
+        """
+        intervals = [poll_interval(game.game_state, game.start, live_interval,
+            delayed_interval, pregame_max_sleep) for game in self.games]
+        intervals = [interval for interval in intervals if interval is not None]
+        return min(intervals) if intervals else None
+
+
+class SlateHistory:
+    """
+    Snapshots from the last delay_seconds so the slate can be shown as
+    it was delay_seconds ago, in step with a TV broadcast
+
+    Attributes:
+        delay_seconds (float): How far behind the shown slate is
+        latest (SlateSnapshot): Newest snapshot added. None until one
+            is added
+    """
+    def __init__(self, delay_seconds: float = 0):
+        self.delay_seconds = delay_seconds
+        self.latest: SlateSnapshot = None
+        self._snapshots: Deque[Tuple[float, SlateSnapshot]] = deque()
+
+    def add(self, snapshot: SlateSnapshot, taken: float = None):
+        """
+        Adds a snapshot
+
+        Args:
+            snapshot (SlateSnapshot): The snapshot
+            taken (float, optional): time.time() it was downloaded.
+                Defaults to now.
+        """
+        if taken is None:
+            taken = time.time()
+        self._snapshots.append((taken, snapshot))
+        self.latest = snapshot
+
+    def delayed(self, now: float = None) -> SlateSnapshot:
+        """
+        Returns the newest snapshot that is at least delay_seconds old.
+        Older snapshots are dropped
+
+        Args:
+            now (float, optional): time.time(). Defaults to now.
+
+        Returns:
+            SlateSnapshot: The snapshot, None if there is none yet
+        """
+        if now is None:
+            now = time.time()
+
+        while len(self._snapshots) > 1 and self._snapshots[1][0] <= now - self.delay_seconds:
+            self._snapshots.popleft()
+
+        if not self._snapshots or self._snapshots[0][0] > now - self.delay_seconds:
+            return None
+        return self._snapshots[0][1]
+
+    def until_next(self, now: float = None) -> float:
+        """
+        Returns the seconds until delayed() returns a newer snapshot
+
+        Args:
+            now (float, optional): time.time(). Defaults to now.
+
+        Returns:
+            float: Seconds, None if every snapshot has been shown
+        """
+        if now is None:
+            now = time.time()
+
+        self.delayed(now)
+        for taken, _ in self._snapshots:
+            wait = taken + self.delay_seconds - now
+            if wait > 0:
+                return wait
+        return None
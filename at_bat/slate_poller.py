@@ -0,0 +1,317 @@
+"""
+Polls every game of a slate at once and sends the changes to
+subscribers.
+
+Each game is updated in a thread pool so one slow request does not hold
+up the other games, and each game is polled at a rate that depends on
+its Status.game_state:
+
+    'P' (pre-game): sleeps until the scheduled first pitch
+    'L' (live): every live_interval seconds
+    'D' (delayed) and 'S' (suspended/postponed): every
+        delayed_interval seconds
+    'F' (final) and 'C' (cancelled): stops polling
+
+poll_interval() has the same rules for anything with a game state and
+a start time (SlateSnapshot.next_interval uses it for the whole slate).
+
+Subscribers get (gamepk, diff) tuples, either through a callback or a
+queue.Queue. The first diff for a game is its whole to_dict().
+Callbacks are called from the thread running the poller, one at a time.
+
+Example:
+    poller = SlatePoller(get_daily_gamepks(), delay_seconds=60)
+    updates = poller.subscribe_queue()
+    poller.start()
+
+    while True:
+        gamepk, diff = updates.get()
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from at_bat.scoreboard_data import ScoreboardData
+
+LIVE_INTERVAL = 5
+DELAYED_INTERVAL = 60
+PREGAME_MAX_SLEEP = 1800 # start times can change so check every so often
+STOP_STATES = ('F', 'C')
+
+Update = Tuple[int, dict]
+
+
+def poll_interval(game_state: str, start: datetime, live_interval: float = LIVE_INTERVAL,
+    delayed_interval: float = DELAYED_INTERVAL,
+    pregame_max_sleep: float = PREGAME_MAX_SLEEP) -> float:
+    """
+    Returns how many seconds to wait before polling a game again
+
+    Args:
+        game_state (str): Status.game_state of the game
+        start (datetime): Scheduled first pitch (timezone aware)
+        live_interval (float, optional): Seconds between polls of a
+            live game. Defaults to 5.
+        delayed_interval (float, optional): Seconds between polls of a
+            delayed or suspended game. Defaults to 60.
+        pregame_max_sleep (float, optional): Longest a pre-game game
+            goes without being checked. Defaults to 1800.
+
+    Returns:
+        float: Seconds to wait, None to stop polling the game
+    """
+    if game_state in STOP_STATES:
+        return None
+
+    if game_state == 'L':
+        return live_interval
+
+    if game_state == 'P':
+        until_start = (start - datetime.now(timezone.utc)).total_seconds()
+        return min(max(until_start, live_interval), pregame_max_sleep)
+
+    return delayed_interval
+
+
+class SlatePoller:
+    """
+    Keeps a ScoreboardData up to date for every game in a slate
+
+    Attributes:
+        scoreboards (Dict[int, ScoreboardData]): Latest data for every
+            game that has been fetched
+        next_poll (Dict[int, float]): time.time() each game will be
+            polled next. Games that are no longer polled are removed
+    """
+    def __init__(self, gamepks: Iterable[int], delay_seconds: int = 0,
+        max_workers: int = 16, live_interval: float = LIVE_INTERVAL,
+        delayed_interval: float = DELAYED_INTERVAL,
+        pregame_max_sleep: float = PREGAME_MAX_SLEEP,
+        scoreboard_factory: Callable[[int], 'ScoreboardData'] = None):
+        """
+        Args:
+            gamepks (Iterable[int]): Games to poll
+            delay_seconds (int, optional): Passed to ScoreboardData.
+                Defaults to 0.
+            max_workers (int, optional): Games fetched at once.
+                Defaults to 16.
+            live_interval (float, optional): Seconds between polls of
+                a live game. Defaults to 5.
+            delayed_interval (float, optional): Seconds between polls
+                of a delayed or suspended game. Defaults to 60.
+            pregame_max_sleep (float, optional): Longest a pre-game
+                game goes without being checked. Defaults to 1800.
+            scoreboard_factory (Callable[[int], ScoreboardData],
+                optional): Creates the ScoreboardData for a gamepk.
+                Defaults to ScoreboardData(gamepk, delay_seconds)
+        """
+        self.delay_seconds = delay_seconds
+        self.max_workers = max_workers
+        self.live_interval = live_interval
+        self.delayed_interval = delayed_interval
+        self.pregame_max_sleep = pregame_max_sleep
+
+        if scoreboard_factory is None:
+            scoreboard_factory = self._new_scoreboard
+        self._scoreboard_factory = scoreboard_factory
+
+        self.scoreboards: Dict[int, 'ScoreboardData'] = {}
+        self.next_poll: Dict[int, float] = {}
+
+        self._callbacks: List[Callable[[int, dict], None]] = []
+        self._queues: List[queue.Queue] = []
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._done: queue.Queue = queue.Queue() # finished polls, None wakes run()
+        self._in_flight: Dict[int, Future] = {}
+        self._thread: threading.Thread = None
+
+        self.set_gamepks(gamepks)
+
+    def _new_scoreboard(self, gamepk: int) -> 'ScoreboardData':
+        # imported here since scoreboard_data loads the state tables
+        from at_bat.scoreboard_data import ScoreboardData # pylint: disable=C0415
+        return ScoreboardData(gamepk=gamepk, delay_seconds=self.delay_seconds)
+
+    def subscribe(self, callback: Callable[[int, dict], None]):
+        """
+        Calls callback(gamepk, diff) every time a game changes
+
+        Args:
+            callback (Callable[[int, dict], None]): The callback
+        """
+        self._callbacks.append(callback)
+
+    def subscribe_queue(self, maxsize: int = 0) -> queue.Queue:
+        """
+        Returns a queue that (gamepk, diff) tuples are put on every
+        time a game changes
+
+        Args:
+            maxsize (int, optional): Passed to queue.Queue. Defaults to
+                0 (no limit).
+
+        Returns:
+            queue.Queue: The queue
+        """
+        updates = queue.Queue(maxsize=maxsize)
+        self._queues.append(updates)
+        return updates
+
+    def set_gamepks(self, gamepks: Iterable[int]):
+        """
+        Changes the games that are polled. New games are polled right
+        away and games that are not in gamepks are dropped
+
+        Args:
+            gamepks (Iterable[int]): Games to poll
+        """
+        gamepks = list(dict.fromkeys(gamepks))
+        now = time.time()
+
+        with self._lock:
+            for gamepk in list(self.scoreboards):
+                if gamepk not in gamepks:
+                    del self.scoreboards[gamepk]
+            for gamepk in list(self.next_poll):
+                if gamepk not in gamepks:
+                    del self.next_poll[gamepk]
+            for gamepk in gamepks:
+                if gamepk not in self.scoreboards and gamepk not in self.next_poll:
+                    self.next_poll[gamepk] = now
+
+        self._done.put(None)
+
+    def next_interval(self, scoreboard: 'ScoreboardData') -> float:
+        """
+        Returns how many seconds to wait before polling a game again
+
+        Args:
+            scoreboard (ScoreboardData): The latest data for the game
+
+        Returns:
+            float: Seconds to wait, None to stop polling the game
+        """
+        return poll_interval(scoreboard.game_state, scoreboard.game.gameData.datetime.datetime,
+            self.live_interval, self.delayed_interval, self.pregame_max_sleep)
+
+    def _poll(self, gamepk: int) -> Update:
+        scoreboard = self.scoreboards.get(gamepk, None)
+
+        if scoreboard is None:
+            scoreboard = self._scoreboard_factory(gamepk)
+            with self._lock:
+                self.scoreboards[gamepk] = scoreboard
+            return (gamepk, scoreboard.to_dict())
+
+        return (gamepk, scoreboard.update_return_difference())
+
+    def _publish(self, gamepk: int, diff: dict):
+        for callback in self._callbacks:
+            callback(gamepk, diff)
+        for updates in self._queues:
+            updates.put((gamepk, diff))
+
+    def _finish(self, gamepk: int, future: Future):
+        del self._in_flight[gamepk]
+
+        try:
+            _, diff = future.result()
+        except Exception as e: # pylint: disable=W0718
+            print(f'{type(e).__name__} {gamepk} | {e}')
+            with self._lock:
+                if gamepk in self.next_poll:
+                    self.next_poll[gamepk] = time.time() + self.delayed_interval
+            return
+
+        with self._lock:
+            if gamepk not in self.next_poll:
+                # dropped by set_gamepks() while in flight
+                self.scoreboards.pop(gamepk, None)
+                return
+
+            scoreboard = self.scoreboards[gamepk]
+
+            interval = self.next_interval(scoreboard)
+            if interval is None:
+                del self.next_poll[gamepk]
+            else:
+                self.next_poll[gamepk] = time.time() + interval
+
+        if diff:
+            self._publish(gamepk, diff)
+
+    def run(self):
+        """
+        Polls the games until stop() is called or every game has
+        stopped being polled. Blocks
+        """
+        self._stop.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not self._stop.is_set():
+                now = time.time()
+                with self._lock:
+                    due = [gamepk for gamepk, when in self.next_poll.items()
+                        if when <= now and gamepk not in self._in_flight]
+                    upcoming = [when for gamepk, when in self.next_poll.items()
+                        if when > now and gamepk not in self._in_flight]
+
+                for gamepk in due:
+                    future = pool.submit(self._poll, gamepk)
+                    self._in_flight[gamepk] = future
+                    future.add_done_callback(
+                        lambda future, gamepk=gamepk: self._done.put((gamepk, future)))
+
+                if not self._in_flight and not self.next_poll:
+                    break
+
+                timeout = min(upcoming) - now if upcoming else None
+
+                try:
+                    finished = [self._done.get(timeout=timeout)]
+                except queue.Empty:
+                    continue
+
+                while not self._done.empty():
+                    finished.append(self._done.get_nowait())
+
+                for item in finished:
+                    if item is not None:
+                        self._finish(*item)
+
+            for future in self._in_flight.values():
+                future.cancel()
+            self._in_flight.clear()
+
+    def start(self) -> threading.Thread:
+        """
+        Runs the poller in a background thread
+
+        Returns:
+            threading.Thread: The thread
+        """
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        """
+        Stops the poller. Games being fetched are finished first
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread
+                started by start(). Defaults to None (no limit).
+        """
+        self._stop.set()
+        self._done.put(None)
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -8,17 +8,22 @@ Classes:
     Standing: Represents the division and league standings for the
         given league (American and National)
 
+    StandingsCache: Process-wide snapshot of both leagues indexed by
+        team abbreviation and refreshed on a TTL
+
 Example:
     standings_data = statsapi.get('schedule', {'leagueId':103})
     standings_class = Standing(standings_data)
+
+    team = get_team_standings('TEX')
 """
 
 import os
-from typing import List, Union
+from typing import Callable, Dict, List, Union
 import csv
-import statsapi
-import requests
+import threading
 import time
+from at_bat.http_client import get_client
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 csv_path = os.path.join(current_dir, '..', 'csv')
@@ -46,15 +51,9 @@ class Standings:
         else:
             league_id = 104
 
-        max_retries = 10
-        for i in range(max_retries):
-            try:
-                return statsapi.get('standings', {'leagueId': league_id,
-                    'standingsType': 'regularSeason'}, request_kwargs={'timeout': 10})
-            except requests.exceptions.RequestException:
-                print(f'RequestException ({i+1}/{max_retries})')
-                # print(f'Error: {e}')
-                time.sleep(min(2**i, 30))  # Exponential backoff
+        # retries and backoff are handled by the client
+        return get_client().get('standings', {'leagueId': league_id,
+            'standingsType': 'regularSeason'})
 
     @classmethod
     def get_standings(cls, league: str) -> 'Standings':
@@ -302,3 +301,104 @@ class ExpectedRecordsDetailed:
         self.type = erd['type']
         self.pct = float(erd['pct'])
 
+
+
+class StandingsCache:
+    """
+    Snapshot of the AL and NL standings indexed by team abbreviation.
+    The snapshot is refreshed when it is older than ttl_seconds and
+    callers that ask for a refresh at the same time wait on and share
+    a single fetch.
+
+    Attributes:
+        ttl_seconds (float): How long a snapshot is used before it is
+            fetched again. Standings only change when games go final
+            so this can be a few minutes
+    """
+    def __init__(self, ttl_seconds: float = 300,
+        get_standings: Callable[[str], Standings] = None):
+        self.ttl_seconds = ttl_seconds
+        self._get_standings = get_standings
+        self._lock = threading.Lock()
+        self._teams: Dict[str, TeamRecords] = {}
+        self._fetched_at: float = None
+
+    def _is_fresh(self) -> bool:
+        if self._fetched_at is None:
+            return False
+        return (time.monotonic() - self._fetched_at) < self.ttl_seconds
+
+    def _fetch(self) -> Dict[str, TeamRecords]:
+        get_standings = self._get_standings or Standings.get_standings
+
+        teams = {}
+        for league in ('AL', 'NL'):
+            standings = get_standings(league)
+            for division in (standings.east, standings.central, standings.west):
+                for team in division.team_records:
+                    teams[team.team.abv] = team
+        return teams
+
+    def snapshot(self) -> Dict[str, TeamRecords]:
+        """
+        Returns the current snapshot, fetching a new one if it has
+        expired. If the fetch fails and there is an older snapshot,
+        the older snapshot is returned.
+
+        Returns:
+            Dict[str, TeamRecords]: Team abbreviation to TeamRecords
+        """
+        if self._is_fresh():
+            return self._teams
+
+        with self._lock:
+            # another thread may have refreshed while this one waited
+            if self._is_fresh():
+                return self._teams
+
+            try:
+                self._teams = self._fetch()
+            except Exception: # pylint: disable=W0718
+                if self._fetched_at is None:
+                    raise
+                print('Standings refresh failed, using the last snapshot')
+
+            self._fetched_at = time.monotonic()
+
+        return self._teams
+
+    def get_team(self, abv: str) -> Union[TeamRecords, None]:
+        """
+        Returns the standings for a team
+
+        Args:
+            abv (str): Team abbreviation (ex: 'TEX')
+
+        Returns:
+            Union[TeamRecords, None]: None if the team is not in the
+                standings
+        """
+        return self.snapshot().get(abv, None)
+
+    def invalidate(self):
+        """
+        Forces the next call to fetch new standings
+        """
+        self._fetched_at = None
+
+
+standings_cache = StandingsCache()
+
+
+def get_team_standings(abv: str) -> Union[TeamRecords, None]:
+    """
+    Returns a team's standings from the process-wide StandingsCache
+
+    Args:
+        abv (str): Team abbreviation (ex: 'TEX')
+
+    Returns:
+        Union[TeamRecords, None]: None if the team is not in the
+            standings
+    """
+    return standings_cache.get_team(abv)
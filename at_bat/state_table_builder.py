@@ -0,0 +1,519 @@
+"""
+Builds run expectancy style tables from pitch.csv (every_pitch_csv) with
+NumPy instead of looping over the rows.
+
+Each state column is mapped to an axis index, the indexes of a row are
+combined into a single integer key (row-major, like np.ravel_multi_index)
+and counts, sums and run histograms are aggregated per key with
+np.bincount. Any tuple of axes can be aggregated, so new tables (by
+inning, by base-out state only, ...) are a StateTableSpec instead of a
+new script.
+
+RE288 is declared on top of the engine. RE640 and red288 are derived
+from RE288 with array indexing, the same way
+"4. adjust_re288.py" derives them.
+
+Example:
+    df = pd.read_csv('pitch.csv', usecols=RE288.columns)
+    re288 = RE288.build(df)
+    re288.to_dataframe().to_csv('re288.csv', index=False)
+
+    re24 = StateTableSpec(('outs', 'runners')).build(df)
+"""
+
+from math import prod
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from at_bat.state_tables import HOME_LEAD_OFFSET, RUNS_COLUMNS, runners_bitmask
+
+BASE_COLUMNS = ('is_first_base', 'is_second_base', 'is_third_base')
+
+
+class Axis:
+    """
+    One state column of a table
+
+    Attributes:
+        name (str): Column name in the built table
+        values (list): Every value of the axis, in index order
+        column (Union[str, Callable]): pitch.csv column the value is
+            read from, or a function of the DataFrame for derived axes
+        requires (Tuple[str]): pitch.csv columns needed by the axis
+        clip (bool): Values outside of the axis are moved to the
+            nearest end instead of being dropped (ex: extra innings
+            counted as the 10th)
+    """
+    def __init__(self, name: str, values: Sequence, column: Union[str, Callable] = None,
+        requires: Sequence[str] = None, clip: bool = False):
+        self.name = name
+        self.values = list(values)
+        self.column = name if column is None else column
+        self.clip = clip
+
+        if requires is None:
+            requires = (self.column,) if isinstance(self.column, str) else ()
+        self.requires = tuple(requires)
+
+        # value -> index lookup so any set of integer or bool values
+        # can be encoded with one array index
+        ints = np.asarray(self.values).astype(np.int64)
+        self._low = int(ints.min())
+        self._lut = np.full(int(ints.max()) - self._low + 1, -1, dtype=np.int64)
+        self._lut[ints - self._low] = np.arange(len(ints))
+
+    @property
+    def size(self) -> int:
+        return len(self.values)
+
+    def encode(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Returns the axis index of every row, -1 if the value is not
+        one of the axis values. A column with the axis name (a built
+        table) is used over the source column
+
+        Args:
+            df (pd.DataFrame): pitch.csv rows or a built table
+
+        Returns:
+            np.ndarray: int64 indexes
+        """
+        if self.name in df.columns:
+            raw = df[self.name].to_numpy()
+        elif isinstance(self.column, str):
+            raw = df[self.column].to_numpy()
+        else:
+            raw = self.column(df)
+
+        raw = np.asarray(raw, dtype=np.float64)
+        valid = np.isfinite(raw)
+        offset = np.where(valid, raw, self._low).astype(np.int64) - self._low
+
+        if self.clip:
+            offset = np.clip(offset, 0, len(self._lut) - 1)
+        else:
+            valid &= (offset >= 0) & (offset < len(self._lut))
+            offset = np.where(valid, offset, 0)
+
+        return np.where(valid, self._lut[offset], -1)
+
+    def __repr__(self):
+        return f'Axis({self.name!r}, {self.values[0]}..{self.values[-1]})'
+
+
+def _runners(df: pd.DataFrame) -> np.ndarray:
+    return runners_bitmask(*(df[column].to_numpy() for column in BASE_COLUMNS))
+
+
+def _home_lead(df: pd.DataFrame) -> np.ndarray:
+    return df['home_score'].to_numpy() - df['away_score'].to_numpy()
+
+
+# axes of the tables in every_pitch_csv, by name
+AXES: Dict[str, Axis] = {
+    'balls': Axis('balls', range(4)),
+    'strikes': Axis('strikes', range(3)),
+    'outs': Axis('outs', range(3)),
+    'is_first_base': Axis('is_first_base', (False, True)),
+    'is_second_base': Axis('is_second_base', (False, True)),
+    'is_third_base': Axis('is_third_base', (False, True)),
+    'runners': Axis('runners', range(8), column=_runners, requires=BASE_COLUMNS),
+    'inning': Axis('inning', range(1, 11), clip=True),
+    'is_top_inning': Axis('is_top_inning', (True, False)),
+    'home_lead': Axis('home_lead', range(-HOME_LEAD_OFFSET, HOME_LEAD_OFFSET + 1),
+        column=_home_lead, requires=('away_score', 'home_score'), clip=True),
+}
+
+
+def _get_axis(axis: Union[str, Axis]) -> Axis:
+    if isinstance(axis, Axis):
+        return axis
+    if axis not in AXES:
+        raise ValueError(f'unknown axis {axis!r}, expected an Axis or one of {list(AXES)}')
+    return AXES[axis]
+
+
+def encode_states(df: pd.DataFrame, axes: Sequence[Axis]) -> np.ndarray:
+    """
+    Returns the state key of every row. The key of a state is its
+    row-major position in an array of shape (axis sizes)
+
+    Args:
+        df (pd.DataFrame): pitch.csv rows
+        axes (Sequence[Axis]): State axes
+
+    Returns:
+        np.ndarray: int64 keys, -1 for rows outside of the table
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+
+    for axis in axes:
+        index = axis.encode(df)
+        valid &= index >= 0
+        key = key * axis.size + index
+
+    key[~valid] = -1
+    return key
+
+
+def state_columns(axes: Sequence[Axis]) -> Dict[str, np.ndarray]:
+    """
+    Returns the axis values of every state of a table in
+    itertools.product order (the inverse of encode_states)
+
+    Args:
+        axes (Sequence[Axis]): State axes
+
+    Returns:
+        Dict[str, np.ndarray]: Axis name to the value of each state
+    """
+    index = np.indices(tuple(axis.size for axis in axes)).reshape(len(axes), -1)
+    return {axis.name: np.asarray(axis.values)[index[i]] for i, axis in enumerate(axes)}
+
+
+class StateCounts:
+    """
+    Aggregated table as dense arrays of shape (axis sizes)
+
+    Attributes:
+        axes (Tuple[Axis]): State axes
+        count (np.ndarray): Rows in each state
+        total (np.ndarray): Sum of the value column in each state
+        average (np.ndarray): total / count, NaN for states without
+            any rows
+        histogram (np.ndarray): Shape (axis sizes, bins). Rows in each
+            state by value (0, 1, ... bins - 1). None if not built
+        valid (np.ndarray): False for states that are not possible.
+            They are left empty in to_dataframe()
+    """
+    def __init__(self, axes: Sequence[Axis], count: np.ndarray, total: np.ndarray,
+        average: np.ndarray, histogram: np.ndarray = None, valid: np.ndarray = None):
+        self.axes = tuple(axes)
+        self.count = count
+        self.total = total
+        self.average = average
+        self.histogram = histogram
+        self.valid = np.ones(count.shape, dtype=bool) if valid is None else valid
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(axis.size for axis in self.axes)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, axes: Sequence[Union[str, Axis]],
+        total_column: str = 'total_runs', count_column: str = 'count',
+        average_column: str = 'average_runs',
+        histogram_columns: Sequence[str] = RUNS_COLUMNS) -> 'StateCounts':
+        """
+        Loads a table written by to_dataframe() (ex: re288.csv)
+
+        Args:
+            df (pd.DataFrame): The table
+            axes (Sequence[Union[str, Axis]]): State axes of the table
+
+        Returns:
+            StateCounts: The table
+        """
+        axes = tuple(_get_axis(axis) for axis in axes)
+        shape = tuple(axis.size for axis in axes)
+
+        key = encode_states(df, axes)
+        if np.any(key < 0):
+            raise ValueError('table has states outside of the axes')
+
+        def dense(values: np.ndarray, fill) -> np.ndarray:
+            out = np.full((prod(shape),) + values.shape[1:], fill, dtype=values.dtype)
+            out[key] = values
+            return out.reshape(shape + values.shape[1:])
+
+        valid = dense(df[count_column].notna().to_numpy(), False)
+        histogram = None
+        if histogram_columns:
+            histogram = dense(df[list(histogram_columns)].fillna(0).to_numpy(dtype=np.int64), 0)
+
+        return cls(axes,
+            count=dense(df[count_column].fillna(0).to_numpy(dtype=np.int64), 0),
+            total=dense(df[total_column].fillna(0).to_numpy(dtype=np.float64), 0.0),
+            average=dense(df[average_column].to_numpy(dtype=np.float64), np.nan),
+            histogram=histogram, valid=valid)
+
+    def to_dataframe(self, total_column: str = 'total_runs', count_column: str = 'count',
+        average_column: str = 'average_runs', histogram_format: str = '{} runs') -> pd.DataFrame:
+        """
+        Returns one row per state in itertools.product order of the
+        axis values, the same layout as re288.csv
+
+        Returns:
+            pd.DataFrame: Axis columns, total, count, average and one
+                column per histogram bin
+        """
+        valid = self.valid.reshape(-1)
+        columns = state_columns(self.axes)
+
+        def nullable(values: np.ndarray, dtype: str) -> pd.Series:
+            return pd.Series(values.reshape(-1), dtype=dtype).mask(~valid)
+
+        columns[total_column] = nullable(self.total, 'Float64')
+        columns[count_column] = nullable(self.count, 'Int64')
+        columns[average_column] = np.where(valid, self.average.reshape(-1), np.nan)
+
+        if self.histogram is not None:
+            histogram = self.histogram.reshape(-1, self.histogram.shape[-1])
+            for i in range(histogram.shape[1]):
+                columns[histogram_format.format(i)] = nullable(histogram[:, i], 'Int64')
+
+        return pd.DataFrame(columns)
+
+    def __getitem__(self, index) -> 'StateCounts':
+        """
+        Indexes every array the same way. Only for use by the
+        derivations below, the result keeps the original axes
+        """
+        histogram = None if self.histogram is None else self.histogram[index]
+        return StateCounts(self.axes, self.count[index], self.total[index],
+            self.average[index], histogram, self.valid[index])
+
+    def __add__(self, other: 'StateCounts') -> 'StateCounts':
+        """
+        Adds the counts of two tables with the same axes, the same as
+        aggregating the rows of both at once (ex: new games into RE288)
+        """
+        if [axis.name for axis in self.axes] != [axis.name for axis in other.axes]:
+            raise ValueError('tables have different axes')
+
+        count = self.count + other.count
+        total = self.total + other.total
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(count > 0, total / count, np.nan)
+
+        histogram = None
+        if self.histogram is not None and other.histogram is not None:
+            histogram = self.histogram + other.histogram
+
+        return StateCounts(self.axes, count, total, average, histogram,
+            self.valid & other.valid)
+
+
+class ValueTable:
+    """
+    Table with a value for every state instead of counts (red288, the
+    win probability tables)
+
+    Attributes:
+        axes (Tuple[Axis]): State axes
+        columns (List[str]): Value columns
+        data (np.ndarray): Shape (axis sizes, len(columns)). NaN for
+            states that are not possible
+    """
+    def __init__(self, axes: Sequence[Axis], columns: Sequence[str], data: np.ndarray):
+        self.axes = tuple(axes)
+        self.columns = list(columns)
+        self.data = data
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, axes: Sequence[Union[str, Axis]],
+        columns: Sequence[str]) -> 'ValueTable':
+        """
+        Loads a table written by to_dataframe() (ex: red288.csv)
+
+        Args:
+            df (pd.DataFrame): The table
+            axes (Sequence[Union[str, Axis]]): State axes of the table
+            columns (Sequence[str]): Value columns to load
+
+        Returns:
+            ValueTable: The table
+        """
+        axes = tuple(_get_axis(axis) for axis in axes)
+        shape = tuple(axis.size for axis in axes)
+
+        key = encode_states(df, axes)
+        if np.any(key < 0):
+            raise ValueError('table has states outside of the axes')
+
+        data = np.full((prod(shape), len(columns)), np.nan)
+        data[key] = df[list(columns)].to_numpy(dtype=np.float64)
+        return cls(axes, columns, data.reshape(shape + (len(columns),)))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: One row per state in itertools.product order
+        """
+        columns = state_columns(self.axes)
+        data = self.data.reshape(-1, len(self.columns))
+        for i, column in enumerate(self.columns):
+            columns[column] = data[:, i]
+        return pd.DataFrame(columns)
+
+
+def aggregate(df: pd.DataFrame, axes: Sequence[Union[str, Axis]], value: str = None,
+    bins: int = None) -> StateCounts:
+    """
+    Aggregates rows by state
+
+    Args:
+        df (pd.DataFrame): pitch.csv rows
+        axes (Sequence[Union[str, Axis]]): Axis objects or keys of
+            AXES. Rows outside of any axis are dropped
+        value (str, optional): Column to sum and average. Rows where it
+            is missing are dropped. Defaults to None (counts only).
+        bins (int, optional): Histogram of the integer value with this
+            many bins, needs value. Values past the last bin are left
+            out of the histogram but still count towards total and
+            count. Defaults to None (no histogram).
+
+    Returns:
+        StateCounts: The table
+    """
+    axes = tuple(_get_axis(axis) for axis in axes)
+    shape = tuple(axis.size for axis in axes)
+    size = prod(shape)
+
+    key = encode_states(df, axes)
+    keep = key >= 0
+
+    values = None
+    if value is not None:
+        values = df[value].to_numpy(dtype=np.float64)
+        keep &= np.isfinite(values)
+        values = values[keep]
+    key = key[keep]
+
+    count = np.bincount(key, minlength=size)
+    if values is None:
+        total = count.astype(np.float64)
+    else:
+        total = np.bincount(key, weights=values, minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.where(count > 0, total / count, np.nan)
+
+    histogram = None
+    if bins is not None and values is not None:
+        values = values.astype(np.int64)
+        in_range = (values >= 0) & (values < bins)
+        histogram = np.bincount(key[in_range] * bins + values[in_range],
+            minlength=size * bins).reshape(shape + (bins,))
+
+    return StateCounts(axes, count.reshape(shape), total.reshape(shape),
+        average.reshape(shape), histogram)
+
+
+class StateTableSpec:
+    """
+    Declaration of a table built from pitch.csv
+
+    Attributes:
+        axes (Tuple[Axis]): State axes
+        value (str): Column that is summed, averaged and histogrammed
+        bins (int): Histogram bins, None for no histogram
+    """
+    def __init__(self, axes: Sequence[Union[str, Axis]], value: str = 'runs_to_end',
+        bins: int = len(RUNS_COLUMNS)):
+        self.axes = tuple(_get_axis(axis) for axis in axes)
+        self.value = value
+        self.bins = bins
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        pitch.csv columns needed to build the table. Passing them as
+        usecols to pd.read_csv skips parsing every other column
+        """
+        columns = [column for axis in self.axes for column in axis.requires]
+        if self.value is not None:
+            columns.append(self.value)
+        return list(dict.fromkeys(columns))
+
+    def build(self, df: pd.DataFrame) -> StateCounts:
+        return aggregate(df, self.axes, value=self.value, bins=self.bins)
+
+
+RE288 = StateTableSpec(('balls', 'strikes', 'outs') + BASE_COLUMNS)
+
+RE640_AXES = (
+    Axis('balls', range(5)),
+    Axis('strikes', range(4)),
+    Axis('outs', range(4)),
+) + tuple(AXES[column] for column in BASE_COLUMNS)
+
+
+def build_re640(re288: StateCounts) -> StateCounts:
+    """
+    Adds the states for ball 4, strike 3 and out 3 to RE288. The MLB
+    api can be in these states while waiting for the next batter:
+
+        ball 4 and strike 3: not possible (left empty)
+        out 3 or strike 3 with 2 outs: end of inning (all zeros)
+        strike 3: the state with one more out and a new count
+        ball 4: the state after the walk with a new count
+
+    Args:
+        re288 (StateCounts): RE288 table
+
+    Returns:
+        StateCounts: RE640 table
+    """
+    balls, strikes, outs, first, second, third = np.indices(
+        tuple(axis.size for axis in RE640_AXES))
+
+    impossible = (balls == 4) & (strikes == 3)
+    end_of_inning = ~impossible & ((outs == 3) | ((strikes == 3) & (outs == 2)))
+    strikeout = ~impossible & ~end_of_inning & (strikes == 3)
+    walk = ~impossible & (balls == 4) & (outs < 3)
+
+    # walks force runners up a base
+    walk_second = second | first
+    walk_third = third | (first & second)
+
+    zero = np.zeros_like(balls)
+    safe_outs = np.minimum(outs, 2)
+    source = (
+        np.where(strikeout | walk, zero, np.minimum(balls, 3)),
+        np.where(strikeout | walk, zero, np.minimum(strikes, 2)),
+        np.where(strikeout, np.minimum(outs + 1, 2), safe_outs),
+        np.where(walk, 1, first),
+        np.where(walk, walk_second, second),
+        np.where(walk, walk_third, third),
+    )
+
+    re640 = re288[source]
+    histogram = re640.histogram
+
+    re640.count[end_of_inning] = 0
+    re640.total[end_of_inning] = 0
+    re640.average[end_of_inning] = 0
+    if histogram is not None:
+        histogram[end_of_inning] = 0
+
+    re640.valid = re640.valid & ~impossible
+    re640.axes = RE640_AXES
+    return re640
+
+
+def build_red288(re640: StateCounts) -> ValueTable:
+    """
+    Run value of a ball minus the run value of a strike for every
+    RE288 state, from the RE640 averages
+
+    Args:
+        re640 (StateCounts): RE640 table
+
+    Returns:
+        ValueTable: run_value for the RE288 axes
+    """
+    average = re640.average
+    ball_runs = average[1:5, 0:3, 0:3]
+    strike_runs = average[0:4, 1:4, 0:3]
+
+    # a walk with the bases loaded scores a run, which is not in
+    # re640 since it only counts runs from that state onward
+    walk_in_run = np.zeros(ball_runs.shape)
+    walk_in_run[3, :, :, 1, 1, 1] = 1
+
+    run_value = ball_runs + walk_in_run - strike_runs
+    return ValueTable(RE288.axes, ['run_value'], run_value[..., np.newaxis])
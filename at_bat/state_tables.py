@@ -0,0 +1,236 @@
+"""
+Dense, array-backed versions of the run expectancy and win probability
+tables in every_pitch_csv.
+
+Each table is loaded once into an N-dimensional NumPy array indexed
+directly by the game state so that a lookup is a single array index
+instead of a boolean mask over the whole DataFrame.
+
+Axes (in order, only the ones the table has are used):
+    balls, strikes, outs, runners (bitmask: 1 = first, 2 = second,
+    4 = third), inning (1-10), is_top_inning, home_lead (-30 to 30)
+
+Example:
+    wp780800 = get_wp780800_table()
+    home_win = wp780800.lookup('home_win', balls=1, strikes=2, outs=0,
+        runners=5, inning=7, is_top_inning=False, home_lead=-1)
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from at_bat.statsapi_plus import (get_re640_dataframe, get_red288_dataframe,
+    get_wp780800_dataframe, get_wpd351360_dataframe)
+
+HOME_LEAD_OFFSET = 30
+RUNS_COLUMNS = [f'{i} runs' for i in range(14)]
+
+# state axes in index order. inning is stored 1-based in the csv files
+# so it is shifted by one to start the axis at 0
+STATE_AXES = ('balls', 'strikes', 'outs', 'runners', 'inning',
+    'is_top_inning', 'home_lead')
+_AXIS_OFFSETS = {
+    'balls': 0,
+    'strikes': 0,
+    'outs': 0,
+    'runners': 0,
+    'inning': -1,
+    'is_top_inning': 0,
+    'home_lead': HOME_LEAD_OFFSET,
+}
+
+
+def runners_bitmask(is_first_base, is_second_base, is_third_base):
+    """
+    Converts the three is_*_base flags into the same integer that
+    int(Runners()) returns. Works on scalars and NumPy/pandas arrays.
+
+    Args:
+        is_first_base (bool): Runner on first
+        is_second_base (bool): Runner on second
+        is_third_base (bool): Runner on third
+
+    Returns:
+        int: 0 (bases empty) to 7 (bases loaded)
+    """
+    first = np.asarray(is_first_base, dtype=np.int64)
+    second = np.asarray(is_second_base, dtype=np.int64)
+    third = np.asarray(is_third_base, dtype=np.int64)
+    return first + (2 * second) + (4 * third)
+
+
+class StateTable:
+    """
+    A run expectancy/win probability table stored as a dense array.
+
+    Attributes:
+        axes (Tuple[str]): The state axes the table is indexed by
+        columns (List[str]): The value columns stored for each state
+        data (np.ndarray): Array of shape (*axis sizes, len(columns)).
+            States missing from the csv are NaN
+    """
+    def __init__(self, axes: Tuple[str, ...], columns: List[str], data: np.ndarray):
+        self.axes = axes
+        self.columns = columns
+        self.data = data
+        self._column_index: Dict[str, int] = {c: i for i, c in enumerate(columns)}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, columns: List[str]) -> 'StateTable':
+        """
+        Builds a StateTable from one of the every_pitch_csv DataFrames.
+        The axes are picked from the columns present in the DataFrame.
+
+        Args:
+            df (pd.DataFrame): re640/red288/wp780800/wpd351360 DataFrame
+            columns (List[str]): Value columns to store
+
+        Returns:
+            StateTable: The dense table
+        """
+        state = {
+            'balls': df['balls'].to_numpy(dtype=np.int64),
+            'strikes': df['strikes'].to_numpy(dtype=np.int64),
+            'outs': df['outs'].to_numpy(dtype=np.int64),
+            'runners': runners_bitmask(df['is_first_base'].to_numpy(),
+                df['is_second_base'].to_numpy(), df['is_third_base'].to_numpy()),
+        }
+
+        if 'inning' in df.columns:
+            state['inning'] = df['inning'].to_numpy(dtype=np.int64)
+            state['is_top_inning'] = df['is_top_inning'].to_numpy(dtype=np.int64)
+            state['home_lead'] = df['home_lead'].to_numpy(dtype=np.int64)
+
+        axes = tuple(axis for axis in STATE_AXES if axis in state)
+        index = tuple(state[axis] + _AXIS_OFFSETS[axis] for axis in axes)
+        shape = tuple(int(i.max()) + 1 for i in index)
+
+        data = np.full(shape + (len(columns),), np.nan, dtype=np.float64)
+        data[index] = df[columns].to_numpy(dtype=np.float64)
+
+        return cls(axes, list(columns), data)
+
+    def _index(self, state: dict) -> tuple:
+        index = []
+        for i, axis in enumerate(self.axes):
+            value = state.get(axis, None)
+            if value is None:
+                raise ValueError(f'{axis} is required for this table')
+
+            value = np.asarray(value, dtype=np.int64) + _AXIS_OFFSETS[axis]
+            if np.any(value < 0) or np.any(value >= self.data.shape[i]):
+                raise IndexError(f'{axis} out of range for this table')
+            index.append(value)
+
+        return tuple(index)
+
+    def lookup(self, column: str, balls, strikes, outs, runners, inning=None,
+        is_top_inning=None, home_lead=None) -> Union[float, np.ndarray]:
+        """
+        Returns the value of a column for a state. Every argument can
+        also be a NumPy array to look up many states at once.
+
+        Args:
+            column (str): Value column (ex: 'home_win', 'run_value')
+            balls (int): Balls in the count
+            strikes (int): Strikes in the count
+            outs (int): Outs in the inning
+            runners (int): Runners bitmask, same as int(Runners())
+            inning (int, optional): Inning (1-10). Required for the
+                win probability tables
+            is_top_inning (bool, optional): Required for the win
+                probability tables
+            home_lead (int, optional): Home score - away score (-30 to
+                30). Required for the win probability tables
+
+        Raises:
+            ValueError: If a state axis needed by the table is missing
+            IndexError: If the state is outside of the table
+
+        Returns:
+            Union[float, np.ndarray]: The value(s) for the state(s)
+        """
+        index = self._index({
+            'balls': balls,
+            'strikes': strikes,
+            'outs': outs,
+            'runners': runners,
+            'inning': inning,
+            'is_top_inning': is_top_inning,
+            'home_lead': home_lead,
+        })
+        value = self.data[index + (self._column_index[column],)]
+
+        if np.ndim(value) == 0:
+            return float(value)
+        return value
+
+    def lookup_row(self, balls: int, strikes: int, outs: int, runners: int,
+        inning: int = None, is_top_inning: bool = None, home_lead: int = None) -> Dict[str, float]:
+        """
+        Returns every column for a single state as a dictionary
+
+        Returns:
+            Dict[str, float]: column name to value
+        """
+        index = self._index({
+            'balls': balls,
+            'strikes': strikes,
+            'outs': outs,
+            'runners': runners,
+            'inning': inning,
+            'is_top_inning': is_top_inning,
+            'home_lead': home_lead,
+        })
+        row = self.data[index]
+        return {column: float(row[i]) for i, column in enumerate(self.columns)}
+
+
+@lru_cache(maxsize=None)
+def get_re640_table() -> StateTable:
+    """
+    Returns re640.csv as a StateTable. Only loaded once per process.
+
+    Returns:
+        StateTable: axes (balls, strikes, outs, runners)
+    """
+    columns = ['total_runs', 'count', 'average_runs'] + RUNS_COLUMNS
+    return StateTable.from_dataframe(get_re640_dataframe(), columns)
+
+
+@lru_cache(maxsize=None)
+def get_red288_table() -> StateTable:
+    """
+    Returns red288.csv as a StateTable. Only loaded once per process.
+
+    Returns:
+        StateTable: axes (balls, strikes, outs, runners)
+    """
+    return StateTable.from_dataframe(get_red288_dataframe(), ['run_value'])
+
+
+@lru_cache(maxsize=None)
+def get_wp780800_table() -> StateTable:
+    """
+    Returns wp780800.csv as a StateTable. Only loaded once per process.
+
+    Returns:
+        StateTable: axes (balls, strikes, outs, runners, inning,
+            is_top_inning, home_lead)
+    """
+    columns = ['away_win', 'home_win', 'tie']
+    return StateTable.from_dataframe(get_wp780800_dataframe(), columns)
+
+
+@lru_cache(maxsize=None)
+def get_wpd351360_table() -> StateTable:
+    """
+    Returns wpd351360.csv as a StateTable. Only loaded once per process.
+
+    Returns:
+        StateTable: axes (balls, strikes, outs, runners, inning,
+            is_top_inning, home_lead)
+    """
+    return StateTable.from_dataframe(get_wpd351360_dataframe(), ['wpa'])
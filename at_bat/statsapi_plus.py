@@ -7,8 +7,8 @@ more appropriate modules
 import csv
 from typing import List
 import os
-import statsapi
 import pandas as pd
+from at_bat.http_client import get_client
 
 def test():
     """
@@ -37,13 +37,15 @@ def get_daily_gamepks(date: str = None) -> List[int]:
     """
     gamePks = []
 
+    params = {'sportId': 1}
     if date is not None:
-        data = statsapi.schedule(date=date)
-    elif date is None:
-        data = statsapi.schedule()
+        params['date'] = date
 
-    for game in data:
-        gamePks.append(game['game_id'])
+    data = get_client().get('schedule', params)
+
+    for day in data.get('dates', []):
+        for game in day['games']:
+            gamePks.append(game['gamePk'])
 
     return gamePks
 
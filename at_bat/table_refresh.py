@@ -0,0 +1,267 @@
+"""
+Incremental refresh of the every_pitch_csv tables.
+
+Every table made by scripts 3-7 can be rebuilt from a few sums over
+pitch.csv (sufficient statistics):
+
+    - RE288: pitches, run totals and run histograms per state. re640,
+      red288 and the win probability tables are derived from it
+    - expected_values: hits, total bases and at bats per 0.1 mph x 1
+      degree batted ball cell
+
+TableStats keeps those sums in table_stats.npz along with the gamepks
+already counted. refresh() downloads and parses only the new final
+games, adds their sums and writes every table again, so a nightly
+update takes seconds instead of rerunning scripts 1-7.
+
+Example:
+    TableStats.from_pitch_csv('pitch.csv').save('table_stats.npz') # once
+    refresh([776123, 776124], 'every_pitch_csv')
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Set
+
+import numpy as np
+import pandas as pd
+
+from at_bat.expected_values_builder import (BATTED_BALL_COLUMNS, batted_ball_counts,
+    expected_values_from_counts)
+from at_bat.feed_cache import is_cacheable
+from at_bat.game import Game
+from at_bat.game_parser import GameParser, csv_append_columns
+from at_bat.state_table_builder import RE288, StateCounts, build_re640, build_red288
+from at_bat.wp_table_builder import build_wp351360, build_wp780800, build_wpd351360
+
+STATS_FILE = 'table_stats.npz'
+
+# batted ball cells kept in the stats: 0 to 159.9 mph and -180 to 179
+# degrees, so any bin width can be used when the table is written
+STATS_EV_CELLS = (0, 1600)
+STATS_LA_CELLS = (-80, 280)
+
+STATS_COLUMNS = ['gamepk'] + RE288.columns + BATTED_BALL_COLUMNS
+
+
+class TableStats:
+    """
+    Sufficient statistics of the every_pitch_csv tables
+
+    Attributes:
+        re288 (StateCounts): RE288 counts, totals and histograms
+        batted_balls (np.ndarray): batted_ball_counts() over
+            STATS_EV_CELLS x STATS_LA_CELLS
+        gamepks (Set[int]): Games that have been counted
+    """
+    def __init__(self, re288: StateCounts, batted_balls: np.ndarray, gamepks: Set[int]):
+        self.re288 = re288
+        self.batted_balls = batted_balls
+        self.gamepks = set(gamepks)
+
+    @classmethod
+    def from_pitches(cls, df: pd.DataFrame) -> 'TableStats':
+        """
+        Counts pitch.csv rows
+
+        Args:
+            df (pd.DataFrame): pitch.csv rows with STATS_COLUMNS
+
+        Returns:
+            TableStats: Stats of the rows
+        """
+        return cls(RE288.build(df),
+            batted_ball_counts(df, STATS_EV_CELLS, STATS_LA_CELLS),
+            set(df['gamepk'].astype(int)))
+
+    @classmethod
+    def from_pitch_csv(cls, path: str) -> 'TableStats':
+        """
+        Counts every row of pitch.csv. Only needed once, after that use
+        refresh()
+
+        Args:
+            path (str): pitch.csv
+
+        Returns:
+            TableStats: Stats of every game in pitch.csv
+        """
+        return cls.from_pitches(pd.read_csv(path, usecols=STATS_COLUMNS))
+
+    def fold(self, df: pd.DataFrame) -> List[int]:
+        """
+        Adds the rows of games that have not been counted yet. Rows of
+        games already in the stats are skipped.
+
+        Args:
+            df (pd.DataFrame): pitch.csv rows with STATS_COLUMNS
+
+        Returns:
+            List[int]: gamepks that were added
+        """
+        df = df[~df['gamepk'].isin(self.gamepks)]
+        if df.empty:
+            return []
+
+        new = TableStats.from_pitches(df)
+        self.re288 = self.re288 + new.re288
+        self.batted_balls = self.batted_balls + new.batted_balls
+        self.gamepks |= new.gamepks
+
+        return sorted(new.gamepks)
+
+    @classmethod
+    def load(cls, path: str) -> 'TableStats':
+        """
+        Loads stats written by save()
+
+        Args:
+            path (str): table_stats.npz
+
+        Returns:
+            TableStats: The stats
+        """
+        with np.load(path) as data:
+            count = data['count']
+            total = data['total']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                average = np.where(count > 0, total / count, np.nan)
+
+            re288 = StateCounts(RE288.axes, count, total, average, data['histogram'])
+            return cls(re288, data['batted_balls'], set(data['gamepks'].tolist()))
+
+    def save(self, path: str):
+        """
+        Writes the stats. The file is replaced at once so a stopped
+        refresh never leaves half written stats.
+
+        Args:
+            path (str): table_stats.npz
+        """
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as file:
+            np.savez_compressed(file, count=self.re288.count, total=self.re288.total,
+                histogram=self.re288.histogram, batted_balls=self.batted_balls,
+                gamepks=np.array(sorted(self.gamepks), dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    def write_tables(self, directory: str) -> List[str]:
+        """
+        Writes every table made by scripts 3-7 from the stats
+
+        Args:
+            directory (str): Output directory (every_pitch_csv)
+
+        Returns:
+            List[str]: Paths written
+        """
+        re640 = build_re640(self.re288)
+        wp351360 = build_wp351360(self.re288)
+        wp780800 = build_wp780800(wp351360)
+
+        tables = {
+            're288.csv': self.re288.to_dataframe(),
+            're640.csv': re640.to_dataframe(),
+            'red288.csv': build_red288(re640).to_dataframe(),
+            'wp351360.csv': wp351360.to_dataframe(),
+            'wp780800.csv': wp780800.to_dataframe(),
+            'wpd351360.csv': build_wpd351360(wp780800).to_dataframe(),
+            'expected_values.csv': expected_values_from_counts(self.batted_balls,
+                STATS_EV_CELLS, STATS_LA_CELLS),
+        }
+
+        paths = []
+        for name, table in tables.items():
+            path = os.path.join(directory, name)
+            table.to_csv(path, index=False)
+            paths.append(path)
+        return paths
+
+
+def _fetch_game(gamepk: int) -> dict:
+    return Game.get_dict(gamepk=gamepk)
+
+
+def parse_games(gamepks: Iterable[int], fetch: Callable[[int], dict] = None,
+    fetch_workers: int = 8) -> pd.DataFrame:
+    """
+    Downloads and parses games into pitch.csv rows. Games that are not
+    final or fail to download are left out.
+
+    Args:
+        gamepks (Iterable[int]): Games to parse
+        fetch (Callable[[int], dict], optional): Returns the game
+            dictionary for a gamepk. Defaults to Game.get_dict
+        fetch_workers (int, optional): Download threads. Defaults to 8.
+
+    Returns:
+        pd.DataFrame: Rows with GameParser.field_names columns
+    """
+    if fetch is None:
+        fetch = _fetch_game
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as pool:
+        games = list(pool.map(fetch, gamepks))
+
+    rows = []
+    for data in games:
+        if data is not None and is_cacheable(data):
+            rows += GameParser(game=Game(data)).game_data
+
+    return pd.DataFrame(rows, columns=GameParser.field_names)
+
+
+def refresh(new_gamepks: Iterable[int], directory: str, pitch_csv_path: str = None,
+    fetch: Callable[[int], dict] = None, fetch_workers: int = 8,
+    pitch_store_path: str = None) -> List[int]:
+    """
+    Adds newly completed games to table_stats.npz in directory and
+    writes every table again. Games already counted are not downloaded.
+
+    Args:
+        new_gamepks (Iterable[int]): Games to add
+        directory (str): Directory with table_stats.npz and the tables
+        pitch_csv_path (str, optional): If given, the new rows are also
+            appended to this pitch.csv so a full rebuild gives the same
+            tables. Defaults to None.
+        fetch (Callable[[int], dict], optional): See parse_games()
+        fetch_workers (int, optional): Download threads. Defaults to 8.
+        pitch_store_path (str, optional): If given, the new games are
+            also written to this Parquet pitch store. Defaults to None.
+
+    Raises:
+        FileNotFoundError: If table_stats.npz has not been made with
+            TableStats.from_pitch_csv()
+        ValueError: If pitch_csv_path has columns GameParser does not
+            write
+
+    Returns:
+        List[int]: gamepks that were added
+    """
+    stats_path = os.path.join(directory, STATS_FILE)
+    stats = TableStats.load(stats_path)
+
+    # checked before anything is written. An older pitch.csv keeps its
+    # own columns
+    if pitch_csv_path is not None:
+        csv_columns = csv_append_columns(pitch_csv_path)
+
+    gamepks = [gamepk for gamepk in dict.fromkeys(new_gamepks) if gamepk not in stats.gamepks]
+    if not gamepks:
+        return []
+
+    df = parse_games(gamepks, fetch=fetch, fetch_workers=fetch_workers)
+    added = stats.fold(df)
+    if not added:
+        return []
+
+    if pitch_csv_path is not None:
+        df[csv_columns].to_csv(pitch_csv_path, mode='a', index=False,
+            header=not os.path.exists(pitch_csv_path) or os.path.getsize(pitch_csv_path) == 0)
+    if pitch_store_path is not None:
+        from at_bat.pitch_store import write_pitches # pylint: disable=C0415
+        write_pitches(df[df['gamepk'].isin(added)], pitch_store_path)
+
+    stats.write_tables(directory)
+    stats.save(stats_path)
+    return added
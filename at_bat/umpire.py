@@ -1,12 +1,19 @@
 from typing import List, Tuple
 import math
 import random
+import numpy as np
+import pandas as pd
 
-from at_bat.statsapi_plus import get_red288_dataframe, get_wpd351360_dataframe
+from at_bat.state_tables import get_red288_table, runners_bitmask
 from at_bat.runners import Runners
+from at_bat.win_probability import get_win_probability
+
+MISS_RADIUS = .5/12 # unit: feet
+ZONE_HALF_WIDTH = .83 # unit: feet
+MISS_THRESHOLD = .1 # call is missed if less than 10% of the radius agrees with it
 
 def _generate_monte_carlo_pitch_locations(num_pitches: int) -> List[Tuple[float, float]]:
-    buffer = .5/12 # unit: inch
+    buffer = MISS_RADIUS
     random.seed(0)
     pitches: List[Tuple[float, float]] = []
 
@@ -20,8 +27,159 @@ def _generate_monte_carlo_pitch_locations(num_pitches: int) -> List[Tuple[float,
         if len(pitches) >= num_pitches:
             return pitches
 _monte_carlo_pitch_locations = _generate_monte_carlo_pitch_locations(500)
-_red288 = get_red288_dataframe()
-_wpd351360 = get_wpd351360_dataframe()
+
+def _circle_integral(x: np.ndarray, radius: float) -> np.ndarray:
+    # antiderivative of sqrt(r^2 - x^2)
+    s = np.sqrt(np.maximum(radius**2 - x**2, 0))
+    return .5 * ((x * s) + (radius**2 * np.arcsin(np.clip(x / radius, -1, 1))))
+
+def _quadrant_area(x: np.ndarray, y: np.ndarray, radius: float) -> np.ndarray:
+    """
+    Area of a circle centered at the origin that is in the quadrant
+    X <= x and Y <= y
+    """
+    x = np.clip(x, -radius, radius)
+    y = np.clip(y, -radius, radius)
+    c = np.sqrt(radius**2 - y**2) # where the line Y = y crosses the circle
+
+    left = np.clip(x, -radius, -c)
+    middle = np.clip(x, -c, c)
+    right = np.clip(x, c, radius)
+
+    # |X| <= c: chord from -s(X) up to y
+    area = _circle_integral(middle, radius) - _circle_integral(-c, radius) + y * (middle + c)
+
+    # |X| > c: entire chord is under y, only possible if y >= 0
+    outer = ((_circle_integral(left, radius) - _circle_integral(-radius, radius)) +
+             (_circle_integral(right, radius) - _circle_integral(c, radius)))
+    area += np.where(y >= 0, 2 * outer, 0)
+
+    return area
+
+def in_zone_fraction(px, pz, pz_min, pz_max, px_min: float = -ZONE_HALF_WIDTH,
+    px_max: float = ZONE_HALF_WIDTH, radius: float = MISS_RADIUS) -> np.ndarray:
+    """
+    Returns the fraction of a circle around each pitch that is inside
+    the strike zone. This is the exact version of checking the 500
+    monte carlo pitch locations.
+
+    Args:
+        px (np.ndarray): Horizontal location of the pitches
+        pz (np.ndarray): Vertical location of the pitches
+        pz_min (np.ndarray): Lowest pz that is a strike for each pitch
+        pz_max (np.ndarray): Highest pz that is a strike for each pitch
+        px_min (float, optional): Lowest px that is a strike.
+            Defaults to -ZONE_HALF_WIDTH.
+        px_max (float, optional): Highest px that is a strike.
+            Defaults to ZONE_HALF_WIDTH.
+        radius (float, optional): Radius of the circle in feet.
+            Defaults to MISS_RADIUS.
+
+    Returns:
+        np.ndarray: Fraction (0 to 1) of each circle inside the zone
+    """
+    px = np.asarray(px, dtype=np.float64)
+    pz = np.asarray(pz, dtype=np.float64)
+    pz_min = np.asarray(pz_min, dtype=np.float64)
+    pz_max = np.asarray(pz_max, dtype=np.float64)
+
+    x0 = px_min - px
+    x1 = px_max - px
+    y0 = pz_min - pz
+    y1 = pz_max - pz
+
+    area = (_quadrant_area(x1, y1, radius) - _quadrant_area(x0, y1, radius) -
+            _quadrant_area(x1, y0, radius) + _quadrant_area(x0, y0, radius))
+
+    return np.clip(area / (math.pi * radius**2), 0, 1)
+
+def calculate_favors_batch(pitch_result_code, px, pz, pz_min, pz_max, balls,
+    strikes, outs, runners, inning, is_top_inning, home_lead
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the run and win probability favor for every pitch at
+    once. Same results as Umpire.calculate_favors but each argument is
+    an array with one element per pitch. Pitches that are not called
+    balls/strikes or that are missing a location get 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: run_favor, wp_favor. Positive
+            values favor the home team
+    """
+    code = np.asarray(pitch_result_code, dtype=object)
+    px = np.asarray(px, dtype=np.float64)
+    pz = np.asarray(pz, dtype=np.float64)
+    pz_min = np.asarray(pz_min, dtype=np.float64)
+    pz_max = np.asarray(pz_max, dtype=np.float64)
+
+    is_ball = code == 'B'
+    is_strike = code == 'C'
+    valid = (is_ball | is_strike) & ~np.isnan(px) & ~np.isnan(pz)
+
+    strike_fraction = np.zeros(len(code))
+    strike_fraction[valid] = in_zone_fraction(px[valid], pz[valid], pz_min[valid], pz_max[valid])
+
+    missed = valid & (
+        (is_ball & ((1 - strike_fraction) < MISS_THRESHOLD)) |
+        (is_strike & (strike_fraction < MISS_THRESHOLD))
+    )
+
+    run_favor = np.zeros(len(code))
+    wp_favor = np.zeros(len(code))
+
+    if not missed.any():
+        return (run_favor, wp_favor)
+
+    balls = np.asarray(balls, dtype=np.int64)[missed]
+    strikes = np.asarray(strikes, dtype=np.int64)[missed]
+    outs = np.asarray(outs, dtype=np.int64)[missed]
+    runners = np.asarray(runners, dtype=np.int64)[missed]
+    inning = np.minimum(np.asarray(inning, dtype=np.int64)[missed], 10)
+    is_top = np.asarray(is_top_inning, dtype=bool)[missed]
+    home_lead = np.asarray(home_lead, dtype=np.int64)[missed]
+
+    run_value = get_red288_table().lookup('run_value', balls, strikes, outs, runners)
+    wpa = get_win_probability().lookup('wpa', balls, strikes, outs, runners,
+        inning=inning, is_top_inning=is_top, home_lead=home_lead)
+
+    sign = np.where(is_ball[missed], -1, 1)
+    run_favor[missed] = run_value * sign * np.where(is_top, 1, -1)
+    wp_favor[missed] = wpa * sign
+
+    return (run_favor, wp_favor)
+
+def calculate_dataframe_favors(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the umpire favors for a DataFrame with the same columns
+    as GameParser.dataframe or pitch.csv. Can be used to re-score a
+    full season at once:
+
+        df = pd.read_csv('every_pitch_csv/pitch.csv')
+        df['umpire_run_favor'], df['umpire_wp_favor'] = calculate_dataframe_favors(df)
+
+    Args:
+        df (pd.DataFrame): GameParser style DataFrame
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: run_favor, wp_favor
+    """
+    runners = runners_bitmask(df['is_first_base'].to_numpy(dtype=bool),
+        df['is_second_base'].to_numpy(dtype=bool), df['is_third_base'].to_numpy(dtype=bool))
+
+    return calculate_favors_batch(
+        pitch_result_code=df['pitch_result_code'].to_numpy(),
+        px=df['px'].to_numpy(dtype=np.float64),
+        pz=df['pz'].to_numpy(dtype=np.float64),
+        pz_min=df['pz_min'].to_numpy(dtype=np.float64),
+        pz_max=df['pz_max'].to_numpy(dtype=np.float64),
+        balls=df['balls'].to_numpy(),
+        strikes=df['strikes'].to_numpy(),
+        outs=df['outs'].to_numpy(),
+        runners=runners,
+        inning=df['inning'].to_numpy(),
+        is_top_inning=df['is_top_inning'].to_numpy(dtype=bool),
+        home_lead=(df['home_score'] - df['away_score']).to_numpy(),
+    )
 
 class Umpire:
     def __init__(self):
@@ -81,7 +239,23 @@ class Umpire:
         if method is not None:
             self.method = method
 
-        return self._calculate_monte_carlo()
+        if self.method == 'monte':
+            return self._calculate_monte_carlo()
+
+        return self._calculate_exact()
+
+    def _calculate_exact(self):
+        if (self.px is None) or (self.pz is None):
+            return (0, 0)
+
+        run_favor, wp_favor = calculate_favors_batch(
+            [self.pitch_result_code], [self.px], [self.pz], [self.pz_bot],
+            [self.pz_top], [self.balls], [self.strikes], [self.outs],
+            [self.runners], [self.inning], [self.is_top_inning], [self.home_lead])
+
+        self.run_favor = float(run_favor[0])
+        self.wp_favor = float(wp_favor[0])
+        return (self.run_favor, self.wp_favor)
 
     def _calculate_monte_carlo(self):
         if (self.px is None) or (self.pz) is None:
@@ -94,17 +268,17 @@ class Umpire:
             px = self.px + dx
             pz = self.pz + dz
 
-            if (-.83 <= px <= .83) and (self.pz_bot <= pz <= self.pz_top):
+            if (-ZONE_HALF_WIDTH <= px <= ZONE_HALF_WIDTH) and (self.pz_bot <= pz <= self.pz_top):
                 strikes += 1
             else:
                 balls += 1
 
         total = balls + strikes
-        if (self.pitch_result_code == 'B') and ((balls/total) >= .1):
+        if (self.pitch_result_code == 'B') and ((balls/total) >= MISS_THRESHOLD):
             self.run_favor = 0
             self.wp_favor = 0
             return (0, 0)
-        if (self.pitch_result_code == 'C') and ((strikes/total) >= .1):
+        if (self.pitch_result_code == 'C') and ((strikes/total) >= MISS_THRESHOLD):
             self.run_favor = 0
             self.wp_favor = 0
             return (0, 0)
@@ -117,26 +291,13 @@ class Umpire:
 
         self.inning = min(self.inning, 10)
 
-        self.run_favor = _red288.loc[
-            (_red288['balls'] == self.balls) &
-            (_red288['strikes'] == self.strikes) &
-            (_red288['outs'] == self.outs) &
-            (_red288['is_first_base'] == bool(self.runners & 1)) &
-            (_red288['is_second_base'] == bool(self.runners & 2)) &
-            (_red288['is_third_base'] == bool(self.runners & 4))
-        ]['run_value'].iloc[0]
-
-        self.wp_favor = _wpd351360.loc[
-            (_wpd351360['balls'] == self.balls) &
-            (_wpd351360['strikes'] == self.strikes) &
-            (_wpd351360['outs'] == self.outs) &
-            (_wpd351360['is_first_base'] == bool(self.runners & 1)) &
-            (_wpd351360['is_second_base'] == bool(self.runners & 2)) &
-            (_wpd351360['is_third_base'] == bool(self.runners & 4)) &
-            (_wpd351360['inning'] == self.inning) &
-            (_wpd351360['is_top_inning'] == self.is_top_inning) &
-            (_wpd351360['home_lead'] == self.home_lead)
-        ]['wpa'].iloc[0]
+        self.run_favor = get_red288_table().lookup('run_value', balls=self.balls,
+            strikes=self.strikes, outs=self.outs, runners=self.runners)
+
+        self.wp_favor = get_win_probability().lookup('wpa', balls=self.balls,
+            strikes=self.strikes, outs=self.outs, runners=self.runners,
+            inning=self.inning, is_top_inning=self.is_top_inning,
+            home_lead=self.home_lead)
 
         if self.pitch_result_code == 'B':
             self.run_favor *= -1
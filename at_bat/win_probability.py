@@ -0,0 +1,184 @@
+"""
+Win probabilities computed on demand from RE288 instead of loading
+wp780800.csv and wpd351360.csv.
+
+The two csv files have over a million rows and take seconds and
+hundreds of MB to load into pandas. WinProbability only reads
+re288.csv (288 rows). The first lookup in a half inning (inning and
+top/bottom) computes that half inning for every RE288 state and home
+lead. That is 20 blocks of (288, 61, 3) floats, at most about 8 MB.
+
+It uses the same code as at_bat.wp_table_builder, so the numbers are
+the same as the csv files built by every_pitch_csv scripts 5 and 6.
+
+Example:
+    wp = get_win_probability()
+    row = wp.lookup_row(balls=1, strikes=2, outs=0, runners=5, inning=7,
+        is_top_inning=False, home_lead=-1)
+    wpa = wp.lookup('wpa', balls=3, strikes=2, outs=1, runners=7,
+        inning=9, is_top_inning=True, home_lead=1)
+"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, Union
+
+import numpy as np
+
+from at_bat.state_table_builder import RE288, StateCounts
+from at_bat.state_tables import HOME_LEAD_OFFSET
+from at_bat.statsapi_plus import get_re288_dataframe
+from at_bat.wp_table_builder import (INNINGS, WP_COLUMNS, RestOfGame, finish_wp780800,
+    wp780800_sources)
+
+# (smallest, largest) value of each argument. balls, strikes and outs
+# can be one past RE288 like in wp780800
+_RANGES = {
+    'balls': (0, 4),
+    'strikes': (0, 3),
+    'outs': (0, 3),
+    'runners': (0, 7),
+    'inning': (1, INNINGS),
+    'home_lead': (-HOME_LEAD_OFFSET, HOME_LEAD_OFFSET),
+}
+
+
+class WinProbability:
+    """
+    Lookups with the same arguments as the wp780800 and wpd351360
+    StateTables ('away_win', 'home_win', 'tie' and 'wpa')
+    """
+    def __init__(self, re288: StateCounts):
+        self._rest = RestOfGame(re288)
+        self._data = np.zeros((self._rest.pmfs.shape[0], INNINGS, 2,
+            2 * HOME_LEAD_OFFSET + 1, len(WP_COLUMNS)))
+        self._filled = np.zeros((INNINGS, 2), dtype=bool)
+        self._lock = threading.Lock()
+
+    def _fill(self, inning_index: np.ndarray, top_index: np.ndarray):
+        needed = ~self._filled[inning_index, top_index]
+        if not needed.any():
+            return
+
+        with self._lock:
+            for i, top in set(zip(inning_index[needed].tolist(), top_index[needed].tolist())):
+                if not self._filled[i, top]:
+                    # WP351360 lists the top half first
+                    self._data[:, i, top] = self._rest.half_inning(i + 1, top == 0)
+                    self._filled[i, top] = True
+
+    def _wp351360(self, source: tuple) -> np.ndarray:
+        balls, strikes, outs, first, second, third, inning_index, top_index, lead_index = source
+        self._fill(np.ravel(inning_index), np.ravel(top_index))
+
+        state = np.ravel_multi_index((balls, strikes, outs, first, second, third),
+            self._rest.shape)
+        return self._data[state, inning_index, top_index, lead_index]
+
+    def _wp780800(self, balls, strikes, outs, runners, inning, is_top_inning,
+        home_lead) -> np.ndarray:
+        first, second, third = runners & 1, (runners >> 1) & 1, (runners >> 2) & 1
+        source, impossible, game_over = wp780800_sources(balls, strikes, outs, first, second,
+            third, inning, is_top_inning, home_lead)
+        return finish_wp780800(self._wp351360(source), home_lead, impossible, game_over)
+
+    def _check(self, column: str, state: Dict[str, np.ndarray]):
+        if column not in WP_COLUMNS and column != 'wpa':
+            raise KeyError(column)
+
+        for name, value in state.items():
+            if name == 'is_top_inning':
+                continue
+            if value is None:
+                raise ValueError(f'{name} is required for this table')
+
+            low, high = _RANGES[name]
+            if column == 'wpa' and name in ('balls', 'strikes', 'outs'):
+                high -= 1 # wpd351360 states
+            if np.any(value < low) or np.any(value > high):
+                raise IndexError(f'{name} out of range for this table')
+
+        if state['is_top_inning'] is None:
+            raise ValueError('is_top_inning is required for this table')
+
+    def lookup(self, column: str, balls, strikes, outs, runners, inning=None,
+        is_top_inning=None, home_lead=None) -> Union[float, np.ndarray]:
+        """
+        Returns the value of a column for a state. Every argument can
+        also be a NumPy array to look up many states at once.
+
+        Args:
+            column (str): 'away_win', 'home_win', 'tie' (wp780800) or
+                'wpa' (wpd351360)
+            balls (int): Balls in the count
+            strikes (int): Strikes in the count
+            outs (int): Outs in the inning
+            runners (int): Runners bitmask, same as int(Runners())
+            inning (int): Inning (1-10)
+            is_top_inning (bool): Top or bottom of the inning
+            home_lead (int): Home score - away score (-30 to 30)
+
+        Raises:
+            ValueError: If a state argument is missing
+            IndexError: If the state is outside of the table
+            KeyError: If the column does not exist
+
+        Returns:
+            Union[float, np.ndarray]: The value(s) for the state(s)
+        """
+        state = {
+            'balls': balls,
+            'strikes': strikes,
+            'outs': outs,
+            'runners': runners,
+            'inning': inning,
+            'home_lead': home_lead,
+        }
+        state = {name: None if value is None else np.asarray(value, dtype=np.int64)
+            for name, value in state.items()}
+        state['is_top_inning'] = (None if is_top_inning is None
+            else np.asarray(is_top_inning, dtype=bool))
+        self._check(column, state)
+
+        if column == 'wpa':
+            value = self._wpd351360(**state)
+        else:
+            value = self._wp780800(**state)[..., WP_COLUMNS.index(column)]
+
+        if np.ndim(value) == 0:
+            return float(value)
+        return value
+
+    def _wpd351360(self, balls, strikes, outs, runners, inning, is_top_inning,
+        home_lead) -> np.ndarray:
+        def home(data: np.ndarray) -> np.ndarray:
+            return data[..., 1] + data[..., 2] / 2
+
+        ball = self._wp780800(balls + 1, strikes, outs, runners, inning, is_top_inning,
+            home_lead)
+        strike = self._wp780800(balls, strikes + 1, outs, runners, inning, is_top_inning,
+            home_lead)
+        return home(strike) - home(ball)
+
+    def lookup_row(self, balls: int, strikes: int, outs: int, runners: int,
+        inning: int = None, is_top_inning: bool = None, home_lead: int = None) -> Dict[str, float]:
+        """
+        Returns away_win, home_win and tie for a single wp780800 state
+
+        Returns:
+            Dict[str, float]: column name to value
+        """
+        return {column: self.lookup(column, balls, strikes, outs, runners, inning,
+            is_top_inning, home_lead) for column in WP_COLUMNS}
+
+
+@lru_cache(maxsize=None)
+def get_win_probability() -> WinProbability:
+    """
+    Returns a WinProbability built from re288.csv. Only loaded once per
+    process.
+
+    Returns:
+        WinProbability: The win probabilities
+    """
+    return WinProbability(StateCounts.from_dataframe(get_re288_dataframe(), RE288.axes))
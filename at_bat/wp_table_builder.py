@@ -0,0 +1,336 @@
+"""
+Builds the win probability tables (wp351360, wp780800 and wpd351360 in
+every_pitch_csv) from RE288 with NumPy.
+
+The runs a team scores in the rest of the game are the runs of the
+current half inning plus the runs of every half inning after it. The
+half inning run distributions (PMFs) come from the RE288 histograms.
+The n-inning PMFs of a fresh inning are built once by convolving the
+(n - 1)-inning PMF with the 1-inning PMF. Nothing is recomputed per
+state.
+
+For an inning and half, the rest of the game is the same for every
+RE288 state. The distribution of (away runs - home runs) is the state's
+PMF convolved with one kernel for that half inning. The away win, tie
+and home win probabilities for every home_lead are read off its
+cumulative sum at once.
+
+Rules (same as "5. compute_wp351360.py"):
+    - innings 1-9 play out to the end of the 9th
+    - the 10th stands for every extra inning: the away team bats one
+      more half inning from the state, the home team one half inning
+      with a runner on second
+    - runs are counted up to 13 per half inning (the RE288 histogram).
+      The rest of the game is not cut off at 13 runs, which the 14x14
+      loop in the old script did
+
+Example:
+    re288 = StateCounts.from_dataframe(pd.read_csv('re288.csv'), RE288.axes)
+    wp351360 = build_wp351360(re288)
+    wp780800 = build_wp780800(wp351360)
+    wpd351360 = build_wpd351360(wp780800)
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from at_bat.state_table_builder import (AXES, RE288, RE640_AXES, Axis, StateCounts,
+    ValueTable)
+from at_bat.state_tables import HOME_LEAD_OFFSET
+
+WP_COLUMNS = ['away_win', 'home_win', 'tie']
+INNINGS = 10
+REGULATION_INNINGS = 9
+
+WP351360_AXES = RE288.axes + (AXES['inning'], AXES['is_top_inning'], AXES['home_lead'])
+WP780800_AXES = RE640_AXES + (AXES['inning'], Axis('is_top_inning', (False, True)),
+    AXES['home_lead'])
+
+_HOME_LEADS = np.arange(-HOME_LEAD_OFFSET, HOME_LEAD_OFFSET + 1)
+
+
+def half_inning_pmfs(re288: StateCounts) -> np.ndarray:
+    """
+    Returns the PMF of the runs scored in the rest of the half inning
+    for every RE288 state
+
+    Args:
+        re288 (StateCounts): RE288 table with histograms
+
+    Returns:
+        np.ndarray: Shape (RE288 shape, bins). NaN for states that were
+            never seen
+    """
+    count = re288.count[..., np.newaxis].astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return re288.histogram / count
+
+
+def inning_pmf_powers(pmf: np.ndarray, innings: int) -> List[np.ndarray]:
+    """
+    Returns the PMF of the runs scored in 0, 1, ... innings full
+    half innings
+
+    Args:
+        pmf (np.ndarray): PMF of one half inning
+        innings (int): Largest number of half innings
+
+    Returns:
+        List[np.ndarray]: Index n is the n half inning PMF
+    """
+    powers = [np.ones(1)]
+    for _ in range(innings):
+        powers.append(np.convolve(powers[-1], pmf))
+    return powers
+
+
+def _outcomes(difference: np.ndarray, offset: int) -> np.ndarray:
+    """
+    Away win, home win and tie probability for every home_lead
+
+    Args:
+        difference (np.ndarray): Shape (states, n). PMF of away runs
+            minus home runs
+        offset (int): Run difference of column 0
+
+    Returns:
+        np.ndarray: Shape (states, home leads, 3)
+    """
+    # cdf[:, i] is P(difference < offset + i)
+    cdf = np.zeros((difference.shape[0], difference.shape[1] + 1))
+    np.cumsum(difference, axis=1, out=cdf[:, 1:])
+
+    # away wins if away runs > home runs + home_lead
+    index = _HOME_LEADS - offset
+    below = cdf[:, np.clip(index, 0, difference.shape[1])]
+    at_or_below = cdf[:, np.clip(index + 1, 0, difference.shape[1])]
+    total = cdf[:, -1:]
+
+    return np.stack([total - at_or_below, below, at_or_below - below], axis=-1)
+
+
+def _convolve_rows(pmfs: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    np.convolve of every row of pmfs with the same kernel, one column
+    of pmfs at a time (sum of the outer product along its diagonals)
+    """
+    out = np.zeros((pmfs.shape[0], pmfs.shape[1] + kernel.size - 1))
+    for i in range(pmfs.shape[1]):
+        out[:, i:i + kernel.size] += pmfs[:, i:i + 1] * kernel
+    return out
+
+
+class RestOfGame:
+    """
+    Run distributions of the rest of the game after the current half
+    inning, built once from RE288
+
+    Attributes:
+        pmfs (np.ndarray): Shape (288, bins). Half inning PMF of every
+            RE288 state in row-major order
+        powers (List[np.ndarray]): n inning PMFs of a fresh inning
+        extra_inning (np.ndarray): Half inning PMF with a runner on
+            second and no outs
+    """
+    def __init__(self, re288: StateCounts):
+        pmfs = half_inning_pmfs(re288)
+        self.shape = pmfs.shape[:-1]
+        self.pmfs = pmfs.reshape(-1, pmfs.shape[-1])
+
+        new_inning = self.pmfs[0] # 0-0 count, 0 outs, bases empty
+        self.extra_inning = self.pmfs[np.ravel_multi_index((0, 0, 0, 0, 1, 0), self.shape)]
+        self.powers = inning_pmf_powers(new_inning, REGULATION_INNINGS)
+
+    def half_inning(self, inning: int, is_top_inning: bool) -> np.ndarray:
+        """
+        Win probabilities of every RE288 state in one half inning
+
+        Args:
+            inning (int): 1-10, the 10th stands for every extra inning
+            is_top_inning (bool): Top or bottom half
+
+        Returns:
+            np.ndarray: Shape (288, home leads, 3). away_win, home_win
+                and tie
+        """
+        bins = self.pmfs.shape[1]
+        nothing = np.ones(1)
+
+        # runs after this half inning, for the team batting and the
+        # other team
+        if inning > REGULATION_INNINGS:
+            batting_rest, other = nothing, self.extra_inning if is_top_inning else nothing
+        else:
+            remaining = REGULATION_INNINGS - inning
+            batting_rest = self.powers[remaining]
+            other = self.powers[remaining + 1] if is_top_inning else self.powers[remaining]
+
+        # away - home is (state + batting_rest) - other when the away
+        # team is batting and other - (state + batting_rest) when the
+        # home team is
+        kernel = np.convolve(batting_rest, other[::-1])
+        if is_top_inning:
+            difference = _convolve_rows(self.pmfs, kernel)
+            offset = -(other.size - 1)
+        else:
+            difference = _convolve_rows(self.pmfs[:, ::-1], kernel[::-1])
+            offset = -(batting_rest.size - 1) - (bins - 1)
+
+        return _outcomes(difference, offset)
+
+
+def build_wp351360(re288: StateCounts) -> ValueTable:
+    """
+    Win probability for every RE288 state, inning, half and home_lead
+
+    Args:
+        re288 (StateCounts): RE288 table with histograms
+
+    Returns:
+        ValueTable: away_win, home_win and tie for WP351360_AXES
+    """
+    rest = RestOfGame(re288)
+    data = np.empty((rest.pmfs.shape[0], INNINGS, 2, _HOME_LEADS.size, len(WP_COLUMNS)))
+
+    for inning in range(1, INNINGS + 1):
+        for top_index, is_top_inning in enumerate(AXES['is_top_inning'].values):
+            data[:, inning - 1, top_index] = rest.half_inning(inning, is_top_inning)
+
+    return ValueTable(WP351360_AXES, WP_COLUMNS, data.reshape(rest.shape + data.shape[1:]))
+
+
+def wp780800_sources(balls, strikes, outs, first, second, third, inning, is_top_inning,
+    home_lead) -> Tuple[tuple, np.ndarray, np.ndarray]:
+    """
+    Maps wp780800 states to the wp351360 state with the same win
+    probability. Every argument is an array of the same shape
+
+    Args:
+        balls, strikes, outs: 0-4, 0-3 and 0-3
+        first, second, third: 0 or 1
+        inning: 1-10
+        is_top_inning: bool
+        home_lead: -30 to 30
+
+    Returns:
+        Tuple[tuple, np.ndarray, np.ndarray]: Index into the
+            wp351360 array, states that are not possible and states
+            where the game is over
+    """
+    is_top = np.asarray(is_top_inning, dtype=bool)
+    balls, strikes, outs, first, second, third, inning, home_lead = (
+        np.asarray(value, dtype=np.int64) for value in
+        (balls, strikes, outs, first, second, third, inning, home_lead))
+
+    impossible = (balls == 4) & (strikes == 3)
+    end_of_half = ~impossible & ((outs == 3) | ((strikes == 3) & (outs == 2)))
+    strikeout = ~impossible & ~end_of_half & (strikes == 3)
+    walk = ~impossible & (balls == 4) & (outs < 3)
+    new_half = end_of_half | strikeout | walk
+
+    # walks force runners up a base
+    loaded = (first == 1) & (second == 1) & (third == 1)
+    walk_second = second | first
+    walk_third = third | (first & second)
+    walk_lead = np.where(loaded & (np.abs(home_lead) < HOME_LEAD_OFFSET),
+        home_lead + np.where(is_top, -1, 1), home_lead)
+
+    # the half inning after the end of this one
+    next_inning = np.where(is_top, inning, np.minimum(inning + 1, INNINGS))
+
+    zero = np.zeros_like(balls)
+    source_top = np.where(end_of_half, ~is_top, is_top)
+    source = (
+        np.where(new_half, zero, np.minimum(balls, 3)),
+        np.where(new_half, zero, np.minimum(strikes, 2)),
+        np.where(end_of_half, zero, np.where(strikeout, outs + 1, np.minimum(outs, 2))),
+        np.where(end_of_half, zero, np.where(walk, 1, first)),
+        np.where(end_of_half, zero, np.where(walk, walk_second, second)),
+        np.where(end_of_half, zero, np.where(walk, walk_third, third)),
+        np.where(end_of_half, next_inning, inning) - 1,
+        np.where(source_top, 0, 1), # WP351360 lists the top half first
+        np.where(walk, walk_lead, home_lead) + HOME_LEAD_OFFSET,
+    )
+
+    game_over = end_of_half & (inning >= REGULATION_INNINGS) & (
+        (is_top & (inning == REGULATION_INNINGS) & (home_lead > 0))
+        | (~is_top & (home_lead != 0)))
+
+    return source, impossible, game_over
+
+
+def finish_wp780800(data: np.ndarray, home_lead, impossible: np.ndarray,
+    game_over: np.ndarray) -> np.ndarray:
+    """
+    Sets the states wp780800_sources() found to be over or not
+    possible. Changes data in place
+
+    Args:
+        data (np.ndarray): Shape (states..., 3), the wp351360 values
+            of the sources
+        home_lead: Home lead of each state
+
+    Returns:
+        np.ndarray: data
+    """
+    home_lead = np.asarray(home_lead)
+    data[game_over] = 0
+    data[game_over & (home_lead < 0), 0] = 1 # away_win
+    data[game_over & (home_lead > 0), 1] = 1 # home_win
+    data[impossible] = np.nan
+    return data
+
+
+def build_wp780800(wp351360: ValueTable) -> ValueTable:
+    """
+    Adds the states for ball 4, strike 3 and out 3 to wp351360, the
+    same way build_re640 does for RE288:
+
+        ball 4 and strike 3: not possible (NaN)
+        end of the top half: the start of the bottom half, or a home
+            win in the 9th if the home team is ahead
+        end of the bottom half: the start of the next inning, or the
+            end of the game from the 9th on if a team is ahead
+        strike 3: the state with one more out and a new count
+        ball 4: the state after the walk with a new count. A walk with
+            the bases loaded scores a run (home_lead stays at +-30)
+
+    Args:
+        wp351360 (ValueTable): Table from build_wp351360
+
+    Returns:
+        ValueTable: away_win, home_win and tie for WP780800_AXES
+    """
+    balls, strikes, outs, first, second, third, inning, top, lead = np.indices(
+        tuple(axis.size for axis in WP780800_AXES))
+    home_lead = lead - HOME_LEAD_OFFSET
+
+    # WP780800 lists the bottom half first
+    source, impossible, game_over = wp780800_sources(balls, strikes, outs, first, second,
+        third, inning + 1, top == 1, home_lead)
+
+    data = finish_wp780800(wp351360.data[source], home_lead, impossible, game_over)
+    return ValueTable(WP780800_AXES, WP_COLUMNS, data)
+
+
+def build_wpd351360(wp780800: ValueTable) -> ValueTable:
+    """
+    Change in the home team's win probability (home_win + tie / 2)
+    from a strike instead of a ball, for every wp351360 state
+
+    Args:
+        wp780800 (ValueTable): Table from build_wp780800
+
+    Returns:
+        ValueTable: wpa for WP351360_AXES
+    """
+    home = wp780800.data[..., 1] + wp780800.data[..., 2] / 2
+
+    # WP780800 lists the bottom half first
+    home = home[..., ::-1, :]
+
+    ball = home[1:5, 0:3, 0:3]
+    strike = home[0:4, 1:4, 0:3]
+
+    return ValueTable(WP351360_AXES, ['wpa'], (strike - ball)[..., np.newaxis])
@@ -1,24 +1,20 @@
 import os
 from typing import List
+import argparse
 import csv
-import tqdm
-from at_bat.game_parser import GameParser
+from at_bat.ingest import clear_work_dir, ingest_games
 import logging
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 gamepk_csv_file_path = os.path.join(current_dir, 'gamepks.csv')
 pitch_csv_file_path = os.path.join(current_dir, 'pitch.csv')
+pitch_store_path = os.path.join(current_dir, 'pitches')
 
 
 def has_duplicates(items):
     """Return True if the list contains any duplicate values."""
     return len(items) != len(set(items))
 
-def start_csv():
-    with open(pitch_csv_file_path, 'w', newline='', encoding='UTF-8') as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=GameParser.field_names)
-        writer.writeheader()
-
 def read_gamepk_csv() -> List[int]:
     """
     Reads the gamepks from the gamepks.csv file and returns them as a
@@ -38,22 +34,49 @@ def read_gamepk_csv() -> List[int]:
 
 def main():
     """
-    Main function that creates a GameCSVCreator object for each gamepk
+    Downloads and parses every game in gamepks.csv into pitch.csv, or
+    the Parquet pitch store (pitches/) with --format parquet.
+    Downloads run in a thread pool and parsing in a process pool. A
+    stopped run picks up where it left off unless --restart is used.
+    --convert copies an existing pitch.csv into the pitch store
+    without downloading anything.
     """
     logging.basicConfig(level=logging.WARNING)
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    parser.add_argument('--parse-workers', type=int, default=None)
+    parser.add_argument('--max-in-flight', type=int, default=32)
+    parser.add_argument('--restart', action='store_true',
+        help='ignore the checkpoint from the last run')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--convert', action='store_true',
+        help='copy pitch.csv into the Parquet pitch store')
+    args = parser.parse_args()
+
+    if args.convert:
+        # pyarrow is only imported when the store is used
+        from at_bat.pitch_store import csv_to_store # pylint: disable=C0415
+        rows = csv_to_store(pitch_csv_file_path, pitch_store_path)
+        print(f'{rows} pitches written to {pitch_store_path}')
+        return
+
+    output_path = pitch_store_path if args.format == 'parquet' else pitch_csv_file_path
+
     gamepks = read_gamepk_csv()
-    logging.warning(print(has_duplicates(gamepks)))
-    start_csv()
-    for gamepk in tqdm.tqdm(gamepks):
-    # for i, gamepk in enumerate(gamepks):
-        # logging.info(f'{i=} | {gamepk=}')
-        try:
-            g = GameParser(gamepk=gamepk)
-            g.write_csv(pitch_csv_file_path, False)
-        except ValueError as ve:
-            print(f'ValueError {gamepk} | {ve}')
-            print()
+    if has_duplicates(gamepks):
+        logging.warning('gamepks.csv has duplicate gamepks')
+
+    if args.restart:
+        clear_work_dir(output_path)
+
+    rows, failed = ingest_games(gamepks, output_path,
+        fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+        max_in_flight=args.max_in_flight, output_format=args.format)
+
+    print(f'{rows} pitches written to {output_path}')
+    if failed:
+        print(f'failed gamepks (rerun to retry): {failed}')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,65 @@
+"""
+Adds newly completed games to the tables made by scripts 3-7 without
+rerunning them over the full pitch.csv. See at_bat.table_refresh.
+
+The first time, count pitch.csv (or the Parquet pitch store) once:
+
+    python "8. refresh_tables.py" --init
+
+Then every night (defaults to yesterday's games):
+
+    python "8. refresh_tables.py"
+    python "8. refresh_tables.py" --date 2025-06-01
+    python "8. refresh_tables.py" --gamepks 776123 776124
+"""
+
+import argparse
+import datetime
+import os
+from at_bat.statsapi_plus import get_daily_gamepks
+from at_bat.table_refresh import STATS_COLUMNS, STATS_FILE, TableStats, refresh
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+pitch_csv_file_path = os.path.join(current_dir, 'pitch.csv')
+pitch_store_path = os.path.join(current_dir, 'pitches')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--init', action='store_true',
+        help=f'count every game in pitch.csv or pitches/ into {STATS_FILE}')
+    parser.add_argument('--date', default=None,
+        help='add the games of this date (YYYY-MM-DD). Defaults to yesterday')
+    parser.add_argument('--gamepks', nargs='+', type=int, default=None)
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.init:
+        if os.path.isdir(pitch_store_path):
+            # pyarrow is only imported when the store is used
+            from at_bat.pitch_store import read_pitches # pylint: disable=C0415
+            stats = TableStats.from_pitches(read_pitches(pitch_store_path, STATS_COLUMNS))
+        else:
+            stats = TableStats.from_pitch_csv(pitch_csv_file_path)
+        stats.write_tables(current_dir)
+        stats.save(os.path.join(current_dir, STATS_FILE))
+        print(f'{len(stats.gamepks)} games counted')
+        return
+
+    gamepks = args.gamepks
+    if gamepks is None:
+        date = args.date
+        if date is None:
+            date = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+        gamepks = get_daily_gamepks(date)
+
+    if os.path.isdir(pitch_store_path):
+        added = refresh(gamepks, current_dir, pitch_store_path=pitch_store_path,
+            fetch_workers=args.fetch_workers)
+    else:
+        added = refresh(gamepks, current_dir, pitch_csv_path=pitch_csv_file_path,
+            fetch_workers=args.fetch_workers)
+    print(f'{len(added)} games added: {added}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Builds every table of scripts 3-7 from the pitch store (pitches/) or
+pitch.csv in one run. Tables whose inputs have not changed since the
+last run are skipped and stages that do not depend on each other run
+at the same time. See at_bat.pipeline.
+
+    python run_pipeline.py
+    python run_pipeline.py --targets expected_values
+    python run_pipeline.py --force --workers 1
+"""
+
+import argparse
+import os
+import sys
+from at_bat.pipeline import pitch_tables_pipeline, print_reports
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--targets', nargs='+', default=None,
+        help='only build these tables and the tables they need')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--force', action='store_true',
+        help='build every table even if its inputs have not changed')
+    parser.add_argument('--no-memory', action='store_true',
+        help='do not trace peak memory (faster)')
+    args = parser.parse_args()
+
+    reports = pitch_tables_pipeline(current_dir).run(targets=args.targets,
+        workers=args.workers, force=args.force, trace_memory=not args.no_memory)
+    print_reports(reports)
+
+    if any(report.status in ('failed', 'blocked') for report in reports):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@ American League: 103
 National League: 104
 """
 
-import statsapi # pylint: disable=E0401
+from at_bat.http_client import get_client
 from at_bat.standings import Standings
 
 # leagueID:
@@ -15,7 +15,7 @@ from at_bat.standings import Standings
 # 104 - National League
 
 if __name__ == '__main__':
-    standings_data = statsapi.get('standings', {'leagueId':103})
+    standings_data = get_client().get('standings', {'leagueId':103})
     s = Standings(standings_data)
 
     for team in s.west.team_records:
@@ -0,0 +1,107 @@
+"""
+Benchmarks how much memory and time it takes to build Game objects.
+Reports the bytes allocated per pitch (from tracemalloc) and the
+construction time for each json file, so changes to the classes in
+at_bat/game.py can be compared.
+
+Usage:
+    python examples/game_memory_benchmark.py
+    python examples/game_memory_benchmark.py --repeat 50 file1.json
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+from at_bat.game import Game
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FILES = [
+    os.path.join(current_dir, '..', 'tests', 'test_json', '748534.json'),
+    os.path.join(current_dir, '..', 'game_example.json'),
+]
+
+
+def count_pitches(game: Game) -> int:
+    """
+    Returns the number of pitches in the game
+
+    Args:
+        game (Game): The game
+
+    Returns:
+        int: Number of playEvents that are pitches
+    """
+    pitches = 0
+    for at_bat in game.liveData.plays.allPlays:
+        for play_event in at_bat.playEvents:
+            if play_event.is_pitch:
+                pitches += 1
+    return pitches
+
+
+def measure_bytes(data: dict) -> int:
+    """
+    Returns the number of bytes allocated to build (and keep alive) a
+    Game from the dictionary. The dictionary itself is not counted.
+
+    Args:
+        data (dict): Game dictionary
+
+    Returns:
+        int: Bytes allocated
+    """
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    game = Game(data)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del game
+    return after - before
+
+
+def measure_seconds(data: dict, repeat: int) -> float:
+    """
+    Returns the fastest time out of repeat runs to build a Game
+
+    Args:
+        data (dict): Game dictionary
+        repeat (int): Number of runs
+
+    Returns:
+        float: Seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Game(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for file_path in args.files:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+
+        pitches = count_pitches(Game(data))
+        total_bytes = measure_bytes(data)
+        seconds = measure_seconds(data, args.repeat)
+
+        print(os.path.basename(file_path))
+        print(f'  pitches:        {pitches}')
+        print(f'  bytes:          {total_bytes:,}')
+        print(f'  bytes/pitch:    {total_bytes / max(pitches, 1):,.0f}')
+        print(f'  construction:   {seconds * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
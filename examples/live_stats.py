@@ -17,14 +17,17 @@ Functions:
 
 import curses
 import argparse
+import time
 from typing import Any, Optional, Tuple
-from at_bat.game import Game, PlayEvents, AllPlays
+from at_bat.feed_profiles import FEED_PROFILES, project_feed
+from at_bat.game import Game, PlayEvents, AllPlays, feed_fingerprint
 from at_bat.game_parser import GameParser
-from at_bat.statsapi_plus import get_re640_dataframe
+from at_bat.slate_poller import DELAYED_INTERVAL, poll_interval
+from at_bat.state_tables import get_re640_table
 from at_bat.umpire import Umpire
 from at_bat.runners import Runners
 
-re640 = get_re640_dataframe()
+re640 = get_re640_table()
 
 class FIFO:
     """
@@ -142,13 +145,42 @@ def print_last_pitch(gamePk: int = None, delay_seconds: float = 0):
     god = curses.initscr()
     god.clear()
     fifo = FIFO(5)
+    fingerprint = None
+    probe_fingerprint = None
+    parser = None
+    interval = 0
 
     while True:
-        game = Game.get_game_from_pk(gamepk=gamePk, delay_seconds=delay_seconds)
+        # every pass waits, including the ones that find no change
+        time.sleep(interval)
+
+        # only the small scoreboard profile is downloaded until the
+        # feed changes (its metaData.timeStamp changes with every update)
+        probe = Game.get_dict(gamepk=gamePk, delay_seconds=delay_seconds,
+            profile='scoreboard')
+        interval = _poll_interval(probe)
+        if probe is not None and feed_fingerprint(probe) == probe_fingerprint:
+            continue
+
+        data = Game.get_dict(gamepk=gamePk, delay_seconds=delay_seconds)
+        probe_fingerprint = feed_fingerprint(project_feed(data, FEED_PROFILES['scoreboard']))
+
+        # skip building anything if the feed has not changed
+        if feed_fingerprint(data) == fingerprint:
+            continue
+        fingerprint = feed_fingerprint(data)
+
+        game = Game(data, lazy=True)
+        if parser is None:
+            parser = GameParser(game=game)
+        else:
+            parser.advance(game)
+
         at_bat = game.liveData.plays.allPlays[-1]
+        at_bat_key = _at_bat_key(at_bat)
 
-        if fifo.contains(at_bat) is False:
-            fifo.push(at_bat)
+        if fifo.contains(at_bat_key) is False:
+            fifo.push(at_bat_key)
 
             if len(at_bat.playEvents) > 0:
                 pitch = at_bat.playEvents[-1]
@@ -168,7 +200,7 @@ def print_last_pitch(gamePk: int = None, delay_seconds: float = 0):
                     i += 1
 
                 i += 1
-                for line in _get_umpire_details(game):
+                for line in _get_umpire_details(parser):
                     safe_addstr(god, i, 0, f'{line} {clr}')
                     i += 1
 
@@ -185,6 +217,25 @@ def print_last_pitch(gamePk: int = None, delay_seconds: float = 0):
                 god.refresh()
 
 
+def _poll_interval(probe: dict) -> float:
+    # same cadence as the scoreboard (see at_bat.slate_poller)
+    if probe is None:
+        return DELAYED_INTERVAL
+
+    game = Game(probe, profile='scoreboard')
+    interval = poll_interval(game.gameData.status.game_state,
+        game.gameData.datetime.datetime)
+
+    # final games keep the last pitch on screen and are only checked
+    # now and then
+    return DELAYED_INTERVAL if interval is None else interval
+
+
+def _at_bat_key(at_bat: AllPlays) -> tuple:
+    # compared instead of the whole at bat dictionary
+    return (at_bat.atBatIndex, len(at_bat.playEvents), at_bat.playEndTime)
+
+
 def _get_game_details(game: Game, at_bat: AllPlays) -> Tuple[str, str]:
     away_team = game.gameData.teams.away.teamName
     away_score = at_bat.result.awayScore
@@ -219,7 +270,7 @@ def _get_at_bat_details(at_bat: AllPlays,
 
     return (line_0, line_1, line_2)
 
-def _get_run_details_state(at_bat: AllPlays, pitch: PlayEvents) -> bool:
+def _get_run_details_state(at_bat: AllPlays, pitch: PlayEvents) -> dict:
     balls = pitch.count.balls
     strikes = pitch.count.strikes
     outs = pitch.count.outs
@@ -227,31 +278,21 @@ def _get_run_details_state(at_bat: AllPlays, pitch: PlayEvents) -> bool:
     runners.end_at_bat(at_bat)
     runners = int(runners)
 
-    is_first_base = bool(runners & 1)
-    is_second_base = bool(runners & 2)
-    is_third_base = bool(runners & 4)
-
-    state = ((re640['balls'] == balls) &
-             (re640['strikes'] == strikes) &
-             (re640['outs'] == outs) &
-             (re640['is_first_base'] == is_first_base) &
-             (re640['is_second_base'] == is_second_base) &
-             (re640['is_third_base'] == is_third_base))
-
-    return state
+    return re640.lookup_row(balls=balls, strikes=strikes, outs=outs,
+        runners=runners)
 
 def _get_run_details(at_bat: AllPlays, pitch: PlayEvents
                      ) -> Tuple[str, str, str, str, str, str]:
 
     state = _get_run_details_state(at_bat, pitch)
 
-    run_exp = re640[state]['average_runs'].iloc[0]
-    count = re640[state]['count'].iloc[0]
+    run_exp = state['average_runs']
+    count = state['count']
 
     runs = [0, 0, 0, 0] # 1+, 2+, 3+, 4+
 
     for i in range(0, 14):
-        run = re640[state][f'{i} runs'].iloc[0]
+        run = state[f'{i} runs']
 
         if i >= 1:
             runs[0] += run
@@ -272,9 +313,9 @@ def _get_run_details(at_bat: AllPlays, pitch: PlayEvents
     return (line_0, line_1, line_2, line_3, line_4)
 
 
-def _get_umpire_details(game: Game) -> Tuple[str, str]:
-    away_team = game.gameData.teams.away.abbreviation
-    home_team = game.gameData.teams.home.abbreviation
+def _get_umpire_details(parser: GameParser) -> Tuple[str, str]:
+    away_team = parser.game.gameData.teams.away.abbreviation
+    home_team = parser.game.gameData.teams.home.abbreviation
 
     # umpire = Umpire(game=game)
     # umpire.calculate_game('monte')
@@ -290,7 +331,6 @@ def _get_umpire_details(game: Game) -> Tuple[str, str]:
 
     # return (line_0, line_1)
 
-    parser = GameParser(game=game)
     df = parser.dataframe
     df = GameParser.umpire_missed_calls(df)
 
@@ -7,11 +7,11 @@ import time
 from typing import List
 from datetime import datetime, timezone, timedelta
 import requests
-from at_bat.statsapi_plus import get_daily_gamepks
-from at_bat.game import Game
-from at_bat.scoreboard_data import ScoreboardData
+from at_bat.slate import SlateHistory, SlateSnapshot
 
 PORT = 8080 # Defined on the ESP32's side
+DELAY_SECONDS = 60 # Matches the TV broadcast
+NEW_GAMES_INTERVAL = 600 # Every game is final, check for new games
 request_keys = ['game_state',
                 'away_abv',
                 'home_abv',
@@ -145,86 +145,102 @@ def get_request_dict(game: dict) -> dict:
 
     return d
 
-def start_games(ip: str, date: str, delay_seconds: int) -> List[ScoreboardData]:
-    """Initalizes the games list with the games from the current day.
-    Sends initial data to the ESP32.
+def send_game(ip: str, i: int, params: dict):
+    """Sends data for one slot of the scoreboard matrix
 
-    Returns:
-        List[ScoreboardData]: list of games from the current day
+    Args:
+        ip (str): IP address of the ESP32
+        i (int): Index of the game on the matrix
+        params (dict): Query parameters for the request
     """
+    response = requests.get(f'http://{ip}:{PORT}/{i}', timeout=10,
+                            params=params)
 
-    daily_pks = get_daily_gamepks(date)
-    games: List[ScoreboardData] = [None] * 16
-
-    for i, pk in enumerate(daily_pks):
-        game = Game.get_game_from_pk(pk)
-        games[i] = ScoreboardData(game, delay_seconds=delay_seconds)
-
-    for i, game in enumerate(games):
-        if game is not None:
-            params = get_request_dict(game.to_dict()) | {'show': 'true'}
-            response = requests.get(f'http://{ip}:{PORT}/{i}', timeout=10,
-                                    params=params)
-        else:
-            response = requests.get(f'http://{ip}:{PORT}/{i}', timeout=10,
-                                    params={'show': 'false'})
-
-        if response.status_code != 200:
-            print(f'Error: {response.status_code} {response.reason}')
-
-        print(response.url)
+    if response.status_code != 200:
+        print(f'Error: {response.status_code} {response.reason}')
 
-    return games
+    print(response.url)
 
-def loop(ip: str, i: int, game: ScoreboardData):
-    """Update the scoreboard matrix with the current game data.
+def hide_unused(ip: str, gamepks: List[int]):
+    """Hides the slots on the matrix that do not have a game
 
     Args:
         ip (str): IP address of the ESP32
-        i (int): Index of the game in the games list
-        game (GameSimple): GameSimple object
+        gamepks (List[int]): Games shown on the matrix
     """
+    for i in range(len(gamepks), 16):
+        send_game(ip, i, {'show': 'false'})
 
-    if game is None:
-        return
+def update_matrix(ip: str, slate: SlateSnapshot, last_slate: SlateSnapshot,
+    current_gamepks: List[int]):
+    """Sends the games that changed since the last slate shown
 
-    diff = game.update_return_difference()
-
-    request_dict = get_request_dict(diff)
-
-    if request_dict:
-        response = requests.get(f'http://{ip}:{PORT}/{i}', timeout=10,
-                                params=get_request_dict(request_dict))
-
-        if response.status_code != 200:
-            print(f'Error: {response.status_code} {response.reason}')
-
-        print(response.url)
+    Args:
+        ip (str): IP address of the ESP32
+        slate (SlateSnapshot): Slate to show
+        last_slate (SlateSnapshot): Slate shown last. None if nothing
+            has been shown
+        current_gamepks (List[int]): Games on the matrix, by slot.
+            Updated when the games change
+    """
+    gamepks = slate.gamepks[:16]
+    if gamepks != current_gamepks:
+        # games moved slots so everything is sent again
+        current_gamepks[:] = gamepks
+        hide_unused(ip, current_gamepks)
+        last_slate = None
+
+    for gamepk, diff in slate.diff(last_slate).items():
+        if gamepk not in current_gamepks:
+            continue
+
+        request_dict = get_request_dict(diff)
+        if last_slate is None or gamepk not in last_slate.gamepks:
+            request_dict |= {'show': 'true'}
+
+        try:
+            send_game(ip, current_gamepks.index(gamepk), request_dict)
+        except requests.exceptions.RequestException as e:
+            print(e)
 
 def main():
     """Main function that runs the scoreboard matrix"""
     time.sleep(10) # Let Raspberry Pi connect to the network from boot
     ip = get_ip()
-    games = start_games(ip, date='2024-05-29', delay_seconds=60)
+    date = '2024-05-29'
 
-    # Get new games for the day
-    current_gamepks = get_daily_gamepks('2024-05-29')
-    last_gamepk_check = time.time()
+    # the matrix only shows linescore fields so one schedule request
+    # covers every game instead of downloading each full game feed.
+    # The slate is shown DELAY_SECONDS behind to match the broadcast
+    # and downloaded as often as SlatePoller would poll its games
+    current_gamepks: List[int] = []
+    last_slate: SlateSnapshot = None
+    history = SlateHistory(delay_seconds=DELAY_SECONDS)
 
     while True:
-        for i, game, in enumerate(games):
-            try:
-                loop(ip, i, game)
-            except TimeoutError as e:
-                print('Timeout Error')
-                print(e)
-
-        if (time.time() - last_gamepk_check) > 600:
-            last_gamepk_check = time.time()
-            new_gamepks = get_daily_gamepks('2024-05-29')
-
-            if new_gamepks != current_gamepks:
-                games = start_games(ip, date='2024-05-29', delay_seconds=60)
+        try:
+            history.add(SlateSnapshot.get(date))
+        except requests.exceptions.RequestException as e:
+            print(e)
+            time.sleep(10)
+            continue
+
+        # every snapshot is shown when it is DELAY_SECONDS old, then
+        # the slate is downloaded again when it is due
+        next_download = time.time() + (history.latest.next_interval() or NEW_GAMES_INTERVAL)
+
+        while True:
+            slate = history.delayed()
+            if slate is not None and slate is not last_slate:
+                update_matrix(ip, slate, last_slate, current_gamepks)
+                last_slate = slate
+
+            wait = history.until_next()
+            if wait is None or time.time() + wait > next_download:
+                break
+            time.sleep(wait)
+
+        time.sleep(max(next_download - time.time(), 0))
 
 if '__main__' == __name__:
     main()
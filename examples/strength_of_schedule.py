@@ -7,8 +7,8 @@ import argparse
 from datetime import datetime
 from datetime import timedelta
 from typing import List
-import statsapi # pylint: disable=E0401
 from tqdm import tqdm
+from at_bat.http_client import get_client
 from at_bat.team import Team
 from at_bat.schedule import Schedule
 
@@ -48,9 +48,9 @@ def sos(days_ahead=30, print_results = False):
     teams: List[Team] = Team.get_teams_list()
 
     for team in tqdm(teams):
-        data = statsapi.get('schedule',
-                            {'sportId':1, 'startDate':today,
-                             'endDate':ahead, 'teamId':team.id})
+        data = get_client().get('schedule',
+                                {'sportId':1, 'startDate':today,
+                                 'endDate':ahead, 'teamId':team.id})
 
         data = Schedule(data)
 
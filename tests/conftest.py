@@ -0,0 +1,72 @@
+import copy
+import json
+import os
+
+import numpy as np
+import pytest
+
+from at_bat import expected_values as expected_values_module
+from at_bat import feed_cache as feed_cache_module
+from at_bat import umpire as umpire_module
+from at_bat.expected_values import ExpectedValuesGrid
+
+JSON_PATH = os.path.join(os.path.dirname(__file__), 'test_json', '748534.json')
+
+
+@pytest.fixture(autouse=True)
+def isolated_feed_cache(tmp_path, monkeypatch):
+    """
+    Every test gets its own empty feed cache so nothing is read from or
+    written to the real one
+    """
+    monkeypatch.setattr(feed_cache_module, '_feed_cache',
+        feed_cache_module.FeedCache(str(tmp_path / 'feed_cache')))
+
+
+def _zero_table():
+    class _Table:
+        def lookup(self, column, balls, *args, **kwargs):
+            return balls * 0.0
+    return _Table()
+
+
+def _empty_grid():
+    return ExpectedValuesGrid(np.full((1, 1), np.nan), np.full((1, 1), np.nan))
+
+
+@pytest.fixture
+def game_dict(monkeypatch):
+    """
+    Game 748534 with the win probability and expected value tables
+    stubbed out so the parser does not need the every_pitch_csv files
+    """
+    monkeypatch.setattr(umpire_module, 'get_win_probability', _zero_table)
+    monkeypatch.setattr(expected_values_module, 'get_expected_values_grid', _empty_grid)
+
+    with open(JSON_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _partial(data: dict, at_bats: int, pitches: int) -> dict:
+    """
+    Copy of the game cut off in the middle of an at bat
+    """
+    data = copy.deepcopy(data)
+    all_plays = data['liveData']['plays']['allPlays'][:at_bats + 1]
+    current = all_plays[-1]
+    current['playEvents'] = current['playEvents'][:pitches]
+    current['about']['isComplete'] = False
+    current['result'].pop('eventType', None)
+    data['liveData']['plays']['allPlays'] = all_plays
+    # like the live feed, every cut has its own timeStamp
+    data['metaData']['timeStamp'] = f'20231102_{at_bats:03d}{pitches:03d}'
+    return data
+
+
+@pytest.fixture
+def partial_game():
+    """
+    Returns a function that cuts a game dictionary off after at_bats
+    at bats and pitches pitches of the next one
+    """
+    return _partial
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat import expected_values as expected_values_module
+from at_bat.expected_values import ExpectedValuesGrid, score_batted_balls
+
+
+@pytest.fixture
+def small_grid(monkeypatch):
+    df = pd.DataFrame({
+        'exit_velocity': [90.0, 90.0, 90.1, 90.1, 100.0],
+        'launch_angle': [10, 11, 10, 11, -5],
+        'xba': [0.2, 0.4, 0.6, None, 0.9],
+        'xslg': [0.3, 0.5, 0.7, None, 1.8],
+    })
+    grid = ExpectedValuesGrid.from_dataframe(df)
+    monkeypatch.setattr(expected_values_module, 'get_expected_values_grid', lambda: grid)
+    return grid
+
+
+def test_exact_lookup(small_grid):
+    xba, xslg = small_grid.lookup([90.0, 100.0, 100.04], [10, -5, -5.2])
+
+    assert list(xba) == [0.2, 0.9, 0.9]
+    assert list(xslg) == [0.3, 1.8, 1.8]
+
+
+def test_missing_and_off_grid_cells_are_nan(small_grid):
+    xba, _ = small_grid.lookup([90.1, 200.0, 90.0], [11, 10, -150])
+
+    assert np.isnan(xba).all()
+
+
+def test_bilinear_interpolation_skips_empty_cells(small_grid):
+    xba, _ = small_grid.lookup([90.0, 90.05], [10.5, 10.0], interpolate=True)
+
+    assert xba[0] == pytest.approx(0.3)
+    assert xba[1] == pytest.approx(0.4)
+
+    # (90.1, 11) is empty so only the other three corners are used
+    xba, _ = small_grid.lookup([90.05], [10.5], interpolate=True)
+    assert xba[0] == pytest.approx(0.4)
+
+
+def test_score_batted_balls_rules(small_grid):
+    xba, xslg = score_batted_balls(
+        ['single', 'strikeout', 'walk', None],
+        [90.0, None, None, np.nan],
+        [10, None, None, np.nan])
+
+    assert xba[0] == 0.2
+    assert xslg[1] == 0
+    assert np.isnan(xba[2]) and np.isnan(xba[3])
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.expected_values import ExpectedValuesGrid
+from at_bat.expected_values_builder import (EXPECTED_VALUES_COLUMNS, HITS, OUTS,
+    build_expected_values)
+
+
+@pytest.fixture
+def batted_balls():
+    rng = np.random.default_rng(0)
+    size = 400
+    events = list(HITS) + list(OUTS) + ['sac_fly', 'strikeout']
+    ev = np.round(rng.uniform(0, 132, size), 1)
+    ev[:3] = [1.0, 129.9, np.nan] # edges of the table and no batted ball
+    return pd.DataFrame({
+        'at_bat_event_type': rng.choice(events, size),
+        'batted_ball_launch_speed': ev,
+        'batted_ball_launch_angle': rng.integers(-102, 102, size).astype(float),
+    })
+
+
+def _loop_expected_values(df, ev_width, la_width):
+    """
+    The row loop of "7. expected_batting_average.py" in 0.1 mph steps
+    """
+    table = {}
+    for _, row in df.iterrows():
+        event = row['at_bat_event_type']
+        if event not in OUTS and event not in HITS:
+            continue
+        if pd.isnull(row['batted_ball_launch_speed']):
+            continue
+
+        ev = round(row['batted_ball_launch_speed'] * 10)
+        la = round(row['batted_ball_launch_angle'])
+        for e in range(ev - ev_width * 10, ev + ev_width * 10):
+            for l in range(la - la_width, la + la_width):
+                cell = table.setdefault((e, l), [0, 0, 0])
+                cell[0] += event in HITS
+                cell[1] += HITS.get(event, 0)
+                cell[2] += 1
+    return table
+
+
+@pytest.mark.parametrize('ev_width, la_width', [(3, 1), (1, 4)])
+def test_matches_row_loop(batted_balls, ev_width, la_width):
+    expected = _loop_expected_values(batted_balls, ev_width, la_width)
+    table = build_expected_values(batted_balls, ev_width, la_width)
+
+    assert list(table.columns) == EXPECTED_VALUES_COLUMNS
+    assert len(table) == 1290 * 200
+
+    for row in table.itertuples(index=False):
+        hits, total_bases, at_bats = expected.get(
+            (round(row.exit_velocity * 10), row.launch_angle), [0, 0, 0])
+        assert (row.hits, row.total_bases, row.at_bats) == (hits, total_bases, at_bats)
+        if at_bats:
+            assert row.xba == hits / at_bats
+            assert row.xslg == total_bases / at_bats
+        else:
+            assert np.isnan(row.xba) and np.isnan(row.xslg)
+
+
+def test_table_loads_into_grid(batted_balls):
+    table = build_expected_values(batted_balls)
+    grid = ExpectedValuesGrid.from_dataframe(table)
+
+    row = table[table['at_bats'] > 0].iloc[0]
+    xba, xslg = grid.lookup([row['exit_velocity']], [row['launch_angle']])
+    assert (xba[0], xslg[0]) == (row['xba'], row['xslg'])
+
+
+def test_bin_width_must_cover_a_cell(batted_balls):
+    with pytest.raises(ValueError):
+        build_expected_values(batted_balls, ev_bin_width=0.01)
@@ -0,0 +1,122 @@
+import copy
+import json
+import os
+import time
+
+import pytest
+
+from at_bat import game as game_module
+from at_bat import feed_cache as feed_cache_module
+from at_bat.feed_cache import FeedCache, get_feed_cache
+from at_bat.game import Game
+
+
+@pytest.fixture
+def final_game():
+    with open('tests/test_json/748534.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _live(data):
+    data = copy.deepcopy(data)
+    data['gameData']['status']['codedGameState'] = 'I'
+    return data
+
+
+def test_final_games_are_cached_and_live_games_are_not(tmp_path, final_game):
+    cache = FeedCache(str(tmp_path))
+
+    assert cache.put(1, _live(final_game)) is False
+    assert cache.get(1) is None
+
+    assert cache.put(748534, final_game) is True
+    assert cache.get(748534) == final_game
+    assert cache.get(748534, '20990101_000000') == final_game
+
+    # before the game was final
+    assert cache.get(748534, '20231101_000000') is None
+
+
+def test_index_survives_restart_and_is_compressed(tmp_path, final_game):
+    cache = FeedCache(str(tmp_path))
+    cache.put(748534, final_game)
+
+    reopened = FeedCache(str(tmp_path))
+    assert 748534 in reopened
+    assert reopened.get(748534)['gamePk'] == 748534
+    assert reopened.total_bytes < len(json.dumps(final_game)) / 4
+
+
+def test_size_based_eviction_keeps_recent_feeds(tmp_path, final_game):
+    cache = FeedCache(str(tmp_path))
+    cache.put(1, final_game)
+    size = cache.total_bytes
+
+    cache.max_bytes = int(size * 2.5)
+    for gamepk in (2, 3):
+        data = copy.deepcopy(final_game)
+        data['gamePk'] = gamepk
+        cache.put(gamepk, data)
+
+    assert 1 not in cache
+    assert 2 in cache and 3 in cache
+    assert cache.total_bytes <= cache.max_bytes
+    assert len(FeedCache(str(tmp_path))) == 2
+
+
+def test_eviction_keeps_feeds_added_by_other_processes(tmp_path, final_game):
+    def game(gamepk):
+        data = copy.deepcopy(final_game)
+        data['gamePk'] = gamepk
+        return data
+
+    ingest = FeedCache(str(tmp_path))
+    other = FeedCache(str(tmp_path)) # opened before ingest wrote anything
+
+    def last_read(cache, gamepk, seconds_ago):
+        path = cache._object_path(cache._entries[gamepk]['digest'])
+        os.utime(path, (time.time() - seconds_ago, time.time() - seconds_ago))
+
+    ingest.put(1, game(1))
+    size = ingest.total_bytes
+    last_read(ingest, 1, -60) # read most recently
+
+    other.max_bytes = int(size * 2.5)
+    other.put(2, game(2))
+    other.put(3, game(3))
+    last_read(other, 2, 20)
+    last_read(other, 3, 10)
+    other.put(4, game(4))
+
+    reopened = FeedCache(str(tmp_path))
+    assert 1 in reopened and 4 in reopened
+    assert 2 not in reopened and 3 not in reopened
+    assert reopened.total_bytes <= other.max_bytes
+
+
+def test_cache_is_off_unless_a_directory_is_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(feed_cache_module, '_feed_cache', False)
+    monkeypatch.delenv('AT_BAT_FEED_CACHE', raising=False)
+    assert get_feed_cache() is None
+
+    monkeypatch.setattr(feed_cache_module, '_feed_cache', False)
+    monkeypatch.setenv('AT_BAT_FEED_CACHE', str(tmp_path / 'feeds'))
+    assert get_feed_cache().root == str(tmp_path / 'feeds')
+
+
+def test_get_dict_reads_final_games_from_cache(monkeypatch, final_game):
+    calls = []
+
+    class FakeClient:
+        def get(self, *args, **kwargs):
+            calls.append(args)
+            return final_game
+
+    monkeypatch.setattr(game_module, 'get_client', FakeClient)
+
+    Game.get_dict(gamepk=748534)
+    data = Game.get_dict(gamepk=748534)
+
+    assert data == final_game
+    assert len(calls) == 1
+    assert get_feed_cache().hits == 1
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from at_bat import feed_cache as feed_cache_module
+from at_bat import game as game_module
+from at_bat.feed_profiles import FEED_PROFILES, profile_fields, project_feed
+from at_bat.game import Game
+
+JSON_PATH = os.path.join(os.path.dirname(__file__), 'test_json', '748534.json')
+
+
+@pytest.fixture
+def full_dict():
+    with open(JSON_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        profile_fields('box')
+
+    assert profile_fields('full') is None
+
+
+def test_project_feed_keeps_named_keys_at_any_depth():
+    data = {'a': {'b': 1, 'c': 2}, 'd': [{'b': 3, 'e': 4}], 'f': 5}
+
+    assert project_feed(data, ['a', 'b', 'd']) == {'a': {'b': 1}, 'd': [{'b': 3}]}
+
+
+@pytest.mark.parametrize('profile', ['scoreboard', 'last_pitch'])
+def test_partial_game_matches_full_game(full_dict, profile):
+    partial_dict = project_feed(full_dict, FEED_PROFILES[profile])
+    assert len(json.dumps(partial_dict)) * 10 < len(json.dumps(full_dict))
+
+    full = Game(full_dict)
+    partial = Game(partial_dict, profile=profile)
+
+    assert partial.profile == profile
+    assert partial.gameData.status.game_state == full.gameData.status.game_state
+    assert partial.gameData.teams.away.abbreviation == full.gameData.teams.away.abbreviation
+    assert partial.gameData.venue.timeZone.offset == full.gameData.venue.timeZone.offset
+    assert partial.metaData.time_stamp == full.metaData.time_stamp
+
+    linescore = partial.liveData.linescore
+    assert linescore.currentInning == full.liveData.linescore.currentInning
+    assert linescore.teams.home.runs == full.liveData.linescore.teams.home.runs
+    assert linescore.offense.is_first == full.liveData.linescore.offense.is_first
+    assert len(linescore.innings) == len(full.liveData.linescore.innings)
+
+    # not downloaded
+    assert partial.liveData.boxscore is None
+    if profile == 'scoreboard':
+        assert partial.liveData.plays is None
+    else:
+        assert len(partial.liveData.plays.allPlays) == 0
+
+
+def test_last_pitch_profile_has_the_current_play(full_dict):
+    partial = Game(project_feed(full_dict, FEED_PROFILES['last_pitch']), profile='last_pitch')
+    full = Game(full_dict)
+
+    current = partial.liveData.plays.currentPlay
+    expected = full.liveData.plays.currentPlay
+    assert current.result.eventType == expected.result.eventType
+    assert current.matchup.batter.fullName == expected.matchup.batter.fullName
+    assert len(current.runners) == len(expected.runners)
+
+    pitch = [event for event in current.playEvents if event.is_pitch][-1]
+    expected_pitch = [event for event in expected.playEvents if event.is_pitch][-1]
+    assert pitch.details.description == expected_pitch.details.description
+    assert pitch.count.balls == expected_pitch.count.balls
+    assert pitch.pitch_data.startSpeed == expected_pitch.pitch_data.startSpeed
+    assert pitch.pitch_data.coordinates.pX == expected_pitch.pitch_data.coordinates.pX
+    assert pitch.pitch_data.breaks.spinRate == expected_pitch.pitch_data.breaks.spinRate
+
+
+def test_get_dict_sends_fields_and_does_not_cache_partial_feeds(monkeypatch, full_dict):
+    captured = {}
+    partial_dict = project_feed(full_dict, FEED_PROFILES['scoreboard'])
+
+    class FakeClient:
+        def get(self, endpoint, params=None, force=False, timeout=None):
+            captured['params'] = params
+            return partial_dict
+
+    monkeypatch.setattr(game_module, 'get_client', FakeClient)
+
+    data = Game.get_dict(gamepk=748534, profile='scoreboard')
+
+    assert data is partial_dict
+    assert captured['params']['fields'] == profile_fields('scoreboard')
+    assert 748534 not in feed_cache_module.get_feed_cache()
+
+
+def test_get_dict_projects_cached_full_feeds(full_dict):
+    feed_cache_module.get_feed_cache().put(748534, full_dict)
+
+    data = Game.get_dict(gamepk=748534, profile='scoreboard')
+
+    assert data == project_feed(full_dict, FEED_PROFILES['scoreboard'])
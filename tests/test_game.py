@@ -6,11 +6,13 @@ import pytest
 import requests
 
 from at_bat import game as game_module
+from at_bat import http_client as http_client_module
 from at_bat.game import (
     KNOWN_GAMESTATES,
     About,
     Count,
     Game,
+    LazyList,
     Movement,
     Offense,
     PitchCoordinates,
@@ -22,7 +24,9 @@ from at_bat.game import (
     _get_division,
     _get_utc_time,
     _get_utc_time_from_zulu,
+    feed_fingerprint,
 )
+from at_bat.http_client import StatsApiClient
 
 
 @pytest.fixture
@@ -48,6 +52,60 @@ def test_game_repr_and_equality(sample_game_dict):
     assert game1 == game2
 
 
+def test_lazy_game_builds_children_on_access(sample_game_dict):
+    game = Game(sample_game_dict, lazy=True)
+
+    assert 'liveData' not in vars(game)
+
+    all_plays = game.liveData.plays.allPlays
+    assert isinstance(all_plays, LazyList)
+    assert len(all_plays) == len(sample_game_dict['liveData']['plays']['allPlays'])
+    assert all(item is None for item in all_plays._cache)
+
+    last_at_bat = all_plays[-1]
+    assert all_plays[-1] is last_at_bat
+    assert sum(item is not None for item in all_plays._cache) == 1
+    assert 'about' not in vars(last_at_bat)
+
+
+def test_lazy_game_matches_eager_game(sample_game_dict):
+    eager = Game(sample_game_dict)
+    lazy = Game(sample_game_dict, lazy=True)
+
+    assert lazy.gameData.teams.away.abbreviation == eager.gameData.teams.away.abbreviation
+    assert lazy.liveData.linescore.teams.home.runs == eager.liveData.linescore.teams.home.runs
+    assert lazy.liveData.plays.allPlays == eager.liveData.plays.allPlays
+
+    for lazy_at_bat, eager_at_bat in zip(lazy.liveData.plays.allPlays, eager.liveData.plays.allPlays):
+        assert lazy_at_bat.about.inning == eager_at_bat.about.inning
+        assert lazy_at_bat.result.eventType == eager_at_bat.result.eventType
+        assert len(lazy_at_bat.runners) == len(eager_at_bat.runners)
+        assert lazy_at_bat.playEvents[1:] == eager_at_bat.playEvents[1:]
+
+        for lazy_event, eager_event in zip(lazy_at_bat.playEvents, eager_at_bat.playEvents):
+            if eager_event.pitch_data is None:
+                assert lazy_event.pitch_data is None
+            else:
+                assert lazy_event.pitch_data.coordinates.pX == eager_event.pitch_data.coordinates.pX
+
+
+def test_leaf_classes_are_slotted_and_copyable(sample_game_dict):
+    for lazy in (False, True):
+        game = Game(sample_game_dict, lazy=lazy)
+        at_bat = game.liveData.plays.allPlays[0]
+        pitch = next(event for event in at_bat.playEvents if event.is_pitch)
+
+        assert isinstance(pitch, PlayEvents)
+        assert not hasattr(pitch, '__dict__')
+        assert not hasattr(pitch.pitch_data.coordinates, '__dict__')
+        assert not hasattr(at_bat.runners[0], '__dict__')
+
+        copied = copy.deepcopy(game)
+        copied_pitch = copied.liveData.plays.allPlays[0].playEvents[pitch.index]
+        assert copied_pitch.pitch_data.coordinates.pX == pitch.pitch_data.coordinates.pX
+        assert copied_pitch.details.description == pitch.details.description
+
+
 def test_get_game_from_pk_validates_input():
     with pytest.raises(ValueError, match='gamePk not provided'):
         Game.get_game_from_pk(None)
@@ -75,46 +133,77 @@ def test_get_game_from_pk_uses_iso_time(monkeypatch, sample_game_dict):
 
 
 def test_get_dict_retries_then_succeeds(monkeypatch, sample_game_dict):
-    class FakeRequestException(requests.exceptions.RequestException):
-        pass
-
-    call_counter = {'count': 0}
+    class FakeSession:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, headers=None, timeout=None):
+            self.urls.append(url)
+            if len(self.urls) < 3:
+                raise requests.exceptions.ConnectionError('temporary network issue')
+            response = requests.Response()
+            response.status_code = 200
+            response._content = json.dumps(sample_game_dict).encode('utf-8')
+            return response
+
+    session = FakeSession()
     sleep_calls = []
+    client = StatsApiClient(session=session, rate_per_second=None,
+        sleep=sleep_calls.append)
 
-    def fake_statsapi_get(*_args, **_kwargs):
-        call_counter['count'] += 1
-        if call_counter['count'] < 3:
-            raise FakeRequestException('temporary network issue')
-        return sample_game_dict
-
-    monkeypatch.setattr(game_module.statsapi, 'get', fake_statsapi_get)
-    monkeypatch.setattr(game_module, 'sleep', lambda seconds: sleep_calls.append(seconds))
+    monkeypatch.setattr(game_module, 'get_client', lambda: client)
+    monkeypatch.setattr(http_client_module.random, 'uniform', lambda low, high: high)
 
     data = Game.get_dict(gamepk=748534, delay_seconds=0)
 
     assert data['gamePk'] == 748534
-    assert call_counter['count'] == 3
+    assert len(session.urls) == 3
     assert sleep_calls == [1, 2]
+    assert client.stats()['retries'] == 2
+
+
+def test_get_dict_returns_none_when_every_attempt_fails(monkeypatch):
+    class FailingClient:
+        def get(self, *_args, **_kwargs):
+            raise requests.exceptions.ConnectionError('network is down')
+
+    monkeypatch.setattr(game_module, 'get_client', FailingClient)
+
+    assert Game.get_dict(gamepk=748534) is None
+
+
+def test_failed_downloads_raise_or_are_skipped(monkeypatch, sample_game_dict):
+    def fake_get_dict(cls, gamepk=None, iso_time=None, delay_seconds=0):
+        return None if gamepk == 2 else sample_game_dict
+
+    monkeypatch.setattr(Game, 'get_dict', classmethod(fake_get_dict))
+    monkeypatch.setattr(game_module, 'get_daily_gamepks', lambda: [1, 2])
+
+    with pytest.raises(requests.exceptions.RetryError, match='could not download game 2'):
+        Game.get_game_from_pk(2)
+
+    assert len(game_module.get_games()) == 1
 
 
 def test_get_dict_uses_iso_timecode(monkeypatch, sample_game_dict):
     captured = {}
 
-    def fake_statsapi_get(endpoint, params, request_kwargs=None, force=False):
-        captured['endpoint'] = endpoint
-        captured['params'] = params
-        captured['request_kwargs'] = request_kwargs
-        captured['force'] = force
-        return sample_game_dict
+    class FakeClient:
+        def get(self, endpoint, params=None, force=False, timeout=None):
+            captured['endpoint'] = endpoint
+            captured['params'] = params
+            captured['force'] = force
+            captured['timeout'] = timeout
+            return sample_game_dict
 
-    monkeypatch.setattr(game_module.statsapi, 'get', fake_statsapi_get)
+    monkeypatch.setattr(game_module, 'get_client', FakeClient)
 
     Game.get_dict(gamepk=748534, iso_time='2024-10-05T01:02:03Z')
 
     assert captured['endpoint'] == 'game'
     assert captured['params']['gamePk'] == 748534
     assert captured['params']['timecode'] == '20241005_010203'
-    assert captured['request_kwargs'] == {'timeout': 10}
+    assert captured['timeout'] is None # the client's timeout for 'game'
     assert captured['force'] is True
 
 
@@ -263,3 +352,16 @@ def test_pitch_data_and_playevents_repr_behavior():
     assert repr(play_event) == 'Called Strike'
     assert play_event == play_event
     assert play_event != None
+
+
+def test_feed_fingerprint_changes_with_the_feed(sample_game_dict):
+    same = copy.deepcopy(sample_game_dict)
+    assert feed_fingerprint(same) == feed_fingerprint(sample_game_dict)
+    assert Game(same, lazy=True).fingerprint == feed_fingerprint(same)
+
+    same['liveData']['linescore']['outs'] = -1
+    assert feed_fingerprint(same) != feed_fingerprint(sample_game_dict)
+
+    same = copy.deepcopy(sample_game_dict)
+    same['metaData']['timeStamp'] = '20990101_000000'
+    assert feed_fingerprint(same) != feed_fingerprint(sample_game_dict)
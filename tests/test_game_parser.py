@@ -0,0 +1,91 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from at_bat.game import Game
+from at_bat.game_parser import GameParser
+
+
+def test_advance_matches_full_parse(game_dict, partial_game):
+    parser = GameParser(game=Game(partial_game(game_dict, 20, 2)))
+    first_rows = len(parser.game_data)
+    parser.advance(Game(partial_game(game_dict, 20, 4)))
+    parser.advance(Game(partial_game(game_dict, 41, 1)))
+    parser.advance(Game(game_dict))
+    assert len(parser.game_data) > first_rows
+
+    expected = GameParser(game=Game(game_dict))
+
+    assert parser.game_data == expected.game_data
+    pd.testing.assert_frame_equal(parser.dataframe[expected.dataframe.columns],
+        expected.dataframe, check_dtype=False)
+
+
+def test_lazy_game_parses_the_same(game_dict):
+    lazy = GameParser(game=Game(game_dict, lazy=True))
+    eager = GameParser(game=Game(game_dict))
+
+    assert lazy.game_data == eager.game_data
+
+
+def test_advance_without_changes_keeps_rows(game_dict):
+    parser = GameParser(game=Game(game_dict))
+    rows = list(parser.game_data)
+
+    parser.advance(Game(game_dict))
+
+    assert len(parser.game_data) == len(rows)
+    assert all(a is b for a, b in zip(parser.game_data, rows))
+
+
+def test_advance_rejects_other_games(game_dict):
+    parser = GameParser(game=Game(game_dict))
+    other = copy.deepcopy(game_dict)
+    other['gamePk'] = 1
+
+    with pytest.raises(ValueError):
+        parser.advance(Game(other))
+
+
+def test_advance_with_the_same_feed_is_not_a_change(game_dict, partial_game):
+    parser = GameParser(game=Game(partial_game(game_dict, 21, 2)))
+    dataframe = parser.dataframe
+
+    parser.advance(Game(partial_game(game_dict, 21, 2)))
+    assert parser.changed is False
+    assert parser.dataframe is dataframe
+
+    parser.advance(Game(partial_game(game_dict, 21, 3)))
+    assert parser.changed is True
+
+
+def test_write_csv_appends_under_the_existing_header(game_dict, tmp_path):
+    parser = GameParser(game=Game(game_dict))
+    path = str(tmp_path / 'pitch.csv')
+    old_columns = GameParser.field_names[:-4]
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(','.join(old_columns) + '\n')
+
+    parser.write_csv(path)
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == old_columns
+    assert df['balls'].tolist() == parser.dataframe['balls'].tolist()
+
+
+def test_advance_reparses_a_changed_older_at_bat(game_dict):
+    parser = GameParser(game=Game(game_dict))
+
+    # the scorer changes the single in at bat 11 to an error
+    corrected = copy.deepcopy(game_dict)
+    result = corrected['liveData']['plays']['allPlays'][11]['result']
+    result['eventType'] = 'field_error'
+    result['event'] = 'Field Error'
+
+    parser.advance(Game(corrected))
+    expected = GameParser(game=Game(corrected))
+
+    assert parser.changed is True
+    assert parser.game_data == expected.game_data
+    assert 'field_error' in parser.dataframe['at_bat_event_type'].values
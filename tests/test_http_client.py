@@ -0,0 +1,248 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+import statsapi
+
+from at_bat import http_client as http_client_module
+from at_bat.http_client import StatsApiClient, _RateLimiter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Answers with the next (status, headers, body) of server.responses
+    for the path, or the last one once they run out
+    """
+    def do_GET(self): # pylint: disable=C0103
+        path = self.path.split('?')[0]
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        responses = self.server.responses[path]
+        status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+
+        if callable(status):
+            status, headers, body = status(self.headers)
+
+        raw = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args): # pylint: disable=W0221
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    httpd.responses = {}
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    sleeps = []
+    client = StatsApiClient(base_url=f'http://127.0.0.1:{server.server_port}',
+        rate_per_second=None, sleep=sleeps.append)
+    client.sleeps = sleeps
+    return client
+
+
+GAME_PATH = '/api/v1.1/game/748534/feed/live'
+
+
+def test_url_matches_statsapi():
+    client = StatsApiClient()
+    params = {'gamePk': 748534, 'timecode': '20241005_010203', 'not_a_param': 'x'}
+
+    with pytest.raises(ValueError):
+        client.url('not_an_endpoint')
+
+    assert client.url('game', params) == 'https://statsapi.mlb.com/api/v1.1/game/748534/feed/live?timecode=20241005_010203'
+    assert client.url('game', params, force=True).endswith('&not_a_param=x')
+    assert client.url('game', {'gamePk': 1, 'fields': 'gamePk,metaData'}).endswith('?fields=gamePk,metaData')
+    assert client.url('schedule', {'sportId': 1, 'hydrate': 'linescore,venue(timezone)'}) == \
+        'https://statsapi.mlb.com/api/v1/schedule?sportId=1&hydrate=linescore,venue(timezone)'
+    assert client.url('standings', {'leagueId': 103}).startswith(
+        statsapi.endpoints.ENDPOINTS['standings']['url'].split('{')[0])
+
+
+def test_get_returns_json_and_counts(server, client):
+    server.responses[GAME_PATH] = [(200, {}, {'gamePk': 748534})]
+
+    assert client.get('game', {'gamePk': 748534}) == {'gamePk': 748534}
+
+    stats = client.stats()
+    assert stats['requests'] == 1
+    assert stats['retries'] == 0
+    assert stats['bytes_received'] == len(b'{"gamePk": 748534}')
+    assert stats['mean_latency_seconds'] > 0
+
+
+def test_get_retries_server_errors(monkeypatch, server, client):
+    server.responses[GAME_PATH] = [
+        (503, {}, None),
+        (429, {}, None),
+        (200, {}, {'gamePk': 748534}),
+    ]
+    monkeypatch.setattr(http_client_module.random, 'uniform', lambda low, high: high)
+
+    assert client.get('game', {'gamePk': 748534}) == {'gamePk': 748534}
+    assert len(server.requests) == 3
+    assert client.sleeps == [1, 2]
+    assert client.stats()['retries'] == 2
+
+
+def test_get_gives_up_after_max_retries(server, client):
+    server.responses[GAME_PATH] = [(500, {}, None)]
+    client.max_retries = 2
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get('game', {'gamePk': 748534})
+
+    assert len(server.requests) == 3
+    assert client.stats()['errors'] == 1
+
+
+def test_get_does_not_retry_client_errors(server, client):
+    server.responses[GAME_PATH] = [(404, {}, {'message': 'not found'})]
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get('game', {'gamePk': 748534})
+
+    assert len(server.requests) == 1
+    assert client.sleeps == []
+
+
+def test_get_reuses_body_when_not_modified(server, client):
+    def respond(headers):
+        if headers.get('If-None-Match', None) == '"v1"':
+            return 304, {'ETag': '"v1"'}, None
+        return 200, {'ETag': '"v1"'}, {'gamePk': 748534}
+
+    server.responses[GAME_PATH] = [(respond, None, None)]
+
+    first = client.get('game', {'gamePk': 748534})
+    second = client.get('game', {'gamePk': 748534})
+
+    assert first == second == {'gamePk': 748534}
+    assert first is not second
+    assert 'If-None-Match' not in server.requests[0][1]
+    assert server.requests[1][1]['If-None-Match'] == '"v1"'
+    assert client.stats()['not_modified'] == 1
+
+
+def test_rate_limiter_waits_for_tokens():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = _RateLimiter(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        limiter.acquire()
+
+    assert sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def _coalesced_gets(server, client, respond, callers=5):
+    """
+    Sends callers identical requests while the server holds the first
+    one, then lets it answer. Returns each caller's result or exception
+    """
+    release = threading.Event()
+
+    def held(headers):
+        release.wait(5)
+        return respond(headers)
+
+    server.responses['/api/v1/standings'] = [(held, None, None)]
+    results = [None] * callers
+
+    def get(i):
+        params = {'leagueId': 103, 'standingsType': 'regularSeason'}
+        if i % 2:
+            params = dict(reversed(params.items()))
+        try:
+            results[i] = client.get('standings', params)
+        except requests.exceptions.RequestException as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    _wait_for(lambda: len(server.requests) == 1)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for(lambda: client.stats()['deduplicated'] == callers - 1)
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_identical_gets_share_one_request(server, client):
+    results = _coalesced_gets(server, client,
+        lambda headers: (200, {}, {'records': []}))
+
+    assert len(server.requests) == 1
+    assert all(result == {'records': []} for result in results)
+    assert len({id(result) for result in results}) == len(results)
+    assert client.stats()['requests'] == 1
+    assert client.stats()['deduplicated'] == 4
+
+    # nothing in flight anymore so the next call is sent
+    client.get('standings', {'leagueId': 103})
+    assert len(server.requests) == 2
+
+
+def test_coalesced_callers_get_the_error(server, client):
+    client.max_retries = 0
+    results = _coalesced_gets(server, client,
+        lambda headers: (404, {}, {'message': 'not found'}))
+
+    assert len(server.requests) == 1
+    assert all(isinstance(result, requests.exceptions.HTTPError) for result in results)
+    assert client.stats()['errors'] == 1
+
+
+def test_coalescing_can_be_turned_off(server):
+    client = StatsApiClient(base_url=f'http://127.0.0.1:{server.server_port}',
+        rate_per_second=None, coalesce=False)
+    release = threading.Event()
+
+    def held(headers):
+        release.wait(5)
+        return 200, {}, {'records': []}
+
+    server.responses['/api/v1/standings'] = [(held, None, None)]
+    threads = [threading.Thread(target=client.get, args=('standings', {'leagueId': 103}))
+        for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: len(server.requests) == 3)
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert client.stats()['deduplicated'] == 0
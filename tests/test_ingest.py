@@ -0,0 +1,70 @@
+import copy
+import os
+
+import pandas as pd
+
+from at_bat.game_parser import GameParser
+from at_bat.ingest import ingest_games, merge_shards, parse_game, read_checkpoint
+
+
+def _fake_fetch(game_dict, calls):
+    def fetch(gamepk):
+        calls.append(gamepk)
+        if gamepk == 3:
+            return None # download failed
+        data = copy.deepcopy(game_dict)
+        data['gamePk'] = gamepk
+        return data
+    return fetch
+
+
+def test_ingest_writes_all_games_and_resumes(game_dict, tmp_path):
+    output = str(tmp_path / 'pitch.csv')
+    calls = []
+
+    rows, failed = ingest_games([1, 2, 3, 2], output, fetch=_fake_fetch(game_dict, calls),
+        fetch_workers=2, parse_workers=2, max_in_flight=2)
+
+    df = pd.read_csv(output)
+    assert failed == [3]
+    assert sorted(calls) == [1, 2, 3]
+    assert rows == len(df)
+    assert sorted(df['gamepk'].unique()) == [1, 2]
+    assert read_checkpoint(os.path.join(f'{output}.work', 'checkpoint.txt')) == {1, 2}
+
+    calls.clear()
+    ingest_games([1, 2, 3, 4], output, fetch=_fake_fetch(game_dict, calls), parse_workers=1)
+
+    assert sorted(calls) == [3, 4]
+    assert sorted(pd.read_csv(output)['gamepk'].unique()) == [1, 2, 4]
+
+
+def test_merge_skips_partial_rows_and_unfinished_shards(tmp_path):
+    shard_dir = tmp_path / 'shards'
+    shard_dir.mkdir()
+    columns = len(GameParser.field_names)
+    row = lambda gamepk: ','.join([str(gamepk)] * columns)
+
+    (shard_dir / '1.csv').write_text(f'{row(1)}\n{row(1)}\n', encoding='UTF-8')
+    # a half written last line and a blank line
+    (shard_dir / '2.csv').write_text(f'{row(2)}\n2,2,2\n\n', encoding='UTF-8')
+    # still being written when the run stopped
+    (shard_dir / '.3.csv.123').write_text(f'{row(3)}\n', encoding='UTF-8')
+
+    output = tmp_path / 'pitch.csv'
+    rows = merge_shards(str(shard_dir), str(output))
+
+    lines = output.read_text(encoding='UTF-8').splitlines()
+    assert rows == 3
+    assert lines[1:] == [row(1), row(1), row(2)]
+
+
+def test_parse_game_replaces_the_shard_of_a_game(game_dict, tmp_path):
+    shard_dir = tmp_path / 'shards'
+    shard_dir.mkdir()
+    (shard_dir / '748534.csv').write_text('748534,cut off\n', encoding='UTF-8')
+
+    rows = parse_game(game_dict, str(shard_dir))
+
+    assert os.listdir(shard_dir) == ['748534.csv']
+    assert len(pd.read_csv(shard_dir / '748534.csv', header=None)) == rows
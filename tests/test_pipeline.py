@@ -0,0 +1,192 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.expected_values_builder import build_expected_values
+from at_bat.game import Game
+from at_bat.game_parser import GameParser
+from at_bat.pipeline import Artifact, Pipeline, Stage, pitch_tables_pipeline
+from at_bat.state_table_builder import RE288, build_re640, build_red288
+
+
+def _text(name):
+    def load(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def save(value, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(value)
+
+    return Artifact(name, f'{name}.txt', load, save)
+
+
+@pytest.fixture
+def toy(tmp_path):
+    """
+    source -> upper -> twice
+           -> length
+    """
+    (tmp_path / 'source.txt').write_text('abc', encoding='utf-8')
+    calls = []
+
+    def stage(name, func):
+        def run(*args):
+            calls.append(name)
+            return func(*args)
+        return run
+
+    def pipeline():
+        return Pipeline(str(tmp_path), [_text('source')], [
+            Stage('upper', stage('upper', str.upper), ['source'], [_text('upper')]),
+            Stage('twice', stage('twice', lambda s: s * 2), ['upper'], [_text('twice')]),
+            Stage('length', stage('length', lambda s: str(len(s))), ['source'],
+                [_text('length')]),
+        ])
+
+    return tmp_path, pipeline, calls
+
+
+def _statuses(reports):
+    return {report.name: report.status for report in reports}
+
+
+def test_stages_are_skipped_until_an_input_changes(toy):
+    tmp_path, pipeline, calls = toy
+
+    reports = pipeline().run()
+    assert _statuses(reports) == {'upper': 'ran', 'twice': 'ran', 'length': 'ran'}
+    assert (tmp_path / 'twice.txt').read_text(encoding='utf-8') == 'ABCABC'
+    assert all(r.seconds > 0 and r.peak_bytes is not None for r in reports)
+
+    calls.clear()
+    assert set(_statuses(pipeline().run()).values()) == {'skipped'}
+    assert not calls
+
+    # an edited output is made again, and so is everything after it
+    (tmp_path / 'upper.txt').write_text('changed', encoding='utf-8')
+    assert _statuses(pipeline().run()) == {'upper': 'ran', 'twice': 'ran',
+        'length': 'skipped'}
+
+    (tmp_path / 'source.txt').write_text('abcd', encoding='utf-8')
+    calls.clear()
+    pipeline().run(targets=['twice'], trace_memory=False)
+    assert sorted(calls) == ['twice', 'upper']
+    assert (tmp_path / 'twice.txt').read_text(encoding='utf-8') == 'ABCDABCD'
+
+
+def test_skipped_outputs_are_read_from_their_files(toy):
+    tmp_path, pipeline, calls = toy
+    pipeline().run()
+
+    (tmp_path / 'twice.txt').unlink()
+    calls.clear()
+    reports = pipeline().run()
+
+    assert calls == ['twice']
+    assert _statuses(reports)['upper'] == 'skipped'
+    assert (tmp_path / 'twice.txt').read_text(encoding='utf-8') == 'ABCABC'
+
+
+def test_independent_stages_run_at_the_same_time(tmp_path):
+    (tmp_path / 'source.txt').write_text('x', encoding='utf-8')
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait_for_other(value):
+        barrier.wait()
+        return value
+
+    stages = [Stage(name, wait_for_other, ['source'], [_text(name)]) for name in 'ab']
+    reports = Pipeline(str(tmp_path), [_text('source')], stages).run(workers=2)
+
+    assert _statuses(reports) == {'a': 'ran', 'b': 'ran'}
+
+
+def test_failed_stage_blocks_downstream(toy):
+    tmp_path, _, _ = toy
+
+    def fail(_):
+        raise RuntimeError('bad table')
+
+    reports = Pipeline(str(tmp_path), [_text('source')], [
+        Stage('upper', fail, ['source'], [_text('upper')]),
+        Stage('twice', str.upper, ['upper'], [_text('twice')]),
+    ]).run()
+
+    assert _statuses(reports) == {'upper': 'failed', 'twice': 'blocked'}
+    assert isinstance(reports[0].error, RuntimeError)
+
+    with pytest.raises(ValueError):
+        Pipeline(str(tmp_path), [_text('source')],
+            [Stage('upper', str.upper, ['missing'], [_text('upper')])])
+
+
+def test_pitch_tables_match_the_builders(tmp_path):
+    rng = np.random.default_rng(0)
+    size = 3000
+    pitches = pd.DataFrame({
+        'balls': rng.integers(0, 4, size),
+        'strikes': rng.integers(0, 3, size),
+        'outs': rng.integers(0, 3, size),
+        'is_first_base': rng.integers(0, 2, size).astype(bool),
+        'is_second_base': rng.integers(0, 2, size).astype(bool),
+        'is_third_base': rng.integers(0, 2, size).astype(bool),
+        'runs_to_end': rng.geometric(0.6, size) - 1,
+        'at_bat_event_type': rng.choice(['single', 'field_out', 'home_run'], size),
+        'batted_ball_launch_speed': np.round(rng.uniform(40, 110, size), 1),
+        'batted_ball_launch_angle': rng.integers(-40, 60, size).astype(float),
+    })
+    pitches.to_csv(tmp_path / 'pitch.csv', index=False)
+
+    # the win probability stages are left out, they only write large csv files
+    targets = ['red288', 'expected_values']
+    reports = pitch_tables_pipeline(str(tmp_path)).run(targets, trace_memory=False)
+    assert _statuses(reports) == {'re288': 'ran', 're640': 'ran', 'red288': 'ran',
+        'expected_values': 'ran'}
+
+    re640 = build_re640(RE288.build(pitches))
+    red288 = pd.read_csv(os.path.join(tmp_path, 'red288.csv'))
+    np.testing.assert_allclose(red288['run_value'],
+        build_red288(re640).to_dataframe()['run_value'])
+
+    expected_values = pd.read_csv(os.path.join(tmp_path, 'expected_values.csv'))
+    assert (expected_values['at_bats'].tolist()
+        == build_expected_values(pitches)['at_bats'].tolist())
+
+    reports = pitch_tables_pipeline(str(tmp_path)).run(targets)
+    assert set(_statuses(reports).values()) == {'skipped'}
+
+
+def test_missing_source_fails_its_stages(tmp_path):
+    reports = Pipeline(str(tmp_path), [_text('source')], [
+        Stage('upper', str.upper, ['source'], [_text('upper')]),
+        Stage('twice', str.upper, ['upper'], [_text('twice')]),
+    ]).run(trace_memory=False)
+
+    assert _statuses(reports) == {'upper': 'failed', 'twice': 'blocked'}
+    assert isinstance(reports[0].error, FileNotFoundError)
+
+
+def test_pitch_tables_read_the_store(game_dict, tmp_path):
+    pitch_store = pytest.importorskip('at_bat.pitch_store')
+
+    parser = GameParser(game=Game(game_dict))
+    parser.write_parquet(str(tmp_path / 'pitches'))
+
+    reports = pitch_tables_pipeline(str(tmp_path)).run(['re288'], trace_memory=False)
+    assert _statuses(reports) == {'re288': 'ran'}
+    re288 = pd.read_csv(os.path.join(tmp_path, 're288.csv'))
+    expected = RE288.build(pd.DataFrame(parser.game_data)).to_dataframe()
+    assert re288['count'].tolist() == expected['count'].tolist()
+
+    reports = pitch_tables_pipeline(str(tmp_path)).run(['re288'], trace_memory=False)
+    assert _statuses(reports) == {'re288': 'skipped'}
+
+    # a new game in the store changes the source
+    other = [dict(row, gamepk=1) for row in parser.game_data]
+    pitch_store.write_pitches(other, str(tmp_path / 'pitches'))
+    reports = pitch_tables_pipeline(str(tmp_path)).run(['re288'], trace_memory=False)
+    assert _statuses(reports) == {'re288': 'ran'}
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from at_bat.game import Game
+from at_bat.game_parser import GameParser
+from at_bat.pitch_arrays import pitch_dataframe
+
+
+def _normalize(series: pd.Series) -> list:
+    series = series.astype(object)
+    return series.where(pd.notna(series), None).tolist()
+
+
+def test_pitch_dataframe_matches_game_parser(game_dict):
+    expected = GameParser(game=Game(game_dict)).dataframe
+    df = pitch_dataframe(Game(game_dict, lazy=True))
+
+    assert list(df.columns) == GameParser.field_names
+    assert len(df) == len(expected)
+
+    for column in GameParser.field_names:
+        if column not in expected.columns:
+            assert df[column].isna().all()
+            continue
+
+        for a, b in zip(_normalize(df[column]), _normalize(expected[column])):
+            if isinstance(a, float) and isinstance(b, (int, float)):
+                assert a == b or np.isclose(a, b), column
+            else:
+                assert a == b, column
+
+
+def test_pitch_arrays_are_typed_and_encoded(game_dict):
+    columns = Game(game_dict).pitch_arrays()
+
+    assert columns['balls'].dtype == np.int16
+    assert columns['is_first_base'].dtype == np.bool_
+    assert columns['px'].dtype == np.float64
+    assert isinstance(columns['pitcher'], pd.Categorical)
+    assert len(columns['pitch_type_code'].categories) < len(columns['pitch_type_code'])
@@ -0,0 +1,151 @@
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+# pylint: disable=C0413
+from at_bat.game import Game
+from at_bat.game_parser import GameParser
+from at_bat.ingest import ingest_games
+from at_bat.pitch_store import (PITCH_SCHEMA, csv_to_store, game_date, read_pitches,
+    read_table, row_counts, write_pitches)
+from at_bat.state_table_builder import RE288
+
+
+@pytest.fixture
+def parser(game_dict):
+    return GameParser(game=Game(game_dict))
+
+
+def _game(game_dict, gamepk):
+    data = copy.deepcopy(game_dict)
+    data['gamePk'] = gamepk
+    return data
+
+
+def test_schema_has_every_parser_field():
+    assert PITCH_SCHEMA.names == GameParser.field_names
+
+
+def test_game_is_partitioned_by_season_and_local_date(parser, tmp_path):
+    root = str(tmp_path / 'pitches')
+    rows = parser.write_parquet(root)
+
+    # 2023-11-02T00:03:00Z is the evening of the 1st in Arizona
+    assert game_date('2023-11-02T00:03:00Z', -7).isoformat() == '2023-11-01'
+    path = os.path.join(root, 'pitches', 'season=2023', 'game_date=2023-11-01',
+        'pitches.parquet')
+    assert os.path.exists(path)
+    assert row_counts(root) == {parser.gamepk: rows}
+
+    # writing the game again replaces it, other games on the date stay
+    parser.write_parquet(root)
+    other = copy.deepcopy(parser.game_data)
+    for row in other:
+        row['gamepk'] = 1
+    write_pitches(other, root)
+    assert row_counts(root) == {parser.gamepk: rows, 1: rows}
+    assert len(os.listdir(os.path.dirname(path))) == 1
+
+
+def test_read_matches_parser_rows(parser, tmp_path):
+    root = str(tmp_path / 'pitches')
+    parser.write_parquet(root)
+
+    df = read_pitches(root, ['pitcher', 'balls', 'runs_to_end', 'is_first_base',
+        'batted_ball_xba'])
+    expected = pd.DataFrame(parser.game_data)
+
+    assert list(df.columns) == ['pitcher', 'balls', 'runs_to_end', 'is_first_base',
+        'batted_ball_xba']
+    assert isinstance(df['pitcher'].dtype, pd.CategoricalDtype)
+    assert df['balls'].dtype == np.int8
+    assert df['pitcher'].astype(str).tolist() == expected['pitcher'].tolist()
+    assert df['runs_to_end'].tolist() == expected['runs_to_end'].tolist()
+    np.testing.assert_array_equal(df['batted_ball_xba'],
+        expected['batted_ball_xba'].astype(float))
+
+    assert read_pitches(root, ['gamepk'], seasons=[2024]).empty
+
+
+def test_store_is_normalized_and_reads_back_wide_rows(parser, tmp_path):
+    root = str(tmp_path / 'pitches')
+    parser.write_parquet(root)
+    expected = pd.DataFrame(parser.game_data, columns=GameParser.field_names)
+
+    games = read_table(root, 'games')
+    plate_appearances = read_table(root, 'plate_appearances')
+    players = read_table(root, 'players').to_pandas()
+
+    assert games.num_rows == 1
+    assert plate_appearances.num_rows == expected.groupby('at_bat_index').ngroups
+    assert 'batter' not in read_table(root, 'pitches').column_names
+    assert read_table(root, 'venues').column('venue_id').to_pylist() == \
+        [expected['venue_id'].iloc[0]]
+    names = dict(zip(players['player_id'], players['name']))
+    assert names[expected['pitcher_id'].iloc[0]] == expected['pitcher'].iloc[0]
+
+    df = read_pitches(root)
+    assert list(df.columns) == GameParser.field_names
+    for column in GameParser.field_names:
+        actual = df[column].astype(object)
+        expected_column = expected[column].astype(object)
+        # the result is only on the pitch that ended the plate appearance
+        assert actual.isna().tolist() == expected_column.isna().tolist(), column
+        mask = expected_column.notna()
+        assert actual[mask].tolist() == expected_column[mask].tolist(), column
+
+
+def test_csv_and_store_give_the_same_tables(game_dict, tmp_path):
+    csv_path = str(tmp_path / 'pitch.csv')
+    for gamepk in (1, 2):
+        GameParser(game=Game(_game(game_dict, gamepk))).write_csv(csv_path,
+            write_header=gamepk == 1)
+
+    # chunks smaller than a game
+    root = str(tmp_path / 'pitches')
+    rows = csv_to_store(csv_path, root, chunksize=100)
+
+    assert rows == len(pd.read_csv(csv_path))
+    assert row_counts(root) == {1: rows // 2, 2: rows // 2}
+
+    from_csv = RE288.build(read_pitches(csv_path, RE288.columns))
+    from_store = RE288.build(read_pitches(root, RE288.columns))
+    np.testing.assert_array_equal(from_store.count, from_csv.count)
+    np.testing.assert_array_equal(from_store.histogram, from_csv.histogram)
+
+
+def test_csv_without_ids_is_rejected(parser, tmp_path):
+    df = pd.DataFrame(parser.game_data).drop(columns=['batter_id'])
+
+    with pytest.raises(ValueError):
+        write_pitches(df, str(tmp_path / 'pitches'))
+
+
+def test_missing_values_are_kept(parser, tmp_path):
+    rows = copy.deepcopy(parser.game_data)
+    rows[0]['spin_rate'] = None
+    rows[0]['at_bat_event_type'] = None
+
+    root = str(tmp_path / 'pitches')
+    write_pitches(pd.DataFrame(rows), root)
+    df = read_pitches(root, ['spin_rate', 'at_bat_event_type'])
+
+    assert np.isnan(df['spin_rate'].iloc[0])
+    assert pd.isna(df['at_bat_event_type'].iloc[0])
+
+
+def test_ingest_writes_the_store(game_dict, tmp_path):
+    root = str(tmp_path / 'pitches')
+    rows, failed = ingest_games([1, 2], root, fetch=lambda pk: _game(game_dict, pk),
+        parse_workers=1, output_format='parquet')
+
+    assert not failed
+    assert sorted(row_counts(root)) == [1, 2]
+    assert rows == len(read_pitches(root, ['gamepk']))
+    # shards are deleted once they are in the store
+    assert not os.listdir(os.path.join(f'{root}.work', 'shards'))
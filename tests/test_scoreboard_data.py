@@ -0,0 +1,146 @@
+import pytest
+
+from at_bat.feed_profiles import FEED_PROFILES, project_feed
+from at_bat.game import Game
+
+
+class _Standings:
+    def __init__(self, abv: str):
+        self.wins = 0
+        self.losses = 0
+        self.division_rank = '-'
+        self.games_back = '-'
+        self.streak = '-'
+
+
+@pytest.fixture
+def feeds(game_dict, monkeypatch):
+    """
+    Game.get_dict returns feeds[0] (cut down to the profile). Tests
+    change it to move the game on. The profiles requested are kept in
+    feeds.profiles
+    """
+    from at_bat import scoreboard_data # pylint: disable=C0415
+    monkeypatch.setattr(scoreboard_data, 'ScoreboardStandings', _Standings)
+
+    class Feeds(list):
+        pass
+
+    feeds = Feeds([game_dict])
+    feeds.profiles = []
+    def get_dict(cls, gamepk=None, iso_time=None, delay_seconds=0, profile='full'):
+        feeds.profiles.append(profile)
+        if profile == 'full':
+            return feeds[0]
+        return project_feed(feeds[0], FEED_PROFILES[profile])
+    monkeypatch.setattr(Game, 'get_dict', classmethod(get_dict))
+
+    return feeds
+
+
+def test_update_return_difference_matches_fresh_objects(feeds, game_dict, partial_game):
+    from at_bat.scoreboard_data import ScoreboardData, dict_diff # pylint: disable=C0415
+
+    feeds[0] = partial_game(game_dict, 21, 2)
+    scoreboard = ScoreboardData(gamepk=748534)
+    old = ScoreboardData(gamepk=748534).to_dict()
+
+    feeds[0] = partial_game(game_dict, 25, 3)
+    diff = scoreboard.update_return_difference()
+    new = ScoreboardData(gamepk=748534).to_dict()
+
+    assert diff
+    assert diff == dict_diff(old, new)
+    assert scoreboard.update_return_difference() == {}
+
+
+def test_same_feed_is_not_rebuilt(feeds, game_dict, monkeypatch, partial_game):
+    from at_bat.scoreboard_data import ScoreboardData # pylint: disable=C0415
+
+    feeds[0] = partial_game(game_dict, 21, 2)
+    scoreboard = ScoreboardData(gamepk=748534)
+    game = scoreboard.game
+
+    def fail(*args, **kwargs):
+        raise AssertionError('feed was parsed again')
+    monkeypatch.setattr(scoreboard.parser, 'advance', fail)
+
+    assert scoreboard.update_return_difference() == {}
+    assert scoreboard.changed is False
+    assert scoreboard.game is game
+
+
+def test_unchanged_probe_skips_the_full_feed(feeds, game_dict, partial_game):
+    from at_bat.scoreboard_data import ScoreboardData # pylint: disable=C0415
+
+    feeds[0] = partial_game(game_dict, 21, 2)
+    scoreboard = ScoreboardData(gamepk=748534)
+
+    feeds.profiles.clear()
+    scoreboard.update()
+    assert feeds.profiles == ['scoreboard']
+    assert scoreboard.changed is False
+
+    feeds[0] = partial_game(game_dict, 21, 3)
+    feeds.profiles.clear()
+    scoreboard.update()
+    assert feeds.profiles == ['scoreboard', 'full']
+    assert scoreboard.changed is True
+
+
+def test_probe_survives_the_projection(game_dict, partial_game):
+    from at_bat.game import feed_fingerprint # pylint: disable=C0415
+    from at_bat.scoreboard_data import _probe_fingerprint # pylint: disable=C0415
+
+    probe = project_feed(game_dict, FEED_PROFILES['scoreboard'])
+    game = Game(probe, profile='scoreboard')
+    full = Game(game_dict)
+
+    # the parts of the probe the fingerprint reads
+    assert game.metaData.time_stamp == full.metaData.time_stamp
+    assert game.gameData.status.statusCode == full.gameData.status.statusCode
+    assert game.liveData.linescore.balls == full.liveData.linescore.balls
+    assert game.liveData.linescore.outs == full.liveData.linescore.outs
+
+    assert feed_fingerprint(probe) == _probe_fingerprint(game_dict)
+    assert _probe_fingerprint(partial_game(game_dict, 21, 2)) != \
+        _probe_fingerprint(partial_game(game_dict, 21, 3))
+
+
+def test_expected_values_come_from_the_parser(feeds):
+    from at_bat.scoreboard_data import HitDetails, ScoreboardData # pylint: disable=C0415
+
+    scoreboard = ScoreboardData(gamepk=748534)
+    df = scoreboard.parser.dataframe
+    away = df.loc[df['is_top_inning'] == True, 'batted_ball_xba'] # pylint: disable=C0121
+
+    assert scoreboard.away.xba == away.astype('float64').mean()
+
+    # the test grid is empty, so give the last batted ball a value to read
+    last_batted_ball = df['batted_ball_launch_speed'].last_valid_index()
+    df = df.loc[:last_batted_ball].copy()
+    df.loc[last_batted_ball, 'batted_ball_xba'] = 0.321
+    assert HitDetails(df).xba == 0.321
+
+
+def test_pitch_sections_are_kept_when_no_rows_changed(feeds, game_dict, monkeypatch,
+    partial_game):
+    from at_bat import scoreboard_data # pylint: disable=C0415
+    HitDetails, UmpireDetails = scoreboard_data.HitDetails, scoreboard_data.UmpireDetails
+
+    feeds[0] = partial_game(game_dict, 21, 2)
+    scoreboard = scoreboard_data.ScoreboardData(gamepk=748534)
+    assert scoreboard.update_return_difference() == {}
+
+    # a new feed (timeStamp) without any new pitches
+    feeds[0] = partial_game(game_dict, 21, 2)
+    feeds[0]['metaData']['timeStamp'] = '20231102_999999'
+
+    def fail(self):
+        raise AssertionError('section was built again')
+    monkeypatch.setattr(HitDetails, 'to_dict', fail)
+    monkeypatch.setattr(UmpireDetails, 'to_dict', fail)
+
+    assert scoreboard.update_return_difference() == {}
+    assert scoreboard.changed is True
+    assert scoreboard.parser.changed is False
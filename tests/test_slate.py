@@ -0,0 +1,111 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from at_bat.slate import SlateHistory, SlateSnapshot
+
+JSON_PATH = os.path.join(os.path.dirname(__file__), 'test_json', '748534.json')
+
+
+def _schedule_game(data: dict) -> dict:
+    """
+    The schedule entry (hydrated with linescore, team and venue) for the
+    game in a live feed
+    """
+    game_data = data['gameData']
+    return {
+        'gamePk': data['gamePk'],
+        'gameDate': game_data['datetime']['dateTime'],
+        'status': game_data['status'],
+        'teams': {
+            'away': {'team': game_data['teams']['away']},
+            'home': {'team': game_data['teams']['home']},
+        },
+        'venue': game_data['venue'],
+        'linescore': data['liveData']['linescore'],
+    }
+
+
+@pytest.fixture
+def schedule():
+    with open(JSON_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    pregame = _schedule_game(data)
+    pregame['gamePk'] = 1
+    pregame['status'] = {'abstractGameState': 'Preview', 'codedGameState': 'P',
+        'detailedState': 'Pre-Game', 'statusCode': 'P'}
+    pregame.pop('linescore')
+
+    return {'dates': [{'games': [_schedule_game(data), pregame]}]}
+
+
+def test_final_game_fields(schedule):
+    game = SlateSnapshot(schedule).game(748534)
+    linescore = schedule['dates'][0]['games'][0]['linescore']
+
+    assert game.to_dict() | {'start_time': None} == {
+        'game_state': 'F',
+        'away_abv': 'TEX',
+        'home_abv': 'AZ',
+        'away_score': linescore['teams']['away']['runs'],
+        'home_score': linescore['teams']['home']['runs'],
+        'start_time': None,
+        'inning': 9,
+        'inning_state': 'B',
+        'outs': 3,
+        'runners': 0,
+        'gamepk': 748534,
+    }
+
+
+def test_pregame_without_linescore(schedule):
+    game = SlateSnapshot(schedule).game(1)
+
+    assert game.game_state == 'P'
+    assert (game.inning, game.inning_state, game.outs, game.runners) == (1, 'T', 0, 0)
+    assert (game.away_score, game.home_score) == (0, 0)
+
+
+def test_diff_only_has_changes(schedule):
+    old = SlateSnapshot(schedule)
+
+    linescore = schedule['dates'][0]['games'][0]['linescore']
+    linescore['teams']['away']['runs'] += 1
+    linescore['offense']['second'] = {'id': 1, 'fullName': 'Runner'}
+    new = SlateSnapshot(schedule)
+
+    assert new.diff(old) == {748534: {'away_score': linescore['teams']['away']['runs'], 'runners': 2}}
+    assert set(new.diff(None)) == {748534, 1}
+
+
+def test_slate_is_polled_as_often_as_its_busiest_game(schedule):
+    games = schedule['dates'][0]['games']
+    start = datetime.now(timezone.utc) + timedelta(minutes=10)
+    games[1]['gameDate'] = start.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    # final and pre-game: wait for the first pitch
+    assert 580 < SlateSnapshot(schedule).next_interval() <= 600
+
+    games[1]['status'] = dict(games[1]['status'], codedGameState='I')
+    assert SlateSnapshot(schedule).next_interval(live_interval=5) == 5
+
+    games[1]['status'] = dict(games[1]['status'], codedGameState='F')
+    assert SlateSnapshot(schedule).next_interval() is None
+
+
+def test_history_shows_the_slate_from_delay_seconds_ago(schedule):
+    history = SlateHistory(delay_seconds=60)
+    first, second = SlateSnapshot(schedule), SlateSnapshot(schedule)
+    history.add(first, taken=100)
+    history.add(second, taken=105)
+
+    assert history.latest is second
+    assert history.delayed(now=150) is None
+    assert history.until_next(now=150) == 10
+    assert history.delayed(now=160) is first
+    assert history.until_next(now=160) == 5
+    assert history.delayed(now=170) is second
+    assert history.until_next(now=170) is None
@@ -0,0 +1,101 @@
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from at_bat.slate_poller import SlatePoller
+
+
+class _Scoreboard:
+    """
+    Stand in for ScoreboardData that goes through a list of states
+    """
+    def __init__(self, gamepk: int, states: list, start: datetime = None):
+        self.gamepk = gamepk
+        self.states = list(states)
+        self.game_state = self.states.pop(0)
+        self.updates = 0
+
+        if start is None:
+            start = datetime.now(timezone.utc)
+        self.game = SimpleNamespace(gameData=SimpleNamespace(
+            datetime=SimpleNamespace(datetime=start)))
+
+    def to_dict(self) -> dict:
+        return {'gamepk': self.gamepk, 'game_state': self.game_state}
+
+    def update_return_difference(self) -> dict:
+        self.updates += 1
+        if self.states:
+            self.game_state = self.states.pop(0)
+            return {'game_state': self.game_state}
+        return {}
+
+
+def test_games_are_polled_until_final():
+    states = {1: ['L', 'L', 'F'], 2: ['F'], 3: ['D', 'L', 'F']}
+    scoreboards = {}
+
+    def factory(gamepk):
+        scoreboards[gamepk] = _Scoreboard(gamepk, states[gamepk])
+        return scoreboards[gamepk]
+
+    poller = SlatePoller([1, 2, 3], live_interval=0.01, delayed_interval=0.02,
+        scoreboard_factory=factory)
+    updates = poller.subscribe_queue()
+    calls = []
+    poller.subscribe(lambda gamepk, diff: calls.append((gamepk, diff)))
+
+    thread = threading.Thread(target=poller.run)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+    received = []
+    while True:
+        try:
+            received.append(updates.get_nowait())
+        except queue.Empty:
+            break
+
+    assert received == calls
+    assert (2, {'gamepk': 2, 'game_state': 'F'}) in received
+    assert [diff for gamepk, diff in received if gamepk == 3] == [
+        {'gamepk': 3, 'game_state': 'D'}, {'game_state': 'L'}, {'game_state': 'F'}]
+
+    # final games are not polled again
+    assert scoreboards[2].updates == 0
+    assert scoreboards[1].updates == 2
+    assert poller.next_poll == {}
+
+
+def test_pregame_sleeps_until_first_pitch():
+    poller = SlatePoller([], live_interval=5, pregame_max_sleep=1800)
+    now = datetime.now(timezone.utc)
+
+    later = _Scoreboard(1, ['P'], start=now + timedelta(minutes=10))
+    assert 590 < poller.next_interval(later) <= 600
+
+    tomorrow = _Scoreboard(1, ['P'], start=now + timedelta(days=1))
+    assert poller.next_interval(tomorrow) == 1800
+
+    late = _Scoreboard(1, ['P'], start=now - timedelta(minutes=3))
+    assert poller.next_interval(late) == 5
+
+    assert poller.next_interval(_Scoreboard(1, ['C'])) is None
+
+
+def test_failed_poll_is_retried():
+    attempts = []
+
+    def factory(gamepk):
+        attempts.append(gamepk)
+        if len(attempts) == 1:
+            raise TimeoutError('timed out')
+        return _Scoreboard(gamepk, ['F'])
+
+    poller = SlatePoller([7], delayed_interval=0.01, scoreboard_factory=factory)
+    poller.start().join(timeout=5)
+
+    assert attempts == [7, 7]
+    assert 7 in poller.scoreboards
@@ -0,0 +1,69 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from at_bat.standings import StandingsCache
+
+
+def _division(*abvs):
+    return SimpleNamespace(team_records=[
+        SimpleNamespace(team=SimpleNamespace(abv=abv), wins=i) for i, abv in enumerate(abvs)])
+
+
+class FakeStandings:
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, league):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if league == 'AL':
+            return SimpleNamespace(east=_division('NYY'), central=_division('CLE'), west=_division('TEX'))
+        return SimpleNamespace(east=_division('NYM'), central=_division('CHC'), west=_division('LAD'))
+
+
+def test_snapshot_indexed_by_abv_and_cached():
+    fake = FakeStandings()
+    cache = StandingsCache(ttl_seconds=60, get_standings=fake)
+
+    assert cache.get_team('TEX').team.abv == 'TEX'
+    assert cache.get_team('LAD').team.abv == 'LAD'
+    assert cache.get_team('XXX') is None
+    assert fake.calls == 2 # one per league
+
+    cache.invalidate()
+    cache.get_team('TEX')
+    assert fake.calls == 4
+
+
+def test_concurrent_callers_share_one_fetch():
+    fake = FakeStandings(delay=0.05)
+    cache = StandingsCache(ttl_seconds=60, get_standings=fake)
+
+    threads = [threading.Thread(target=cache.get_team, args=('NYY',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.calls == 2
+
+
+def test_failed_refresh_keeps_last_snapshot():
+    fake = FakeStandings()
+    cache = StandingsCache(ttl_seconds=0, get_standings=fake)
+    team = cache.get_team('CHC')
+
+    def broken(league):
+        raise ConnectionError()
+    cache._get_standings = broken
+
+    assert cache.get_team('CHC') is team
+
+    with pytest.raises(ConnectionError):
+        StandingsCache(get_standings=broken).get_team('CHC')
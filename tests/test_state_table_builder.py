@@ -0,0 +1,124 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.state_table_builder import (AXES, RE288, Axis, StateCounts, StateTableSpec,
+    aggregate, build_re640, build_red288, encode_states)
+
+
+@pytest.fixture
+def pitches():
+    rng = np.random.default_rng(0)
+    size = 5000
+    return pd.DataFrame({
+        'balls': rng.integers(0, 5, size), # 4 balls is dropped from RE288
+        'strikes': rng.integers(0, 3, size),
+        'outs': rng.integers(0, 3, size),
+        'is_first_base': rng.integers(0, 2, size).astype(bool),
+        'is_second_base': rng.integers(0, 2, size).astype(bool),
+        'is_third_base': rng.integers(0, 2, size).astype(bool),
+        'inning': rng.integers(1, 13, size),
+        'away_score': rng.integers(0, 40, size),
+        'home_score': rng.integers(0, 40, size),
+        'runs_to_end': rng.geometric(0.6, size) - 1,
+    })
+
+
+def _loop_re288(df):
+    """
+    The row loop "3. compute_re288.py" used before the engine
+    """
+    states = itertools.product(range(4), range(3), range(3), *[(False, True)] * 3)
+    table = {state: {'total': 0, 'count': 0, 'runs': [0] * 14} for state in states}
+
+    for _, row in df.iterrows():
+        if row['balls'] < 4 and row['strikes'] < 3:
+            state = (row['balls'], row['strikes'], row['outs'], row['is_first_base'],
+                row['is_second_base'], row['is_third_base'])
+            table[state]['total'] += row['runs_to_end']
+            table[state]['count'] += 1
+            if row['runs_to_end'] < 14:
+                table[state]['runs'][row['runs_to_end']] += 1
+
+    return table
+
+
+def test_re288_matches_row_loop(pitches):
+    expected = _loop_re288(pitches)
+    table = RE288.build(pitches).to_dataframe()
+
+    assert len(table) == 288
+    for row in table.itertuples(index=False):
+        state = tuple(row[:6])
+        assert row.total_runs == expected[state]['total']
+        assert row.count == expected[state]['count']
+        assert list(row[9:]) == expected[state]['runs']
+        if row.count:
+            assert row.average_runs == pytest.approx(row.total_runs / row.count)
+        else:
+            assert np.isnan(row.average_runs)
+
+
+def test_re288_round_trips_through_dataframe(pitches):
+    table = RE288.build(pitches)
+    loaded = StateCounts.from_dataframe(table.to_dataframe(), RE288.axes)
+
+    np.testing.assert_array_equal(loaded.count, table.count)
+    np.testing.assert_array_equal(loaded.histogram, table.histogram)
+    np.testing.assert_array_equal(loaded.average, table.average)
+
+
+def test_re640_and_red288_match_csv_files():
+    re288 = pd.read_csv('every_pitch_csv/re288.csv', float_precision='round_trip')
+    expected_re640 = pd.read_csv('every_pitch_csv/re640.csv')
+    expected_red288 = pd.read_csv('every_pitch_csv/red288.csv')
+
+    re640 = build_re640(StateCounts.from_dataframe(re288, RE288.axes))
+    actual_re640 = re640.to_dataframe()
+    red288 = build_red288(re640).to_dataframe()
+
+    assert list(actual_re640.columns) == list(expected_re640.columns)
+    for column in expected_re640.columns:
+        np.testing.assert_allclose(actual_re640[column].astype(float),
+            expected_re640[column].astype(float), equal_nan=True)
+
+    assert list(red288.columns) == list(expected_red288.columns)
+    np.testing.assert_allclose(red288['run_value'], expected_red288['run_value'])
+
+
+def test_new_tables_from_axis_names(pitches):
+    spec = StateTableSpec(('outs', 'runners'))
+    table = spec.build(pitches)
+
+    assert spec.columns == ['outs', 'is_first_base', 'is_second_base', 'is_third_base',
+        'runs_to_end']
+    assert table.count.shape == (3, 8)
+    assert table.count.sum() == len(pitches)
+
+    loaded = pitches[pitches['outs'] == 1]
+    loaded = loaded[loaded['is_first_base'] & loaded['is_second_base'] & loaded['is_third_base']]
+    assert table.count[1, 7] == len(loaded)
+    assert table.total[1, 7] == loaded['runs_to_end'].sum()
+
+
+def test_clipped_axes(pitches):
+    table = aggregate(pitches, ('inning', 'home_lead'))
+    home_lead = pitches['home_score'] - pitches['away_score']
+
+    # extra innings are counted as the 10th
+    assert table.count.sum() == len(pitches)
+    assert table.count[9].sum() == (pitches['inning'] >= 10).sum()
+    assert table.count[:, 0].sum() == (home_lead <= -30).sum()
+    assert table.histogram is None
+
+
+def test_encode_states_rejects_values_outside_the_axes():
+    df = pd.DataFrame({'balls': [0, 3, 4, np.nan], 'outs': [0, 2, 1, 1]})
+    axes = (AXES['balls'], Axis('outs', (0, 2)))
+
+    assert encode_states(df, axes).tolist() == [0, 7, -1, -1]
+
+    with pytest.raises(ValueError):
+        StateTableSpec(('not_an_axis',))
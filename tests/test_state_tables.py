@@ -0,0 +1,82 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.state_tables import StateTable, get_re640_table, get_red288_table, runners_bitmask
+from at_bat.statsapi_plus import get_re640_dataframe, get_red288_dataframe
+
+
+def _mask_lookup(df, column, balls, strikes, outs, runners):
+    return df.loc[
+        (df['balls'] == balls) &
+        (df['strikes'] == strikes) &
+        (df['outs'] == outs) &
+        (df['is_first_base'] == bool(runners & 1)) &
+        (df['is_second_base'] == bool(runners & 2)) &
+        (df['is_third_base'] == bool(runners & 4))
+    ][column].iloc[0]
+
+
+def test_runners_bitmask_matches_runners_int():
+    assert runners_bitmask(False, False, False) == 0
+    assert runners_bitmask(True, False, True) == 5
+    assert runners_bitmask(True, True, True) == 7
+
+
+def test_red288_table_matches_dataframe_masks():
+    df = get_red288_dataframe()
+    table = get_red288_table()
+
+    for balls, strikes, outs, runners in itertools.product(range(4), range(3), range(3), range(8)):
+        expected = _mask_lookup(df, 'run_value', balls, strikes, outs, runners)
+        assert table.lookup('run_value', balls, strikes, outs, runners) == pytest.approx(expected)
+
+
+def test_re640_lookup_row_matches_dataframe_masks():
+    df = get_re640_dataframe()
+    row = get_re640_table().lookup_row(balls=2, strikes=1, outs=1, runners=3)
+
+    assert row['average_runs'] == pytest.approx(_mask_lookup(df, 'average_runs', 2, 1, 1, 3))
+    assert row['count'] == _mask_lookup(df, 'count', 2, 1, 1, 3)
+    assert row['0 runs'] == _mask_lookup(df, '0 runs', 2, 1, 1, 3)
+
+
+def test_tables_are_loaded_once():
+    assert get_re640_table() is get_re640_table()
+
+
+def test_vectorized_lookup_and_bounds():
+    table = get_red288_table()
+    balls = np.array([0, 3])
+    values = table.lookup('run_value', balls, 0, 0, 0)
+
+    assert values.shape == (2,)
+    assert values[1] == table.lookup('run_value', 3, 0, 0, 0)
+
+    with pytest.raises(IndexError):
+        table.lookup('run_value', 4, 0, 0, 0)
+
+
+def test_win_probability_axes():
+    df = pd.DataFrame({
+        'balls': [0, 1],
+        'strikes': [0, 2],
+        'outs': [0, 1],
+        'is_first_base': [False, True],
+        'is_second_base': [False, False],
+        'is_third_base': [False, True],
+        'inning': [1, 10],
+        'is_top_inning': [True, False],
+        'home_lead': [-30, 30],
+        'wpa': [0.25, 0.75],
+    })
+    table = StateTable.from_dataframe(df, ['wpa'])
+
+    assert table.axes[-3:] == ('inning', 'is_top_inning', 'home_lead')
+    assert table.lookup('wpa', 0, 0, 0, 0, inning=1, is_top_inning=True, home_lead=-30) == 0.25
+    assert table.lookup('wpa', 1, 2, 1, 5, inning=10, is_top_inning=False, home_lead=30) == 0.75
+
+    with pytest.raises(ValueError):
+        table.lookup('wpa', 0, 0, 0, 0)
@@ -0,0 +1,135 @@
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.expected_values_builder import build_expected_values
+from at_bat.game_parser import GameParser
+from at_bat.state_table_builder import RE288
+from at_bat.table_refresh import (STATS_COLUMNS, STATS_FILE, TableStats, parse_games,
+    refresh)
+
+
+def _fake_fetch(game_dict, calls):
+    def fetch(gamepk):
+        calls.append(gamepk)
+        if gamepk == 3:
+            return None # download failed
+        data = copy.deepcopy(game_dict)
+        data['gamePk'] = gamepk
+        if gamepk == 4:
+            data['gameData']['status']['codedGameState'] = 'I' # still in progress
+        return data
+    return fetch
+
+
+@pytest.fixture
+def pitches(game_dict, tmp_path):
+    """
+    Rows of games 1 and 2 as they come back from pitch.csv
+    """
+    df = parse_games([1, 2], fetch=_fake_fetch(game_dict, []))
+    path = tmp_path / 'pitch.csv'
+    df.to_csv(path, index=False)
+    return pd.read_csv(path, usecols=STATS_COLUMNS)
+
+
+def _assert_same_stats(stats, df):
+    expected = RE288.build(df)
+    np.testing.assert_array_equal(stats.re288.count, expected.count)
+    np.testing.assert_array_equal(stats.re288.total, expected.total)
+    np.testing.assert_array_equal(stats.re288.histogram, expected.histogram)
+    np.testing.assert_array_equal(stats.re288.average, expected.average)
+    assert stats.gamepks == set(df['gamepk'])
+
+
+def test_fold_matches_counting_every_game(pitches):
+    stats = TableStats.from_pitches(pitches[pitches['gamepk'] == 1])
+
+    assert stats.fold(pitches) == [2]
+    assert stats.fold(pitches) == []
+    _assert_same_stats(stats, pitches)
+
+    full = TableStats.from_pitches(pitches)
+    np.testing.assert_array_equal(stats.batted_balls, full.batted_balls)
+
+
+def test_stats_round_trip_through_file(pitches, tmp_path):
+    path = str(tmp_path / STATS_FILE)
+    TableStats.from_pitches(pitches).save(path)
+
+    _assert_same_stats(TableStats.load(path), pitches)
+
+
+def test_refresh_adds_only_new_final_games(game_dict, pitches, tmp_path):
+    directory = str(tmp_path / 'tables')
+    os.makedirs(directory)
+    pitch_csv = str(tmp_path / 'new_pitch.csv')
+    TableStats.from_pitches(pitches[pitches['gamepk'] == 1]).save(
+        os.path.join(directory, STATS_FILE))
+
+    calls = []
+    added = refresh([1, 2, 3, 4, 2], directory, pitch_csv_path=pitch_csv,
+        fetch=_fake_fetch(game_dict, calls))
+
+    assert added == [2]
+    assert sorted(calls) == [2, 3, 4]
+    assert set(pd.read_csv(pitch_csv)['gamepk']) == {2}
+
+    re288 = pd.read_csv(os.path.join(directory, 're288.csv'))
+    expected = RE288.build(pitches).to_dataframe()
+    assert re288['count'].tolist() == expected['count'].tolist()
+
+    expected_values = pd.read_csv(os.path.join(directory, 'expected_values.csv'))
+    expected = build_expected_values(pitches)
+    assert expected_values['at_bats'].tolist() == expected['at_bats'].tolist()
+    np.testing.assert_array_equal(expected_values['xslg'], expected['xslg'])
+
+    for name in ('re640.csv', 'red288.csv', 'wp780800.csv', 'wpd351360.csv'):
+        assert os.path.exists(os.path.join(directory, name))
+
+    calls.clear()
+    assert refresh([1, 2], directory, fetch=_fake_fetch(game_dict, calls)) == []
+    assert not calls
+
+
+def test_refresh_needs_stats(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        refresh([1], str(tmp_path))
+
+
+def test_refresh_appends_under_an_older_header(game_dict, pitches, tmp_path):
+    directory = str(tmp_path / 'tables')
+    os.makedirs(directory)
+    TableStats.from_pitches(pitches[pitches['gamepk'] == 1]).save(
+        os.path.join(directory, STATS_FILE))
+
+    # pitch.csv from before the id columns were added
+    old_columns = [name for name in GameParser.field_names
+        if name not in ('venue_id', 'at_bat_index', 'batter_id', 'pitcher_id')]
+    pitch_csv = str(tmp_path / 'old_pitch.csv')
+    game = parse_games([1], fetch=_fake_fetch(game_dict, []))
+    game[old_columns].to_csv(pitch_csv, index=False)
+
+    refresh([2], directory, pitch_csv_path=pitch_csv, fetch=_fake_fetch(game_dict, []))
+
+    df = pd.read_csv(pitch_csv)
+    assert list(df.columns) == old_columns
+    assert df['balls'].tolist() == pitches['balls'].tolist()
+    assert df['gamepk'].tolist() == pitches['gamepk'].tolist()
+
+
+def test_refresh_rejects_an_unknown_header(game_dict, pitches, tmp_path):
+    directory = str(tmp_path / 'tables')
+    os.makedirs(directory)
+    TableStats.from_pitches(pitches[pitches['gamepk'] == 1]).save(
+        os.path.join(directory, STATS_FILE))
+    pitch_csv = str(tmp_path / 'other_pitch.csv')
+    with open(pitch_csv, 'w', encoding='utf-8') as file:
+        file.write('gamepk,something_else\n')
+
+    with pytest.raises(ValueError):
+        refresh([2], directory, pitch_csv_path=pitch_csv, fetch=_fake_fetch(game_dict, []))
+    assert TableStats.load(os.path.join(directory, STATS_FILE)).gamepks == {1}
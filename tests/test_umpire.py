@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat import umpire as umpire_module
+from at_bat.state_tables import StateTable
+from at_bat.umpire import MISS_RADIUS, calculate_favors_batch, in_zone_fraction
+
+
+@pytest.fixture
+def flat_wpd351360(monkeypatch):
+    df = pd.DataFrame({
+        'balls': [0, 3],
+        'strikes': [0, 2],
+        'outs': [0, 2],
+        'is_first_base': [False, True],
+        'is_second_base': [False, True],
+        'is_third_base': [False, True],
+        'inning': [1, 10],
+        'is_top_inning': [False, True],
+        'home_lead': [-30, 30],
+        'wpa': [0.0, 0.0],
+    })
+    table = StateTable.from_dataframe(df, ['wpa'])
+    table.data[:] = 0.02
+    monkeypatch.setattr(umpire_module, 'get_win_probability', lambda: table)
+    return table
+
+
+def test_in_zone_fraction_simple_cases():
+    fraction = in_zone_fraction([0, 5, 0.83, 0.83], [2.5, 2.5, 2.5, 3.5], 1.5, 3.5)
+
+    assert fraction[0] == pytest.approx(1)
+    assert fraction[1] == pytest.approx(0)
+    assert fraction[2] == pytest.approx(0.5)
+    assert fraction[3] == pytest.approx(0.25)
+
+
+def test_in_zone_fraction_matches_sampling():
+    rng = np.random.default_rng(0)
+    angle = rng.uniform(0, 2 * np.pi, 200_000)
+    radius = MISS_RADIUS * np.sqrt(rng.uniform(0, 1, 200_000))
+    dx = radius * np.cos(angle)
+    dz = radius * np.sin(angle)
+
+    for px, pz in [(0.85, 3.42), (-0.8, 1.52), (0.86, 1.49)]:
+        x = px + dx
+        z = pz + dz
+        sampled = np.mean((x >= -0.83) & (x <= 0.83) & (z >= 1.5) & (z <= 3.5))
+        assert in_zone_fraction([px], [pz], [1.5], [3.5])[0] == pytest.approx(sampled, abs=0.005)
+
+
+def test_calculate_favors_batch_signs(flat_wpd351360):
+    # missed strike (top), missed ball (bottom), correct call, swing, no location
+    run_favor, wp_favor = calculate_favors_batch(
+        pitch_result_code=['C', 'B', 'C', 'S', 'B'],
+        px=[1.5, 0.0, 0.0, 0.0, np.nan],
+        pz=[2.5, 2.5, 2.5, 2.5, np.nan],
+        pz_min=[1.5] * 5,
+        pz_max=[3.5] * 5,
+        balls=[0] * 5,
+        strikes=[0] * 5,
+        outs=[0] * 5,
+        runners=[0] * 5,
+        inning=[1, 12, 1, 1, 1],
+        is_top_inning=[True, False, True, True, True],
+        home_lead=[0] * 5,
+    )
+
+    assert run_favor[0] > 0
+    assert run_favor[1] > 0
+    assert wp_favor[0] == pytest.approx(0.02)
+    assert wp_favor[1] == pytest.approx(-0.02)
+    assert list(run_favor[2:]) == [0, 0, 0]
+    assert list(wp_favor[2:]) == [0, 0, 0]
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.state_table_builder import RE288, StateCounts
+from at_bat.wp_table_builder import build_wp351360, build_wp780800, build_wpd351360
+from at_bat.win_probability import WinProbability
+
+
+@pytest.fixture(scope='module')
+def re288():
+    df = pd.read_csv('every_pitch_csv/re288.csv')
+    return StateCounts.from_dataframe(df, RE288.axes)
+
+
+@pytest.fixture(scope='module')
+def tables(re288):
+    wp780800 = build_wp780800(build_wp351360(re288))
+    return wp780800, build_wpd351360(wp780800)
+
+
+def _states(size, seed, balls=5, strikes=4, outs=4):
+    rng = np.random.default_rng(seed)
+    return {
+        'balls': rng.integers(0, balls, size),
+        'strikes': rng.integers(0, strikes, size),
+        'outs': rng.integers(0, outs, size),
+        'runners': rng.integers(0, 8, size),
+        'inning': rng.integers(1, 11, size),
+        'is_top_inning': rng.integers(0, 2, size).astype(bool),
+        'home_lead': rng.integers(-30, 31, size),
+    }
+
+
+def _index(states, top_first):
+    runners = states['runners']
+    top = states['is_top_inning']
+    return (states['balls'], states['strikes'], states['outs'], runners & 1,
+        (runners >> 1) & 1, (runners >> 2) & 1, states['inning'] - 1,
+        np.where(top, 0, 1) if top_first else top.astype(int), states['home_lead'] + 30)
+
+
+def test_wp780800_is_identical_to_built_table(re288, tables):
+    wp = WinProbability(re288)
+    states = _states(20000, seed=0)
+    expected = tables[0].data[_index(states, top_first=False)]
+
+    for i, column in enumerate(('away_win', 'home_win', 'tie')):
+        np.testing.assert_array_equal(wp.lookup(column, **states), expected[:, i])
+
+
+def test_wpa_is_identical_to_built_table(re288, tables):
+    wp = WinProbability(re288)
+    states = _states(20000, seed=1, balls=4, strikes=3, outs=3)
+    expected = tables[1].data[_index(states, top_first=True)][:, 0]
+
+    np.testing.assert_array_equal(wp.lookup('wpa', **states), expected)
+
+
+def test_half_innings_are_computed_on_demand(re288):
+    wp = WinProbability(re288)
+    assert not wp._filled.any() # pylint: disable=W0212
+
+    row = wp.lookup_row(balls=1, strikes=2, outs=0, runners=5, inning=7,
+        is_top_inning=False, home_lead=-1)
+    # innings with more runs than the RE288 histogram are not counted
+    assert sum(row.values()) == pytest.approx(1, abs=1e-3)
+    assert wp._filled.sum() == 1 # pylint: disable=W0212
+    assert wp._filled[6, 1] # pylint: disable=W0212
+
+    # the third out in the top of the 7th reads the bottom of the 7th
+    wp.lookup('home_win', balls=0, strikes=0, outs=3, runners=0, inning=7,
+        is_top_inning=True, home_lead=-1)
+    assert wp._filled.sum() == 1 # pylint: disable=W0212
+
+
+def test_lookup_rejects_states_outside_the_tables(re288):
+    wp = WinProbability(re288)
+
+    with pytest.raises(IndexError):
+        wp.lookup('home_win', 0, 0, 0, 0, inning=11, is_top_inning=True, home_lead=0)
+    with pytest.raises(IndexError):
+        wp.lookup('wpa', 3, 2, 3, 0, inning=1, is_top_inning=True, home_lead=0)
+    with pytest.raises(ValueError):
+        wp.lookup('home_win', 0, 0, 0, 0, inning=1, home_lead=0)
+    with pytest.raises(KeyError):
+        wp.lookup('run_value', 0, 0, 0, 0, inning=1, is_top_inning=True, home_lead=0)
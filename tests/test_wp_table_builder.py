@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from at_bat.state_table_builder import RE288, StateCounts
+from at_bat.wp_table_builder import (WP780800_AXES, build_wp351360, build_wp780800,
+    build_wpd351360, half_inning_pmfs, inning_pmf_powers)
+
+
+@pytest.fixture(scope='module')
+def re288():
+    df = pd.read_csv('every_pitch_csv/re288.csv', float_precision='round_trip')
+    return StateCounts.from_dataframe(df, RE288.axes)
+
+
+@pytest.fixture(scope='module')
+def tables(re288):
+    wp351360 = build_wp351360(re288)
+    wp780800 = build_wp780800(wp351360)
+    return wp351360, wp780800, build_wpd351360(wp780800)
+
+
+def _states(count, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield (int(rng.integers(4)), int(rng.integers(3)), int(rng.integers(3)),
+            int(rng.integers(2)), int(rng.integers(2)), int(rng.integers(2)),
+            int(rng.integers(1, 11)), bool(rng.integers(2)), int(rng.integers(-30, 31)))
+
+
+def _wp351360(table, state):
+    balls, strikes, outs, first, second, third, inning, is_top, lead = state
+    return table.data[balls, strikes, outs, first, second, third, inning - 1,
+        0 if is_top else 1, lead + 30]
+
+
+def _loop_win_probability(pmfs, state):
+    """
+    The per state loop of "5. compute_wp351360.py" (without cutting
+    the rest of the game off at 13 runs)
+    """
+    new_inning, extra_inning = pmfs[0, 0, 0, 0, 0, 0], pmfs[0, 0, 0, 0, 1, 0]
+    current = pmfs[state[:6]]
+    inning, is_top, lead = state[6:]
+
+    if inning > 9:
+        away, home = (current, extra_inning) if is_top else ([1], current)
+    else:
+        away, home = (current, new_inning) if is_top else ([1], current)
+        for _ in range(inning + 1, 10):
+            away = np.convolve(away, new_inning)
+            home = np.convolve(home, new_inning)
+
+    result = [0, 0, 0]
+    for a, p_away in enumerate(away):
+        for h, p_home in enumerate(home):
+            if a > h + lead:
+                result[0] += p_away * p_home
+            elif h + lead > a:
+                result[1] += p_away * p_home
+            else:
+                result[2] += p_away * p_home
+    return result
+
+
+def test_wp351360_matches_state_loop(re288, tables):
+    pmfs = half_inning_pmfs(re288)
+
+    for state in _states(60, seed=0):
+        expected = _loop_win_probability(pmfs, state)
+        np.testing.assert_allclose(_wp351360(tables[0], state), expected, atol=1e-12)
+
+
+def test_wp351360_outcomes_add_up_to_the_pmf_mass(re288, tables):
+    pmfs = half_inning_pmfs(re288)
+    powers = inning_pmf_powers(pmfs[0, 0, 0, 0, 0, 0], 9)
+
+    # top of the 1st, bases empty: every outcome of 9 innings each
+    total = tables[0].data[0, 0, 0, 0, 0, 0, 0, 0].sum(axis=-1)
+    np.testing.assert_allclose(total, powers[9].sum() ** 2)
+    assert len(powers[9]) == 9 * 13 + 1
+
+
+def _loop_wp780800(wp351360, state):
+    """
+    The rules of "6. adjust_wp351360.py"
+    """
+    balls, strikes, outs, first, second, third, inning, is_top, lead = state
+
+    def wp(*key):
+        return list(_wp351360(wp351360, key))
+
+    if balls == 4 and strikes == 3:
+        return [np.nan] * 3
+    if outs == 3 or (strikes == 3 and outs == 2):
+        if is_top:
+            if inning == 9 and lead > 0:
+                return [0, 1, 0]
+            return wp(0, 0, 0, 0, 0, 0, inning, False, lead)
+        if inning >= 9 and lead < 0:
+            return [1, 0, 0]
+        if inning >= 9 and lead > 0:
+            return [0, 1, 0]
+        return wp(0, 0, 0, 0, 0, 0, min(inning + 1, 10), True, lead)
+    if strikes == 3:
+        return wp(0, 0, outs + 1, first, second, third, inning, is_top, lead)
+    if balls == 4:
+        if first and second and third and abs(lead) != 30:
+            lead += -1 if is_top else 1
+        return wp(0, 0, outs, 1, first | second, third | (first & second), inning, is_top, lead)
+    return wp(*state)
+
+
+def test_wp780800_matches_adjust_rules(tables):
+    wp351360, wp780800, _ = tables
+    rng = np.random.default_rng(1)
+    assert wp780800.data.shape == tuple(axis.size for axis in WP780800_AXES) + (3,)
+
+    for _ in range(2000):
+        state = (int(rng.integers(5)), int(rng.integers(4)), int(rng.integers(4)),
+            int(rng.integers(2)), int(rng.integers(2)), int(rng.integers(2)),
+            int(rng.integers(1, 11)), bool(rng.integers(2)), int(rng.integers(-30, 31)))
+        index = state[:6] + (state[6] - 1, int(state[7]), state[8] + 30)
+
+        np.testing.assert_allclose(wp780800.data[index], _loop_wp780800(wp351360, state),
+            equal_nan=True)
+
+
+def test_wpd351360_is_strike_minus_ball(tables):
+    _, wp780800, wpd351360 = tables
+
+    def home(state):
+        index = state[:6] + (state[6] - 1, int(state[7]), state[8] + 30)
+        away_win, home_win, tie = wp780800.data[index]
+        return home_win + tie / 2
+
+    for state in _states(200, seed=2):
+        balls, strikes = state[:2]
+        ball = home((balls + 1, strikes) + state[2:])
+        strike = home((balls, strikes + 1) + state[2:])
+        assert _wp351360(wpd351360, state)[0] == pytest.approx(strike - ball)
+
+    # a ball with the bases loaded in the top half walks in an away run
+    state = (3, 0, 0, 1, 1, 1, 5, True, 0)
+    assert _wp351360(wpd351360, state)[0] > 0